@@ -1,41 +1,106 @@
 """Run main logic by calling the appropriate modules."""
+import argparse
+import asyncio
 import datetime
 import logging
 import os
+import sys
 
-from dotenv import load_dotenv
+from dotenv import find_dotenv
 
-from autovisa import schedule
-from autovisa.src import LOGGING_LEVEL
+from autovisa.src.config import Config, ConfigLoader, apply_dotenv
 from autovisa.src.constants import LOGGER_NAME
-from autovisa.src.utils import hibernate
+from autovisa.src.control import Controller, start_control_server
+from autovisa.src.exceptions import ConfigError
+from autovisa.src.logs import configure_logging_from_env
+from autovisa.src.runtime import AsyncRuntime, close_failed_session, create_scheduler, quit_browser
+from autovisa.src.utils import get_sleep_duration, is_env, rand_sleep
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m autovisa",
+        description="Reschedule a visa appointment to a sooner date.",
+    )
+    parser.add_argument(
+        "--config", default=os.getenv("AUTOVISA_CONFIG"),
+        help="JSON file with settings, re-read between checks",
+    )
+    parser.add_argument(
+        "--facilities", dest="allowed_city_ids", help="comma-separated facility ids"
+    )
+    parser.add_argument(
+        "--exclude-start", dest="exclude_date_start", help="first date never picked (YYYY-MM-DD)"
+    )
+    parser.add_argument(
+        "--exclude-end", dest="exclude_date_end", help="last date never picked (YYYY-MM-DD)"
+    )
+    parser.add_argument("--sleep-bounds", help="seconds between checks, as MIN-MAX")
+    parser.add_argument("--hibernate-bounds", help="seconds between sessions, as MIN-MAX")
+    parser.add_argument(
+        "--asyncio", action="store_true", default=is_env("AUTOVISA_ASYNCIO"),
+        help="run the browser on its own thread and await the waits on an event loop",
+    )
+    return parser, parser.parse_args(argv)
+
 
 if __name__ == "__main__":
-    load_dotenv()
+    # The defaults of some arguments may come from the dotenv file
+    process_env_names = set(os.environ)
+    dotenv_path = find_dotenv(usecwd=True) or None
+    apply_dotenv(dotenv_path, process_env_names)
+    parser, args = parse_args()
+    config_loader = ConfigLoader(
+        args.config, dotenv_path,
+        {name: getattr(args, name) for name in Config._fields},
+        process_env_names,
+    )
+    try:
+        config = config_loader.load()
+    except ConfigError as err:
+        parser.error(str(err))
+
     logging.basicConfig()
     logging.getLogger().setLevel(logging.ERROR)
     logging.getLogger('seleniumwire').setLevel(logging.ERROR)
 
+    configure_logging_from_env()
     logger = logging.getLogger(LOGGER_NAME)
-    logger.setLevel(LOGGING_LEVEL)
     logger.debug("> main")
 
     applicant_info = os.getenv("APPLICANT_ID", "").strip().upper()
     while not applicant_info:
         applicant_info = input("Enter applicant's full name or passport: ").strip().upper()
 
+    controller = None
+    control_port = os.getenv("CONTROL_PORT", "").strip()
+    if control_port:
+        controller = Controller()
+        start_control_server(controller, int(control_port))
+
+    if args.asyncio:
+        sys.exit(asyncio.run(AsyncRuntime(controller).run(config, config_loader, applicant_info)))
+
     while True:
         logger.info("=" * 80)
         logger.info("/ Initiating new instance at %s", datetime.datetime.now())
-        scheduler = schedule.Scheduler()
+        config = config_loader.reload_if_changed() or config
+        scheduler = create_scheduler(config, config_loader, controller)
         try:
             scheduler.run_reschedule_suite(applicant_info=applicant_info)
         except Exception as err:
-            logger.error(str(err), exc_info=err)
-            try:
-                logger.info("... Closing browser.")
-                scheduler.driver.close()
-            except Exception as close_err:
-                logger.warning("! Failed to close browser: %s", str(close_err))
-        logger.info("... Hibernating at %s", datetime.datetime.now())
-        hibernate()
+            close_failed_session(scheduler, err)
+
+        # Keep the settings reloaded during the session
+        config = scheduler.config
+        if not (controller and controller.is_draining):
+            logger.info("... Hibernating at %s", datetime.datetime.now())
+            if controller:
+                controller.wait(get_sleep_duration(*config.hibernate_bounds))
+            else:
+                rand_sleep(*config.hibernate_bounds)
+
+        if controller and controller.is_draining:
+            logger.info("... Drained, exiting at %s", datetime.datetime.now())
+            quit_browser(scheduler)
+            break
@@ -0,0 +1,5 @@
+"""Microbenchmarks for the scheduler hot paths.
+
+Run them with `python -m autovisa.benchmarks`.
+"""
+from autovisa.benchmarks.runner import BENCHMARKS, benchmark
@@ -0,0 +1,7 @@
+"""Run the benchmarks from the command line."""
+import sys
+
+from autovisa.benchmarks.runner import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""Benchmarks for decoding large captured days payloads."""
+import gzip
+import itertools
+
+from autovisa.benchmarks.bench_parsing import make_days_request
+from autovisa.benchmarks.runner import benchmark
+from autovisa.src.constants import TIME_PREFETCH_DATES
+from autovisa.src.decoding import iter_json_items, load_json_response
+from autovisa.src.utils import get_dict_response
+
+N_DAYS = 50000
+
+
+def make_gzip_request(n_days=N_DAYS):
+    request = make_days_request(n_days)
+    request.response.body = gzip.compress(request.response.body)
+    request.response.headers = {"Content-Encoding": "gzip"}
+    return request
+
+
+def read_leading_dates(response) -> list:
+    """What the scheduler decodes when the whole list is not shared."""
+    items = itertools.islice(iter_json_items(response), TIME_PREFETCH_DATES)
+    return [day["date"] for day in items]
+
+
+@benchmark("decoding.get_dict_response.50k_days")
+def bench_get_dict_response():
+    request = make_days_request(N_DAYS)
+    return lambda: get_dict_response(request)
+
+
+@benchmark("decoding.get_dict_response.50k_days.gzip")
+def bench_get_dict_response_gzip():
+    request = make_gzip_request()
+    return lambda: get_dict_response(request)
+
+
+@benchmark("decoding.load_json_response.50k_days.gzip")
+def bench_load_json_response_gzip():
+    request = make_gzip_request()
+    return lambda: load_json_response(request.response)
+
+
+@benchmark("decoding.leading_dates.50k_days")
+def bench_leading_dates():
+    request = make_days_request(N_DAYS)
+    return lambda: read_leading_dates(request.response)
+
+
+@benchmark("decoding.leading_dates.50k_days.gzip")
+def bench_leading_dates_gzip():
+    request = make_gzip_request()
+    return lambda: read_leading_dates(request.response)
@@ -0,0 +1,24 @@
+"""Benchmarks for appointment parsing in each supported locale."""
+from autovisa.benchmarks.bench_parsing import StaticElement
+from autovisa.benchmarks.runner import benchmark
+from autovisa.src.appointment import Appointment
+from autovisa.src.locales import get_locale_pack
+
+ADDRESS_TEXTS = {
+    "en-ca": "Consular Appointment: 21 November, 2023, 11:15 Toronto local time at Toronto",
+    "es-mx": "Cita Consular: 21 noviembre, 2023, 11:15 Monterrey hora local en Monterrey",
+    "fr-ca": "Rendez-vous consulaire : 21 février, 2024, 11:15 Montréal heure locale",
+    "pt-br": "Agendamento Consular: 21 de março de 2024, 11:15 Brasília horário local",
+}
+
+
+def register(code: str, text: str):
+    @benchmark(f"locales.{code}.get_address_from_element")
+    def bench():
+        locale_pack = get_locale_pack(code)
+        element = StaticElement(text)
+        return lambda: Appointment.get_address_from_element(element, locale_pack)
+
+
+for locale_code, address_text in ADDRESS_TEXTS.items():
+    register(locale_code, address_text)
@@ -0,0 +1,38 @@
+"""Benchmarks for filling the sign-in form, typed or in one go."""
+import os
+
+from autovisa.benchmarks.runner import benchmark
+from autovisa.src.fake_driver import FakeDriver
+from autovisa.src.schedule import Scheduler
+
+SNAPSHOT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "tests", "fixtures", "site"
+)
+LOGIN_PATH = "/en-ca/niv/users/sign_in"
+EMAIL = "applicant.name@example.com"
+PASSWORD = "correct-horse-battery-staple"
+
+
+def make_scheduler() -> Scheduler:
+    """Build a Scheduler on the recorded sign-in page, without launching a browser."""
+    scheduler = Scheduler.__new__(Scheduler)
+    scheduler.driver = FakeDriver.from_snapshot_dir(SNAPSHOT_DIR)
+    return scheduler
+
+
+def bench_login_form(fill_form):
+    def run():
+        fill_form.__self__.driver.get(LOGIN_PATH)
+        fill_form(EMAIL, PASSWORD)
+
+    return run
+
+
+@benchmark("login.type_login_form")
+def bench_type_login_form():
+    return bench_login_form(make_scheduler().type_login_form)
+
+
+@benchmark("login.fill_login_form")
+def bench_fill_login_form():
+    return bench_login_form(make_scheduler().fill_login_form)
@@ -0,0 +1,111 @@
+"""Benchmarks for page parsing and date decision paths."""
+import datetime
+import json
+
+from autovisa.benchmarks.runner import benchmark
+from autovisa.src.appointment import Appointment
+from autovisa.src.fake_driver import FakeRequest, FakeResponse
+from autovisa.src.locales import get_locale_pack
+from autovisa.src.schedule import Scheduler
+from autovisa.src.utils import get_dict_response, get_month_int
+
+ADDRESS_TEXT = (
+    "Consular Appointment: 21 November, 2023, 11:15 Toronto local time at Toronto"
+)
+MONTH_NAMES = (
+    "January", "february", "MARCH", "April", "May", "June", "July", "August",
+    "September", "October", "November", "December",
+)
+N_DAYS = 5000
+N_CAPTURED_REQUESTS = 20000
+
+
+class StaticElement:
+    """Element returning fixed text, so only the parsing is measured."""
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def find_element(self, by, value):
+        return self
+
+
+def make_days_request(n_days=N_DAYS) -> FakeRequest:
+    start = datetime.date(2024, 1, 1)
+    days = [
+        {"date": (start + datetime.timedelta(days=offset)).isoformat(), "business_day": True}
+        for offset in range(n_days)
+    ]
+    return FakeRequest(
+        "https://ais.example.com/en-ca/niv/schedule/1/appointment/days/94.json",
+        FakeResponse(200, json.dumps(days).encode(), {"Content-Encoding": "identity"}),
+    )
+
+
+def make_scheduler() -> Scheduler:
+    """Build a Scheduler without launching a browser."""
+    scheduler = Scheduler.__new__(Scheduler)
+    scheduler.current_appointment = Appointment(21, 11, 2026, "11:15", "Toronto")
+    return scheduler
+
+
+@benchmark("appointment.get_address_from_element")
+def bench_get_address_from_element():
+    element = StaticElement(ADDRESS_TEXT)
+    return lambda: Appointment.get_address_from_element(element)
+
+
+@benchmark("appointment.address_re_pattern")
+def bench_address_re_pattern():
+    address_re = get_locale_pack().address_re
+    return lambda: address_re.findall(ADDRESS_TEXT)
+
+
+@benchmark("utils.get_month_int")
+def bench_get_month_int():
+    def run():
+        for month_name in MONTH_NAMES:
+            get_month_int(month_name)
+
+    return run
+
+
+@benchmark("utils.get_dict_response.5k_days")
+def bench_get_dict_response():
+    request = make_days_request()
+    return lambda: get_dict_response(request)
+
+
+@benchmark("scheduler.validate_candidate")
+def bench_validate_candidate():
+    scheduler = make_scheduler()
+    start = datetime.date(2023, 1, 1)
+    candidates = [
+        (start + datetime.timedelta(days=offset)) for offset in range(0, 1460, 7)
+    ]
+
+    def run():
+        for candidate in candidates:
+            scheduler.validate_candidate(candidate, "", "Toronto")
+
+    return run
+
+
+@benchmark("scheduler.find_json_request.20k_requests")
+def bench_find_json_request():
+    scheduler = make_scheduler()
+    requests = [
+        FakeRequest(
+            f"https://ais.example.com/assets/application-{index}.js",
+            FakeResponse(200, b"", {}),
+        )
+        for index in range(N_CAPTURED_REQUESTS)
+    ]
+    requests.append(make_days_request(1))
+
+    class CapturingDriver:
+        pass
+
+    scheduler.driver = CapturingDriver()
+    scheduler.driver.requests = requests
+    return lambda: scheduler.find_json_request("Toronto")
@@ -0,0 +1,40 @@
+"""Benchmarks for replaying recorded availability."""
+import datetime
+import random
+
+from autovisa.benchmarks.runner import benchmark
+from autovisa.src.observations import Observation
+from autovisa.src.report import build_report
+from autovisa.src.simulator import Policy, Timeline, simulate
+
+N_DAYS = 30
+READING_INTERVAL = 300
+CURRENT_DATE = datetime.date(2024, 6, 1)
+
+
+def make_timeline(n_days=N_DAYS, facility_ids=("94", "95")) -> Timeline:
+    """Readings every few minutes, with a rare better date in each facility."""
+    rng = random.Random(0)
+    start = datetime.date(2024, 1, 1)
+    observations = []
+    for facility_id in facility_ids:
+        for observed_at in range(0, n_days * 86400, READING_INTERVAL):
+            offset = 20 if rng.random() < 0.01 else rng.randint(160, 200)
+            first = start + datetime.timedelta(days=offset + observed_at // 86400)
+            observations.append(Observation(
+                facility_id, facility_id, float(observed_at), "", (first.isoformat(),)
+            ))
+    return Timeline(observations)
+
+
+@benchmark("simulator.simulate.30_days")
+def bench_simulate():
+    timeline = make_timeline()
+    policy = Policy("default", ("94", "95"))
+    return lambda: simulate(timeline, policy, CURRENT_DATE)
+
+
+@benchmark("report.build_report.30_days")
+def bench_build_report():
+    timeline = make_timeline()
+    return lambda: build_report(timeline)
@@ -0,0 +1,153 @@
+"""Measure how the scheduler copes with an unreliable site.
+
+Run with ``python -m autovisa.benchmarks.resilience``. Each fault profile
+replays a few hours of checks against the recorded site snapshot on a virtual
+clock, restarting the session after a failure the way ``python -m autovisa``
+does, and reports how long recovery took and how many checks were lost
+compared with a fault-free run.
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import statistics
+import typing as t
+from collections import Counter
+from unittest.mock import patch
+
+from autovisa.src.appointment import Appointment
+from autovisa.src.config import Config
+from autovisa.src.constants import LOGGER_NAME
+from autovisa.src.faults import FAULT_PROFILES, FaultProfile, FaultyDriver, VirtualClock
+from autovisa.src.schedule import Scheduler
+from autovisa.src.utils import get_sleep_duration
+
+SNAPSHOT_DIR = os.path.join(os.path.dirname(__file__), "..", "tests", "fixtures", "site")
+DEFAULT_HORIZON_S = 6 * 3600
+DEFAULT_SEED = 0
+# Sooner than every recorded date, so the checks never commit
+CURRENT_APPOINTMENT = Appointment(1, 1, 2023, "08:00", "Toronto")
+CREDENTIALS = ("applicant@example.com", "password")
+
+
+def start_session(driver: FaultyDriver) -> Scheduler:
+    """Build a scheduler on the given driver, on its sign-in page."""
+    launcher = type("FaultInjectedScheduler", (Scheduler,), {"create_driver": lambda self: driver})
+    scheduler = launcher()
+    # Keep the run self-contained whatever the environment configures
+    scheduler.observation_store = None
+    scheduler.facility_tabs = None
+    scheduler.current_appointment = CURRENT_APPOINTMENT
+    scheduler.navigate_login_page()
+    return scheduler
+
+
+def run_profile(
+    profile: FaultProfile, horizon_s=DEFAULT_HORIZON_S, seed=DEFAULT_SEED,
+    snapshot_dir=SNAPSHOT_DIR, config: t.Optional[Config] = None
+) -> dict:
+    """Check availability until the virtual horizon, counting checks and failures.
+
+    A failed check ends the session: after hibernating, a new browser signs in
+    again. Recovery time runs from the first failure to the next good check.
+    """
+    config = config or Config()
+    clock = VirtualClock()
+    # The scheduler's own delays draw from the global generator
+    random.seed(seed)
+    rng = random.Random(seed)
+    checks = 0
+    sessions = 0
+    faults = Counter()
+    errors = Counter()
+    recoveries = []
+    failed_at = None
+
+    site_url = "https://ais.example.com"
+    with clock.patched(), patch.dict("os.environ", {"BASE_URL": site_url}), \
+            patch("autovisa.src.schedule.get_credentials", return_value=CREDENTIALS):
+        while clock.now < horizon_s:
+            sessions += 1
+            driver = FaultyDriver.from_snapshot_dir(
+                snapshot_dir, profile=profile, clock=clock, seed=rng.randrange(2 ** 32)
+            )
+            try:
+                scheduler = start_session(driver)
+                scheduler.apply_config(config)
+                scheduler.get_best_date()
+                while True:
+                    checks += 1
+                    if failed_at is not None:
+                        recoveries.append(clock.now - failed_at)
+                        failed_at = None
+                    if clock.now >= horizon_s:
+                        break
+                    clock.sleep(get_sleep_duration(*config.sleep_bounds, rng=rng))
+                    scheduler.refresh_availability()
+                    scheduler.get_best_date()
+            except Exception as err:
+                errors[type(err).__name__] += 1
+                if failed_at is None:
+                    failed_at = clock.now
+                clock.sleep(get_sleep_duration(*config.hibernate_bounds, rng=rng))
+            finally:
+                faults.update(driver.faults)
+
+    return {
+        "checks": checks,
+        "sessions": sessions,
+        "failures": sum(errors.values()),
+        "errors": dict(errors),
+        "faults": dict(faults),
+        "recoveries": len(recoveries),
+        "mean_recovery_s": statistics.mean(recoveries) if recoveries else None,
+        "max_recovery_s": max(recoveries) if recoveries else None,
+        # Still failing at the horizon
+        "unrecovered": failed_at is not None,
+    }
+
+
+def run_resilience_benchmarks(
+    names: t.Iterable[str] = tuple(FAULT_PROFILES), horizon_s=DEFAULT_HORIZON_S,
+    seed=DEFAULT_SEED, snapshot_dir=SNAPSHOT_DIR
+) -> dict:
+    """Report each profile, with its coverage relative to the clean profile."""
+    clean = run_profile(FAULT_PROFILES["clean"], horizon_s, seed, snapshot_dir)
+    results = {}
+    for name in names:
+        result = clean if name == "clean" else run_profile(
+            FAULT_PROFILES[name], horizon_s, seed, snapshot_dir
+        )
+        result["coverage"] = result["checks"] / clean["checks"] if clean["checks"] else None
+        results[name] = result
+    return {"horizon_s": horizon_s, "seed": seed, "results": results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m autovisa.benchmarks.resilience",
+        description="Measure recovery time and lost checks under injected site faults.",
+    )
+    parser.add_argument(
+        "--profiles", nargs="+", choices=list(FAULT_PROFILES), default=list(FAULT_PROFILES)
+    )
+    parser.add_argument("--hours", type=float, default=DEFAULT_HORIZON_S / 3600)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--snapshot-dir", default=SNAPSHOT_DIR)
+    parser.add_argument("--output", help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    logging.getLogger(LOGGER_NAME).setLevel(logging.CRITICAL)
+    report = run_resilience_benchmarks(
+        args.profiles, args.hours * 3600, args.seed, args.snapshot_dir
+    )
+    text = json.dumps(report, indent=2, sort_keys=True)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
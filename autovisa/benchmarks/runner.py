@@ -0,0 +1,133 @@
+"""Run registered benchmarks and compare them against a stored baseline."""
+import argparse
+import importlib
+import json
+import logging
+import os
+import platform
+import sys
+import timeit
+import typing as t
+
+from autovisa.src.constants import LOGGER_NAME
+from autovisa.src.fake_driver import instant_delays
+
+BENCHMARKS = {}
+
+BENCHMARK_MODULES = (
+    "autovisa.benchmarks.bench_parsing",
+    "autovisa.benchmarks.bench_locales",
+    "autovisa.benchmarks.bench_simulator",
+    "autovisa.benchmarks.bench_decoding",
+    "autovisa.benchmarks.bench_login",
+)
+
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_REPEAT = 5
+
+
+def benchmark(name: str):
+    """Register a benchmark.
+
+    The decorated function does the setup and returns the callable to time.
+    """
+    def decorator(function):
+        BENCHMARKS[name] = function
+        return function
+
+    return decorator
+
+
+def load_benchmarks():
+    for module_name in BENCHMARK_MODULES:
+        importlib.import_module(module_name)
+
+
+def time_callable(function: t.Callable, repeat=DEFAULT_REPEAT) -> dict:
+    """Return the best time per call, in seconds, over several runs."""
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number))
+    return {"per_call_s": best / number, "number": number, "repeat": repeat}
+
+
+def run_benchmarks(names: t.Optional[t.Iterable[str]] = None, repeat=DEFAULT_REPEAT) -> dict:
+    """Run the selected benchmarks (all by default)."""
+    load_benchmarks()
+    selected = sorted(names or BENCHMARKS)
+    results = {}
+    with instant_delays():
+        for name in selected:
+            results[name] = time_callable(BENCHMARKS[name](), repeat=repeat)
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare(report: dict, baseline: dict, threshold=DEFAULT_THRESHOLD) -> list:
+    """Return the benchmarks slower than their baseline by more than `threshold`."""
+    regressions = []
+    for name, result in report["results"].items():
+        expected = baseline.get("results", {}).get(name)
+        if not expected:
+            continue
+        ratio = result["per_call_s"] / expected["per_call_s"]
+        if ratio > 1 + threshold:
+            regressions.append({
+                "name": name,
+                "baseline_s": expected["per_call_s"],
+                "current_s": result["per_call_s"],
+                "ratio": ratio,
+            })
+    return regressions
+
+
+def load_baseline(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as baseline_file:
+        return json.load(baseline_file)
+
+
+def save_report(report: dict, path: str):
+    with open(path, "w") as report_file:
+        json.dump(report, report_file, indent=2, sort_keys=True)
+        report_file.write("\n")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("names", nargs="*", help="benchmarks to run (default: all)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown over the baseline, as a fraction")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store the results as the new baseline")
+    parser.add_argument("--list", action="store_true", help="list benchmarks and exit")
+    args = parser.parse_args(argv)
+    # Keep the report readable; the scheduler logs every decision at INFO
+    logging.getLogger(LOGGER_NAME).setLevel(logging.WARNING)
+
+    if args.list:
+        load_benchmarks()
+        print("\n".join(sorted(BENCHMARKS)))
+        return 0
+
+    report = run_benchmarks(args.names, repeat=args.repeat)
+    if args.save_baseline:
+        baseline = load_baseline(args.baseline)
+        baseline.update({key: value for key, value in report.items() if key != "results"})
+        baseline.setdefault("results", {}).update(report["results"])
+        save_report(baseline, args.baseline)
+
+    report["regressions"] = compare(report, load_baseline(args.baseline), args.threshold)
+    if args.output:
+        save_report(report, args.output)
+    json.dump(report, sys.stdout, indent=2, sort_keys=True)
+    sys.stdout.write("\n")
+    return 1 if report["regressions"] else 0
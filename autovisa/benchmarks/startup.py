@@ -0,0 +1,93 @@
+"""Time browser launch and first page load for each webdriver backend.
+
+Run with ``python -m autovisa.benchmarks.startup``. Unlike the microbenchmarks,
+this starts real browsers, so backends that cannot be resolved on this host
+are skipped.
+"""
+import argparse
+import json
+import logging
+import time
+import typing as t
+
+from autovisa.src.constants import LOGGER_NAME
+from autovisa.src.drivers import BACKENDS, get_backend_class, resolve_driver_binary
+from autovisa.src.webdriver import WebDriver
+
+DEFAULT_URL = "data:text/html,<title>autovisa</title><p>ready</p>"
+DEFAULT_REPEAT = 3
+
+
+def get_skip_reason(backend: str) -> t.Optional[str]:
+    """Return why a backend cannot be launched here, if it cannot."""
+    binary = resolve_driver_binary(backend)
+    if not binary.driver_path:
+        return "driver could not be resolved"
+    return None
+
+
+def time_startup(backend: str, url=DEFAULT_URL) -> dict:
+    """Launch one browser, load a page and close it."""
+    driver_class = get_backend_class(backend)
+    launcher = type(f"{backend.title()}WebDriver", (WebDriver,), {"_WEBDRIVER_CLASS": driver_class})
+    start = time.perf_counter()
+    web_driver = launcher()
+    launched = time.perf_counter()
+    try:
+        # get() returns once the page has loaded
+        web_driver.driver.get(url)
+        loaded = time.perf_counter()
+    finally:
+        web_driver.driver.quit()
+    return {"launch_s": launched - start, "time_to_first_page_s": loaded - start}
+
+
+def run_startup_benchmarks(
+    backends: t.Iterable[str] = tuple(BACKENDS), url=DEFAULT_URL, repeat=DEFAULT_REPEAT
+) -> dict:
+    """Report the best of `repeat` startups per backend, or why it was skipped."""
+    results = {}
+    for backend in backends:
+        resolve_start = time.perf_counter()
+        reason = get_skip_reason(backend)
+        resolve_s = time.perf_counter() - resolve_start
+        if reason:
+            results[backend] = {"skipped": reason}
+            continue
+
+        try:
+            runs = [time_startup(backend, url) for _ in range(repeat)]
+        except Exception as err:
+            results[backend] = {"skipped": f"launch failed: {err}"}
+            continue
+        results[backend] = {
+            "resolve_s": resolve_s,
+            "launch_s": min(run["launch_s"] for run in runs),
+            "time_to_first_page_s": min(run["time_to_first_page_s"] for run in runs),
+            "repeat": repeat,
+        }
+    return {"url": url, "results": results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m autovisa.benchmarks.startup",
+        description="Measure browser time-to-first-page per webdriver backend.",
+    )
+    parser.add_argument("--backends", nargs="+", choices=list(BACKENDS), default=list(BACKENDS))
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--output", help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    logging.getLogger(LOGGER_NAME).setLevel(logging.WARNING)
+    report = run_startup_benchmarks(args.backends, args.url, args.repeat)
+    text = json.dumps(report, indent=2, sort_keys=True)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,17 @@
 import datetime
-import re
-from functools import cached_property
+import typing as t
 
 from selenium.webdriver.common.by import By
 
-from autovisa.src.utils import filter_out_empty, get_month_int
+from autovisa.src.locales import LocalePack, get_locale_pack
+from autovisa.src.utils import filter_out_empty
 
 
 class Appointment:
     """Class to represent an appointment information."""
-    date = None
-    time = None
-    city = None
-    applicant_name = None
-    passport = None
-    ds_160 = None
-    element = None
+    __slots__ = ("date", "time", "city", "applicant_name", "passport", "link")
 
     NO_DATE_REPR = "<No date>"
-    ADDRESS_RE_PATTERN = r"\s*(\d+)\s*([a-zA-Z]+)\s*,?\s*(\d+)\s*,?\s*(\d\d:\d\d)\s*([a-zA-Z]+).*"
-    INFO_RE_PATTERN = r"([a-zA-Z'\- ]+)\s+(\w{2}\d{6})"
 
     def __init__(
         self, day, month, year, time, city, applicant_name="",
@@ -45,34 +37,51 @@ class Appointment:
         """Return formatted date."""
         return self.date.strftime("%Y-%m-%d") if self.date else self.NO_DATE_REPR
 
-    @cached_property
+    @property
     def applicant_info_list(self) -> list:
         return filter_out_empty([self.applicant_name, self.passport])
 
+    def to_compact(self) -> list:
+        """Return the appointment as a JSON-serializable list."""
+        return [
+            self.date_repr, self.time, self.city, self.applicant_name, self.passport, self.link
+        ]
+
+    @classmethod
+    def from_compact(cls, data: t.Sequence):
+        """Create an Appointment from the output of `to_compact`."""
+        date_repr, time, city, applicant_name, passport, link = data
+        date = datetime.date.fromisoformat(date_repr)
+        return cls(date.day, date.month, date.year, time, city, applicant_name, passport, link)
+
     def match_applicant(self, applicant_info: str) -> bool:
         """Return whether applicant matches any info in this appointment."""
         return applicant_info in self.applicant_info_list
 
     @classmethod
-    def get_address_from_element(cls, base_element) -> tuple:
+    def get_address_from_element(
+            cls, base_element, locale_pack: t.Optional[LocalePack] = None
+    ) -> tuple:
         """Parse address from element in the following format:
 
             <p>Consular Appointment: 21 November, 2023, 11:15 Toronto
                local time at Toronto</p>
        """
+        locale_pack = locale_pack or get_locale_pack()
         address_element = base_element.find_element(By.CSS_SELECTOR, ".consular-appt")
         # Parse address and time
         day, month_name, year, time, city = [
-            result.strip() for result in re.findall(
-                cls.ADDRESS_RE_PATTERN,
+            result.strip() for result in locale_pack.address_re.findall(
                 address_element.text
             )[0]
         ]
-        month = get_month_int(month_name)
+        month = locale_pack.get_month_int(month_name)
         return int(day), month, int(year), time, city
 
     @classmethod
-    def get_applicant_from_element(cls, base_element) -> tuple:
+    def get_applicant_from_element(
+            cls, base_element, locale_pack: t.Optional[LocalePack] = None
+    ) -> tuple:
         """Parse applicant information from table element in the following format:
 
             <tr>
@@ -80,17 +89,15 @@ class Appointment:
                 <td>XY123456</td>
             </tr>
        """
+        locale_pack = locale_pack or get_locale_pack()
         row_element = base_element.find_element(By.CSS_SELECTOR, "table > tbody > tr")
-        return re.findall(
-            cls.INFO_RE_PATTERN,
-            row_element.text
-        )[0]
+        return locale_pack.info_re.findall(row_element.text)[0]
 
     @classmethod
-    def create_from_element(cls, base_element):
+    def create_from_element(cls, base_element, locale_pack: t.Optional[LocalePack] = None):
         """Create an Appointment instance from HTML element."""
-        day, month, year, time, city = cls.get_address_from_element(base_element)
-        name, passport = cls.get_applicant_from_element(base_element)
+        day, month, year, time, city = cls.get_address_from_element(base_element, locale_pack)
+        name, passport = cls.get_applicant_from_element(base_element, locale_pack)
         link = base_element.find_element(
             By.CSS_SELECTOR, "a.button.primary.small"
         ).get_attribute("href")
@@ -0,0 +1,90 @@
+"""Scheduler state saved between phases, so a restart can skip the slow UI path."""
+import json
+import logging
+import os
+import time
+import typing as t
+
+from autovisa.src.appointment import Appointment
+from autovisa.src.constants import CHECKPOINT_MAX_AGE, LOGGER_NAME
+from autovisa.src.utils import get_cache_dir
+
+logger = logging.getLogger(LOGGER_NAME)
+
+CHECKPOINT_FILE = "checkpoint.json"
+CHECKPOINT_VERSION = 1
+
+
+class Checkpoint(t.NamedTuple):
+    applicant_info: str
+    appointments: t.Tuple[Appointment, ...]
+    # Position in `appointments` of the one being rescheduled
+    current_index: int = 0
+    appointment_list_url: t.Optional[str] = None
+    reschedule_url: t.Optional[str] = None
+    observations: t.Optional[dict] = None
+    # Session cookies, so the restored pages load without logging in again
+    cookies: t.Tuple[dict, ...] = ()
+    saved_at: float = 0.0
+
+    def to_dict(self) -> dict:
+        data = self._asdict()
+        data["appointments"] = [appointment.to_compact() for appointment in self.appointments]
+        data["cookies"] = list(self.cookies)
+        data["version"] = CHECKPOINT_VERSION
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        if data.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version: {data.get('version')}")
+        fields = {name: data[name] for name in cls._fields if name in data}
+        fields["appointments"] = tuple(
+            Appointment.from_compact(item) for item in data["appointments"]
+        )
+        fields["cookies"] = tuple(data.get("cookies") or ())
+        return cls(**fields)
+
+
+def get_checkpoint_path(cache_dir: t.Optional[str] = None) -> str:
+    return os.path.join(cache_dir or get_cache_dir(), CHECKPOINT_FILE)
+
+
+def save_checkpoint(checkpoint: Checkpoint, path: str):
+    """Replace the checkpoint file atomically, readable by the owner only."""
+    data = json.dumps(checkpoint.to_dict(), separators=(",", ":"))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as checkpoint_file:
+        checkpoint_file.write(data)
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(
+    path: str, max_age=CHECKPOINT_MAX_AGE, now: t.Optional[float] = None
+) -> t.Optional[Checkpoint]:
+    """Return the saved checkpoint, unless missing, unreadable or too old."""
+    try:
+        with open(path) as checkpoint_file:
+            checkpoint = Checkpoint.from_dict(json.load(checkpoint_file))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError) as err:
+        logger.warning("! Ignoring unreadable checkpoint: %s", str(err))
+        return None
+
+    now = time.time() if now is None else now
+    if now - checkpoint.saved_at > max_age:
+        logger.info("... Ignoring checkpoint saved %d s ago.", now - checkpoint.saved_at)
+        return None
+    return checkpoint
+
+
+def clear_checkpoint(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as err:
+        logger.warning("! Failed to remove checkpoint: %s", str(err))
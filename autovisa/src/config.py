@@ -0,0 +1,198 @@
+"""Runtime configuration, read from a file, the environment and the command line.
+
+The running scheduler re-reads it between checks, so facilities, date windows
+and sleep bounds can be changed without restarting the browser.
+"""
+import datetime
+import json
+import logging
+import os
+import typing as t
+
+from dotenv import dotenv_values
+
+from autovisa.src.constants import (
+    ALLOWED_CITY_IDS, EXCLUDE_DATE_END, EXCLUDE_DATE_START, HIBERNATE_BOUNDS, LOGGER_NAME,
+    LONG_SLEEP_BOUNDS
+)
+from autovisa.src.exceptions import ConfigError
+from autovisa.src.utils import clear_env_caches
+
+logger = logging.getLogger(LOGGER_NAME)
+
+# Environment variables read for each setting
+ENV_NAMES = {
+    "allowed_city_ids": "ALLOWED_CITY_IDS",
+    "exclude_date_start": "EXCLUDE_DATE_START",
+    "exclude_date_end": "EXCLUDE_DATE_END",
+    "sleep_bounds": "SLEEP_BOUNDS",
+    "hibernate_bounds": "HIBERNATE_BOUNDS",
+}
+
+
+class Config(t.NamedTuple):
+    allowed_city_ids: t.Tuple[str, ...] = ALLOWED_CITY_IDS
+    # Dates within this range are never picked; None leaves that end open
+    exclude_date_start: t.Optional[datetime.date] = EXCLUDE_DATE_START
+    exclude_date_end: t.Optional[datetime.date] = EXCLUDE_DATE_END
+    sleep_bounds: t.Tuple[int, int] = LONG_SLEEP_BOUNDS
+    hibernate_bounds: t.Tuple[int, int] = HIBERNATE_BOUNDS
+
+    def is_excluded(self, date: datetime.date) -> bool:
+        if self.exclude_date_start is None and self.exclude_date_end is None:
+            return False
+        return (
+            (self.exclude_date_start is None or self.exclude_date_start <= date)
+            and (self.exclude_date_end is None or date <= self.exclude_date_end)
+        )
+
+
+def parse_bounds(value: str) -> t.Tuple[int, int]:
+    """Parse sleep bounds written as "MIN-MAX" seconds."""
+    min_sleep, _, max_sleep = value.partition("-")
+    return int(min_sleep), int(max_sleep or min_sleep)
+
+
+def parse_value(name: str, value):
+    """Convert a setting from its file, environment or command line form."""
+    if name == "allowed_city_ids":
+        ids = value.split(",") if isinstance(value, str) else value
+        return tuple(str(city_id).strip() for city_id in ids if str(city_id).strip())
+    if name in ("exclude_date_start", "exclude_date_end"):
+        if value in (None, ""):
+            return None
+        return value if isinstance(value, datetime.date) else datetime.date.fromisoformat(value)
+    if name in ("sleep_bounds", "hibernate_bounds"):
+        if isinstance(value, str):
+            return parse_bounds(value)
+        min_sleep, max_sleep = value
+        return int(min_sleep), int(max_sleep)
+    raise ConfigError(f"Unknown setting: {name}")
+
+
+def validate_config(config: Config) -> Config:
+    # Facilities may be given by id or by name; the names are only known once
+    # the form is read, where FacilityCatalog.resolve reports the unknown ones
+    if not config.allowed_city_ids:
+        raise ConfigError("allowed_city_ids must list at least one facility id or name")
+    if (
+        config.exclude_date_start and config.exclude_date_end
+        and config.exclude_date_start > config.exclude_date_end
+    ):
+        raise ConfigError("exclude_date_start is after exclude_date_end")
+    for name in ("sleep_bounds", "hibernate_bounds"):
+        min_sleep, max_sleep = getattr(config, name)
+        if not 0 <= min_sleep <= max_sleep:
+            raise ConfigError(f"Invalid {name}: {min_sleep}-{max_sleep}")
+    return config
+
+
+def build_config(
+    file_data: t.Optional[dict] = None, env: t.Optional[t.Mapping[str, str]] = None,
+    overrides: t.Optional[dict] = None
+) -> Config:
+    """Merge the sources over the defaults; the command line wins over the
+    environment, which wins over the file.
+    """
+    values = {}
+    sources = (
+        file_data or {},
+        {name: (env or {}).get(env_name) for name, env_name in ENV_NAMES.items()},
+        overrides or {},
+    )
+    for source in sources:
+        for name, value in source.items():
+            if value is None:
+                continue
+            if name not in Config._fields:
+                raise ConfigError(f"Unknown setting: {name}")
+            try:
+                values[name] = parse_value(name, value)
+            except (TypeError, ValueError) as err:
+                raise ConfigError(f"Invalid {name}: {value!r} ({err})") from None
+    return validate_config(Config(**values))
+
+
+def read_config_file(path: t.Optional[str]) -> dict:
+    if not path:
+        return {}
+    try:
+        with open(path) as config_file:
+            data = json.load(config_file)
+    except (OSError, ValueError) as err:
+        raise ConfigError(f"Cannot read {path}: {err}") from None
+    if not isinstance(data, dict):
+        raise ConfigError(f"{path} must hold a JSON object")
+    return data
+
+
+def get_mtime(path: t.Optional[str]) -> t.Optional[float]:
+    try:
+        return os.stat(path).st_mtime if path else None
+    except OSError:
+        return None
+
+
+def apply_dotenv(path: t.Optional[str], process_env_names: t.Collection[str]):
+    """Put the variables of a dotenv file in the environment, except the ones the
+    process was started with.
+    """
+    if path:
+        for name, value in dotenv_values(path).items():
+            if name not in process_env_names and value is not None:
+                os.environ[name] = value
+    clear_env_caches()
+
+
+class ConfigLoader:
+    """Build the configuration and rebuild it when its files change.
+
+    Variables from the dotenv file are put in the environment, without
+    replacing the ones the process was started with, and the helpers caching
+    environment lookups are cleared on every reload.
+    """
+
+    def __init__(
+        self, path: t.Optional[str] = None, dotenv_path: t.Optional[str] = None,
+        overrides: t.Optional[dict] = None,
+        process_env_names: t.Optional[t.Collection[str]] = None
+    ):
+        self.path = path
+        self.dotenv_path = dotenv_path
+        self.overrides = overrides or {}
+        # Taken before the dotenv file was first applied, when that happened earlier
+        if process_env_names is None:
+            process_env_names = os.environ
+        self.process_env_names = set(process_env_names)
+        self.mtimes = None
+        self.config: t.Optional[Config] = None
+
+    def get_mtimes(self) -> tuple:
+        return get_mtime(self.path), get_mtime(self.dotenv_path)
+
+    def load(self) -> Config:
+        mtimes = self.get_mtimes()
+        apply_dotenv(self.dotenv_path, self.process_env_names)
+        config = build_config(read_config_file(self.path), os.environ, self.overrides)
+        self.mtimes = mtimes
+        self.config = config
+        return config
+
+    def reload_if_changed(self) -> t.Optional[Config]:
+        """Return the new configuration if its files changed and it is valid.
+
+        An invalid change is logged and the current configuration is kept.
+        """
+        if self.get_mtimes() == self.mtimes:
+            return None
+        previous_mtimes = self.mtimes
+        try:
+            config = self.load()
+        except ConfigError as err:
+            logger.warning("! Keeping the current configuration: %s", str(err))
+            # Do not retry until the files change again
+            self.mtimes = self.get_mtimes()
+            return None
+        if previous_mtimes is not None:
+            logger.info("... Configuration reloaded: %s", config)
+        return config
@@ -1,19 +1,26 @@
 """Store default values."""
 import datetime
 import logging
+import os
 
 from selenium.webdriver.common.by import By
 from seleniumwire import undetected_chromedriver
 
 LOGGING_LEVEL = logging.INFO
 LOGGER_NAME = "autovisa"
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
 
 FALSY_STRINGS = ["", "0", "false", "no"]
 
 MIN_ACTION_SLEEP = 1
 MAX_ACTION_SLEEP = 2
 
-LOGIN_PATH = "/en-ca/niv/users/sign_in"
+LONG_SLEEP_BOUNDS = (60, 60 * 2)
+HIBERNATE_BOUNDS = (60 * 8, 60 * 16)
+
+DEFAULT_LOCALE = "en-ca"
+LOGIN_PATH_TEMPLATE = "/{locale}/niv/users/sign_in"
 
 DEFAULT_WEBDRIVER_CLASS = undetected_chromedriver.Chrome
 
@@ -38,6 +45,52 @@ CITY_NAME_ID_MAP = {
 
 MAX_REQUEST_SEARCHES = 2
 
+DEFAULT_CACHE_DIR = os.path.join("~", ".cache", "autovisa")
+FACILITY_CACHE_TTL = 60 * 60 * 24 * 7
+
+MAX_NAVIGATION_STEPS = 6
+MAX_CALENDAR_PAGES = 24
+
+# How the login form is filled: typed with human-like delays, or in one go
+LOGIN_MODE_HUMAN = "human"
+LOGIN_MODE_FAST = "fast"
+LOGIN_MODES = (LOGIN_MODE_HUMAN, LOGIN_MODE_FAST)
+# Seconds to wait for the page after signing in, in fast mode
+LOGIN_TIMEOUT = 30
+
+# Time slots are fetched ahead of the commit for this many leading dates
+TIME_PREFETCH_DATES = 3
+TIME_PREFETCH_TIMEOUT = 5
+
+# Readings shared by other processes are reused while younger than this (s)
+OBSERVATION_MAX_AGE = 45
+# Readings older than this are pruned when a scheduler opens the store, which
+# leaves the reports and simulations this much history (s)
+OBSERVATION_RETENTION = 90 * 24 * 3600
+
+# Captured bodies are decoded in chunks of this size, up to the cap (bytes)
+DECODE_CHUNK_SIZE = 16 * 1024
+MAX_RESPONSE_SIZE = 8 * 1024 * 1024
+
+# Checkpoints older than this are not resumed from (s)
+CHECKPOINT_MAX_AGE = 60 * 60 * 6
+
+CONTROL_HOST = "127.0.0.1"
+# Awaited waits look for operator commands this often (s)
+CONTROL_POLL_INTERVAL = 0.5
+
+# The asyncio runtime logs the scheduler status this often (s)
+STATUS_LOG_INTERVAL = 60 * 5
+
+# Recent events kept in memory and written out when a cycle fails
+RECORDER_CAPACITY = 500
+RECORDER_DUMP_TIMEOUT = 15
+RECORDER_MAX_DUMPS = 20
+
+MAX_DRIVER_RSS_MB = 1536
+MAX_PYTHON_RSS_MB = 512
+MEMORY_SAMPLE_HISTORY = 30
+
 # --- Constants that act as parameters --- #
 
 EXCLUDE_DATE_START = datetime.date(2023, 5, 15)
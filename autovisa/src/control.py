@@ -0,0 +1,141 @@
+"""Local control surface for a running scheduler."""
+import asyncio
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from autovisa.src.constants import CONTROL_HOST, CONTROL_POLL_INTERVAL, LOGGER_NAME
+
+logger = logging.getLogger(LOGGER_NAME)
+
+
+class Controller:
+    """Share scheduler status and operator commands between threads.
+
+    The scheduler only reacts to commands at safe points, i.e. while waiting
+    between checks, so the browser is never interrupted mid-action.
+    """
+    scheduler = None
+
+    def __init__(self):
+        self._wake = threading.Event()
+        self._resumed = threading.Event()
+        self._resumed.set()
+        self._draining = threading.Event()
+
+    @property
+    def is_paused(self) -> bool:
+        return not self._resumed.is_set()
+
+    @property
+    def is_draining(self) -> bool:
+        return self._draining.is_set()
+
+    def check_now(self):
+        """Cut the current wait short so the next check starts immediately."""
+        logger.info("... Control: check now")
+        self._resumed.set()
+        self._wake.set()
+
+    def pause(self):
+        """Hold the scheduler at its next safe point."""
+        logger.info("... Control: pause")
+        self._resumed.clear()
+
+    def resume(self):
+        """Release a paused scheduler."""
+        logger.info("... Control: resume")
+        self._resumed.set()
+
+    def drain(self):
+        """Finish the current action, then stop the scheduler for good."""
+        logger.info("... Control: drain and exit")
+        self._draining.set()
+        self._resumed.set()
+        self._wake.set()
+
+    def wait(self, duration: float) -> bool:
+        """Sleep up to `duration` seconds, then block while paused.
+
+        Return whether the wait was cut short by a command.
+        """
+        woken = self._wake.wait(duration)
+        self._wake.clear()
+        while not self._resumed.wait(1):
+            pass
+        return woken or self.is_draining
+
+    async def async_wait(self, duration: float, poll_interval=CONTROL_POLL_INTERVAL) -> bool:
+        """Awaitable counterpart of `wait`, looking for commands every `poll_interval` s."""
+        deadline = time.monotonic() + duration
+        while not self._wake.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            await asyncio.sleep(min(poll_interval, remaining))
+        woken = self._wake.is_set()
+        self._wake.clear()
+        while not self._resumed.is_set():
+            await asyncio.sleep(poll_interval)
+        return woken or self.is_draining
+
+    def status(self) -> dict:
+        """Return a JSON-serializable snapshot of the scheduler status."""
+        status = {
+            "paused": self.is_paused,
+            "draining": self.is_draining,
+            "phase": None,
+            "current_appointment": None,
+            "observations": {},
+            "metrics": {},
+        }
+        scheduler = self.scheduler
+        if scheduler is not None:
+            status.update(scheduler.get_status())
+        return status
+
+
+class ControlRequestHandler(BaseHTTPRequestHandler):
+    """Serve status on GET and accept commands on POST."""
+    COMMANDS = {
+        "/check": "check_now",
+        "/pause": "pause",
+        "/resume": "resume",
+        "/drain": "drain",
+    }
+
+    def do_GET(self):
+        if self.path.rstrip("/") not in ("", "/status"):
+            return self.send_json(404, {"error": "Not found"})
+        self.send_json(200, self.server.controller.status())
+
+    def do_POST(self):
+        command = self.COMMANDS.get(self.path.rstrip("/"))
+        if not command:
+            return self.send_json(404, {"error": "Unknown command"})
+        getattr(self.server.controller, command)()
+        self.send_json(202, {"accepted": command})
+
+    def send_json(self, status_code: int, payload: dict):
+        body = json.dumps(payload, default=str).encode()
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("> control %s", format % args)
+
+
+def start_control_server(controller: Controller, port: int, host=CONTROL_HOST):
+    """Serve the controller over HTTP on a daemon thread."""
+    server = ThreadingHTTPServer((host, port), ControlRequestHandler)
+    server.daemon_threads = True
+    server.controller = controller
+    thread = threading.Thread(target=server.serve_forever, name="autovisa-control", daemon=True)
+    thread.start()
+    logger.info("... Control endpoint listening on http://%s:%d", host, server.server_port)
+    return server
@@ -0,0 +1,146 @@
+"""Incremental, size-bounded decoding of captured JSON responses.
+
+Bodies are decompressed chunk by chunk and the items of a JSON array are parsed
+as they arrive, so a caller that only needs the leading items stops reading the
+rest of the payload. Whole bodies are parsed with orjson when it is installed.
+"""
+import codecs
+import itertools
+import json
+import logging
+import re
+import typing as t
+import zlib
+
+from seleniumwire.utils import decode
+
+from autovisa.src.constants import DECODE_CHUNK_SIZE, LOGGER_NAME, MAX_RESPONSE_SIZE
+from autovisa.src.exceptions import ResponseTooLargeException
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(LOGGER_NAME)
+
+JSON_BACKEND = "orjson" if orjson else "json"
+loads = orjson.loads if orjson else json.loads
+
+WHITESPACE_RE = re.compile(r"[ \t\n\r]*")
+ITEM_DECODER = json.JSONDecoder()
+
+
+def check_size(size: int, max_size: int):
+    if size > max_size:
+        raise ResponseTooLargeException(f"Response body exceeds {max_size} bytes")
+
+
+def get_decompressor(encoding: str, body: bytes):
+    """Return a zlib decompressor for the encoding, or None if zlib cannot read it."""
+    if encoding in ("gzip", "x-gzip"):
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if encoding == "deflate":
+        # Servers send either zlib-wrapped or raw deflate streams
+        wrapped = len(body) >= 2 and (body[0] & 0x0F) == 8 and (body[0] << 8 | body[1]) % 31 == 0
+        return zlib.decompressobj(zlib.MAX_WBITS if wrapped else -zlib.MAX_WBITS)
+    return None
+
+
+def iter_body_chunks(
+    response, chunk_size=DECODE_CHUNK_SIZE, max_size=MAX_RESPONSE_SIZE
+) -> t.Iterator[bytes]:
+    """Yield the decoded body of a response, decompressing only as far as it is read.
+
+    Raise ResponseTooLargeException once more than `max_size` bytes are decoded.
+    """
+    body = response.body
+    encoding = response.headers.get("Content-Encoding", "identity").strip().lower()
+    check_size(len(body), max_size)
+    if encoding in ("", "identity"):
+        for start in range(0, len(body), chunk_size):
+            yield body[start:start + chunk_size]
+        return
+
+    decompressor = get_decompressor(encoding, body)
+    if decompressor is None:
+        # Brotli and zstd have no incremental API in selenium-wire
+        decoded = decode(body, encoding)
+        check_size(len(decoded), max_size)
+        for start in range(0, len(decoded), chunk_size):
+            yield decoded[start:start + chunk_size]
+        return
+
+    size = 0
+    pending = body
+    while pending and not decompressor.eof:
+        chunk = decompressor.decompress(pending, chunk_size)
+        pending = decompressor.unconsumed_tail
+        size += len(chunk)
+        check_size(size, max_size)
+        if chunk:
+            yield chunk
+    tail = decompressor.flush()
+    check_size(size + len(tail), max_size)
+    if tail:
+        yield tail
+
+
+def read_body(response, max_size=MAX_RESPONSE_SIZE) -> bytes:
+    return b"".join(iter_body_chunks(response, max_size=max_size))
+
+
+def load_json_response(response, max_size=MAX_RESPONSE_SIZE):
+    """Parse a whole JSON body, with the fastest backend available."""
+    return loads(read_body(response, max_size))
+
+
+def iter_json_array(chunks: t.Iterable[bytes]) -> t.Iterator:
+    """Yield the items of a top-level JSON array as soon as each is complete.
+
+    Chunks after the one closing the last item read are never pulled.
+    """
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    pos = 0
+    started = False
+    for chunk in itertools.chain(chunks, (None,)):
+        final = chunk is None
+        buffer = buffer[pos:] + text_decoder.decode(chunk or b"", final=final)
+        pos = 0
+        while True:
+            pos = WHITESPACE_RE.match(buffer, pos).end()
+            if pos == len(buffer):
+                break
+            char = buffer[pos]
+            if not started:
+                if char != "[":
+                    raise json.JSONDecodeError("Expected a JSON array", buffer, pos)
+                started = True
+                pos += 1
+            elif char == "]":
+                return
+            elif char == ",":
+                pos += 1
+            else:
+                try:
+                    item, end = ITEM_DECODER.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if final:
+                        raise
+                    # The item continues in the next chunk
+                    break
+                if (
+                    not final and char not in "{[\""
+                    and (end == len(buffer) or buffer[end] not in " \t\n\r,]")
+                ):
+                    # A number may continue in the next chunk
+                    break
+                yield item
+                pos = end
+    raise json.JSONDecodeError("Unterminated JSON array", buffer, pos)
+
+
+def iter_json_items(response, max_size=MAX_RESPONSE_SIZE) -> t.Iterator:
+    """Yield the items of a JSON array response, decoding no further than read."""
+    return iter_json_array(iter_body_chunks(response, max_size=max_size))
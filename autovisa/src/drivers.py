@@ -0,0 +1,182 @@
+"""Browser backends and resolution of their driver binaries."""
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import typing as t
+from functools import lru_cache
+
+import seleniumwire.webdriver
+import undetected_chromedriver as uc
+from seleniumwire import undetected_chromedriver
+
+from autovisa.src.constants import LOGGER_NAME
+from autovisa.src.utils import get_cache_dir
+
+logger = logging.getLogger(LOGGER_NAME)
+
+# Only the selenium-wire backends capture the requests that carry available dates
+BACKENDS = {
+    "undetected": undetected_chromedriver.Chrome,
+    "wire": seleniumwire.webdriver.Chrome,
+    "firefox": seleniumwire.webdriver.Firefox,
+}
+BACKEND_BROWSERS = {
+    "undetected": "chrome",
+    "wire": "chrome",
+    "firefox": "firefox",
+}
+DRIVER_CACHE_FILE = "drivers.json"
+VERSION_RE = re.compile(r"(\d+)\.\d+")
+
+
+class DriverBinary(t.NamedTuple):
+    """Binaries used to launch one backend; paths are None when left to selenium."""
+    backend: str
+    driver_path: t.Optional[str] = None
+    browser_path: t.Optional[str] = None
+    browser_version: t.Optional[int] = None
+    browser_mtime: float = 0.0
+
+    def is_current(self) -> bool:
+        """Return whether the binaries still exist and the browser was not updated."""
+        if not self.driver_path or not os.path.exists(self.driver_path):
+            return False
+        if not self.browser_path:
+            return True
+        try:
+            return os.stat(self.browser_path).st_mtime == self.browser_mtime
+        except OSError:
+            return False
+
+
+def get_backend_name() -> t.Optional[str]:
+    """Return the backend set in WEBDRIVER_BACKEND, if any."""
+    return os.getenv("WEBDRIVER_BACKEND", "").strip().lower() or None
+
+
+def get_backend_class(name: str):
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown webdriver backend: {name} (choose from {', '.join(BACKENDS)})"
+        ) from None
+
+
+def get_backend_for_class(driver_class) -> t.Optional[str]:
+    for name, backend_class in BACKENDS.items():
+        if backend_class is driver_class:
+            return name
+    return None
+
+
+def get_browser_version(browser_path: t.Optional[str]) -> t.Optional[int]:
+    """Read the major version of a browser binary."""
+    if not browser_path:
+        return None
+    try:
+        output = subprocess.run(
+            [browser_path, "--version"], capture_output=True, text=True, timeout=10
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = VERSION_RE.search(output)
+    return int(match.group(1)) if match else None
+
+
+def get_mtime(path: t.Optional[str]) -> float:
+    try:
+        return os.stat(path).st_mtime if path else 0.0
+    except OSError:
+        return 0.0
+
+
+def resolve_with_selenium_manager(backend: str) -> DriverBinary:
+    """Let Selenium Manager find (or download) the driver for a backend."""
+    from selenium.webdriver.common.selenium_manager import SeleniumManager
+
+    paths = SeleniumManager().binary_paths(["--browser", BACKEND_BROWSERS[backend]])
+    browser_path = paths.get("browser_path") or None
+    return DriverBinary(
+        backend, paths.get("driver_path") or None, browser_path,
+        get_browser_version(browser_path), get_mtime(browser_path),
+    )
+
+
+def resolve_undetected_driver(backend: str, drivers_dir: str) -> DriverBinary:
+    """Patch a chromedriver matching the installed Chrome and keep a copy.
+
+    undetected_chromedriver otherwise deletes, downloads and patches its
+    driver on every launch.
+    """
+    browser_path = uc.find_chrome_executable()
+    version = get_browser_version(browser_path)
+    patcher = uc.Patcher(version_main=version or 0)
+    patcher.auto()
+
+    driver_path = os.path.join(drivers_dir, f"undetected_chromedriver_{version or 'latest'}")
+    os.makedirs(drivers_dir, exist_ok=True)
+    shutil.copy2(patcher.executable_path, driver_path)
+    return DriverBinary(
+        backend, driver_path, browser_path, version or patcher.version_main,
+        get_mtime(browser_path),
+    )
+
+
+def get_driver_cache_path(cache_dir: t.Optional[str] = None) -> str:
+    return os.path.join(cache_dir or get_cache_dir(), DRIVER_CACHE_FILE)
+
+
+def load_driver_binary(backend: str, path: str) -> t.Optional[DriverBinary]:
+    try:
+        with open(path) as cache_file:
+            return DriverBinary(**json.load(cache_file)[backend])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def save_driver_binary(binary: DriverBinary, path: str):
+    """Store the binaries of a backend, keeping the ones of other backends."""
+    try:
+        with open(path) as cache_file:
+            data = json.load(cache_file)
+    except (OSError, ValueError):
+        data = {}
+    data[binary.backend] = binary._asdict()
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as cache_file:
+        json.dump(data, cache_file, indent=2)
+    os.replace(tmp_path, path)
+
+
+@lru_cache
+def resolve_driver_binary(backend: str, cache_path: t.Optional[str] = None) -> DriverBinary:
+    """Return the binaries of a backend, resolving them once per host.
+
+    Resolution results are cached on disk and reused until the browser is
+    updated. On failure, launching is left to the driver library defaults.
+    """
+    cache_path = cache_path or get_driver_cache_path()
+    binary = load_driver_binary(backend, cache_path)
+    if binary is None or not binary.is_current():
+        try:
+            if backend == "undetected":
+                binary = resolve_undetected_driver(
+                    backend, os.path.join(os.path.dirname(cache_path), "drivers")
+                )
+            else:
+                binary = resolve_with_selenium_manager(backend)
+        except Exception as err:
+            logger.warning("! Failed to resolve the %s driver: %s", backend, str(err))
+            return DriverBinary(backend)
+        logger.info("... Resolved %s driver: %s", backend, binary.driver_path)
+        try:
+            save_driver_binary(binary, cache_path)
+        except OSError as err:
+            logger.warning("! Failed to cache driver paths: %s", str(err))
+    return binary
@@ -2,4 +2,29 @@
 
 
 class MissingDatesException(Exception):
-    pass
\ No newline at end of file
+    pass
+
+
+class ResponseTooLargeException(MissingDatesException):
+    """Raised when a captured response decodes to more than the size cap."""
+    pass
+
+
+class SiteUnavailableException(Exception):
+    """Raised when the site answers with a maintenance or rate-limit page."""
+    pass
+
+
+class NavigationException(Exception):
+    """Raised when the reschedule form could not be reached."""
+    pass
+
+
+class UnknownFacilityException(Exception):
+    """Raised when none of the allowed facilities is offered by the form."""
+    pass
+
+
+class ConfigError(Exception):
+    """Raised when the runtime configuration is invalid."""
+    pass
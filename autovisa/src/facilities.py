@@ -0,0 +1,207 @@
+"""Catalog of consular facilities offered by the reschedule form."""
+import json
+import logging
+import os
+import time
+import typing as t
+
+from autovisa.src.constants import (
+    CITY_NAME_ID_MAP, DEFAULT_LOCALE, FACILITY_CACHE_TTL, LOGGER_NAME
+)
+from autovisa.src.locales import fold_name
+from autovisa.src.utils import get_cache_dir
+
+logger = logging.getLogger(LOGGER_NAME)
+
+FACILITY_SELECT_ID = "appointments_consulate_appointment_facility_id"
+FACILITY_CACHE_FILE = "facilities.json"
+
+# Return the fingerprint of the facility options, along with the options
+# themselves only when the fingerprint differs from the known one.
+FACILITY_SCRIPT = """
+var select = document.getElementById(arguments[0]);
+if (!select) return null;
+var options = [], signature = "";
+for (var i = 0; i < select.options.length; i++) {
+    var option = select.options[i];
+    if (!option.value) continue;
+    var name = option.text.trim();
+    options.push([option.value, name, option.selected]);
+    signature += option.value + "=" + name + "|";
+}
+var hash = 5381;
+for (var j = 0; j < signature.length; j++) {
+    hash = ((hash << 5) + hash + signature.charCodeAt(j)) | 0;
+}
+var fingerprint = String(hash);
+return {
+    "fingerprint": fingerprint,
+    "options": fingerprint === arguments[1] ? null : options
+};
+"""
+
+# Select the facility again and let the page fetch its days, as a user change
+# would; return the value the select ended up with.
+FACILITY_REFRESH_SCRIPT = """
+var select = document.getElementById(arguments[0]);
+if (!select) return null;
+select.value = arguments[1];
+select.dispatchEvent(new Event("change", {"bubbles": true}));
+return select.value;
+"""
+
+
+def refresh_facility_days(driver, facility_id: str) -> bool:
+    """Make the loaded form fetch the days of a facility, without reloading it.
+
+    Return False when the page shows no facility select.
+    """
+    value = driver.execute_script(FACILITY_REFRESH_SCRIPT, FACILITY_SELECT_ID, facility_id)
+    return value == facility_id
+
+
+class Facility(t.NamedTuple):
+    id: str
+    name: str
+    locale: str = DEFAULT_LOCALE
+
+
+class FacilityCatalog:
+    """Facilities offered by the form of one locale, indexed by id and name."""
+
+    def __init__(
+        self, facilities: t.Iterable[Facility], locale=DEFAULT_LOCALE,
+        fingerprint: t.Optional[str] = None, fetched_at: float = 0.0
+    ):
+        self.facilities = list(facilities)
+        self.locale = locale
+        self.fingerprint = fingerprint
+        self.fetched_at = fetched_at
+        self.by_id = {facility.id: facility for facility in self.facilities}
+        self.by_name = {fold_name(facility.name): facility for facility in self.facilities}
+
+    def __len__(self):
+        return len(self.facilities)
+
+    def __repr__(self):
+        return f"<FacilityCatalog {self.locale} ({len(self)} facilities)>"
+
+    @classmethod
+    def from_city_map(cls, city_map=CITY_NAME_ID_MAP, locale=DEFAULT_LOCALE):
+        """Seed a catalog from the hand-maintained mapping."""
+        return cls(
+            [Facility(city_id, name, locale) for name, city_id in city_map.items()],
+            locale=locale,
+        )
+
+    @classmethod
+    def from_options(cls, options: list, locale: str, fingerprint: str):
+        """Build a catalog from the [value, text, selected] rows read in the page."""
+        return cls(
+            [Facility(str(value), name, locale) for value, name, *_ in options],
+            locale=locale, fingerprint=fingerprint, fetched_at=time.time(),
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        locale = data.get("locale", DEFAULT_LOCALE)
+        return cls(
+            [Facility(facility_id, name, locale) for facility_id, name in data["facilities"]],
+            locale=locale,
+            fingerprint=data.get("fingerprint"),
+            fetched_at=data.get("fetched_at", 0.0),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "locale": self.locale,
+            "fingerprint": self.fingerprint,
+            "fetched_at": self.fetched_at,
+            "facilities": [[facility.id, facility.name] for facility in self.facilities],
+        }
+
+    def is_expired(self, ttl=FACILITY_CACHE_TTL, now: t.Optional[float] = None) -> bool:
+        now = time.time() if now is None else now
+        return not self.fingerprint or now - self.fetched_at > ttl
+
+    def get(self, id_or_name: str) -> t.Optional[Facility]:
+        """Find a facility by id or by name (case and accent insensitive)."""
+        return self.by_id.get(str(id_or_name)) or self.by_name.get(fold_name(str(id_or_name)))
+
+    def get_id(self, id_or_name: str) -> str:
+        facility = self.get(id_or_name)
+        if facility is None:
+            raise KeyError(f"Unknown facility: {id_or_name}")
+        return facility.id
+
+    def resolve(self, allowed: t.Iterable[str]) -> t.List[Facility]:
+        """Return the allowed facilities offered by the form, in form order."""
+        allowed_ids = set()
+        for id_or_name in allowed:
+            facility = self.get(id_or_name)
+            if facility is None:
+                logger.warning("! Allowed facility %s is not offered by the form", id_or_name)
+                continue
+            allowed_ids.add(facility.id)
+        return [facility for facility in self.facilities if facility.id in allowed_ids]
+
+
+def get_catalog_path(cache_dir: t.Optional[str] = None) -> str:
+    return os.path.join(cache_dir or get_cache_dir(), FACILITY_CACHE_FILE)
+
+
+def load_catalog(locale: str, path: t.Optional[str] = None) -> t.Optional[FacilityCatalog]:
+    """Load the cached catalog for a locale, if any."""
+    path = path or get_catalog_path()
+    try:
+        with open(path) as cache_file:
+            data = json.load(cache_file)
+        return FacilityCatalog.from_dict(data[locale])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def save_catalog(catalog: FacilityCatalog, path: t.Optional[str] = None):
+    """Store the catalog, keeping the ones cached for other locales."""
+    path = path or get_catalog_path()
+    try:
+        with open(path) as cache_file:
+            data = json.load(cache_file)
+    except (OSError, ValueError):
+        data = {}
+    data[catalog.locale] = catalog.to_dict()
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as cache_file:
+        json.dump(data, cache_file, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def read_facility_options(driver, known_fingerprint: t.Optional[str] = None) -> t.Optional[dict]:
+    """Read the facility select in one script call."""
+    return driver.execute_script(FACILITY_SCRIPT, FACILITY_SELECT_ID, known_fingerprint)
+
+
+def revalidate_catalog(
+    driver, catalog: t.Optional[FacilityCatalog], locale: str,
+    ttl=FACILITY_CACHE_TTL, path: t.Optional[str] = None
+) -> t.Optional[FacilityCatalog]:
+    """Refresh the catalog from the loaded form when it is missing, expired or
+    the form options changed; return the catalog to use.
+    """
+    known_fingerprint = None
+    if catalog is not None and not catalog.is_expired(ttl):
+        known_fingerprint = catalog.fingerprint
+
+    result = read_facility_options(driver, known_fingerprint)
+    if not result or result.get("options") is None:
+        return catalog
+
+    new_catalog = FacilityCatalog.from_options(result["options"], locale, result["fingerprint"])
+    logger.info("... Facility catalog updated: %s", new_catalog)
+    try:
+        save_catalog(new_catalog, path)
+    except OSError as err:
+        logger.warning("! Failed to cache facility catalog: %s", str(err))
+    return new_catalog
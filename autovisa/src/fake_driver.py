@@ -0,0 +1,877 @@
+"""Browser stand-in backed by recorded HTML snapshots and JSON responses.
+
+It implements the subset of the Selenium API used by this project, so the
+scheduler flows can be tested and benchmarked without launching Chrome.
+"""
+import itertools
+import json
+import os
+import re
+import typing as t
+from contextlib import contextmanager
+from html.parser import HTMLParser
+from unittest.mock import patch
+from urllib.parse import urljoin, urlparse
+
+from selenium.common import (
+    InvalidSelectorException, NoSuchElementException, NoSuchWindowException,
+    StaleElementReferenceException
+)
+from selenium.webdriver.common.by import By
+
+from autovisa.src.facilities import FACILITY_REFRESH_SCRIPT, FACILITY_SCRIPT
+from autovisa.src.page_state import PAGE_STATE_SCRIPT
+from autovisa.src.timeslots import TIME_COLLECT_SCRIPT, TIME_PREFETCH_SCRIPT
+
+VOID_TAGS = frozenset((
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+    "param", "source", "track", "wbr",
+))
+BLOCK_TAGS = frozenset((
+    "address", "article", "aside", "blockquote", "body", "br", "dd", "div", "dl", "dt",
+    "fieldset", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr",
+    "li", "main", "nav", "ol", "p", "section", "select", "table", "tbody", "thead",
+    "tr", "ul",
+))
+HIDDEN_TAGS = frozenset(("head", "script", "style", "template", "title"))
+# Page attributes kept per browser tab
+TAB_ATTRIBUTES = ("current_url", "page_source", "document", "status_code", "window")
+WINDOW_IDS = itertools.count(1)
+NOT_FOUND_HTML = "<html><head><title>Not Found</title></head><body><h1>Not Found</h1></body></html>"
+
+
+class Node:
+    """Element of a parsed HTML document."""
+    __slots__ = ("tag", "attrs", "children", "parent")
+
+    def __init__(self, tag: str, attrs: dict, parent=None):
+        self.tag = tag
+        self.attrs = attrs
+        self.children = []
+        self.parent = parent
+
+    @property
+    def element_children(self) -> list:
+        return [child for child in self.children if isinstance(child, Node)]
+
+    @property
+    def classes(self) -> list:
+        return self.attrs.get("class", "").split()
+
+    def iter_descendants(self):
+        for child in self.children:
+            if isinstance(child, Node):
+                yield child
+                yield from child.iter_descendants()
+
+    def iter_ancestors(self):
+        parent = self.parent
+        while parent is not None:
+            yield parent
+            parent = parent.parent
+
+    @property
+    def own_text(self) -> str:
+        return "".join(child for child in self.children if isinstance(child, str))
+
+    @property
+    def text_content(self) -> str:
+        return "".join(
+            child if isinstance(child, str) else child.text_content
+            for child in self.children
+        )
+
+    def render_text(self, chunks: list):
+        """Append the visible text, breaking lines around block elements."""
+        if self.tag in HIDDEN_TAGS:
+            return
+        block = self.tag in BLOCK_TAGS
+        if block:
+            chunks.append("\n")
+        for child in self.children:
+            if isinstance(child, str):
+                chunks.append(child)
+            else:
+                child.render_text(chunks)
+                if child.tag in ("td", "th"):
+                    chunks.append(" ")
+        if block:
+            chunks.append("\n")
+
+    @property
+    def visible_text(self) -> str:
+        chunks = []
+        self.render_text(chunks)
+        lines = (" ".join(line.split()) for line in "".join(chunks).split("\n"))
+        return "\n".join(line for line in lines if line)
+
+
+class DocumentParser(HTMLParser):
+    """Build a Node tree with the standard library HTML parser."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node("#document", {})
+        self.current = self.root
+
+    def handle_starttag(self, tag, attrs):
+        node = Node(tag, {name: value or "" for name, value in attrs}, self.current)
+        self.current.children.append(node)
+        if tag not in VOID_TAGS:
+            self.current = node
+
+    def handle_startendtag(self, tag, attrs):
+        node = Node(tag, {name: value or "" for name, value in attrs}, self.current)
+        self.current.children.append(node)
+
+    def handle_endtag(self, tag):
+        # Tolerate unclosed tags by closing up to the matching ancestor
+        for node in [self.current, *self.current.iter_ancestors()]:
+            if node.tag == tag:
+                self.current = node.parent or self.root
+                return
+
+    def handle_data(self, data):
+        self.current.children.append(data)
+
+
+def parse_html(html: str) -> Node:
+    """Parse a document into a Node tree."""
+    parser = DocumentParser()
+    parser.feed(html)
+    parser.close()
+    return parser.root
+
+
+# --- CSS selectors --- #
+
+CSS_TOKEN_RE = re.compile(
+    r"\s*(?:"
+    r"(?P<combinator>>)|"
+    r"(?P<tag>\*|[a-zA-Z][\w-]*)|"
+    r"\#(?P<id>[\w-]+)|"
+    r"\.(?P<cls>[\w-]+)|"
+    r"\[\s*(?P<attr>[\w-]+)\s*(?:(?P<op>[~^$*]?=)\s*"
+    r"(?:\"(?P<dq>[^\"]*)\"|'(?P<sq>[^']*)'|(?P<bare>[\w-]+))\s*)?\]"
+    r")"
+)
+
+
+def parse_css(selector: str) -> list:
+    """Parse a selector into groups of (combinator, compound) steps."""
+    groups = []
+    for group in selector.split(","):
+        steps = []
+        compound = None
+        combinator = " "
+        position = 0
+        group = group.strip()
+        if not group:
+            raise InvalidSelectorException(f"Invalid CSS selector: {selector}")
+        while position < len(group):
+            match = CSS_TOKEN_RE.match(group, position)
+            if not match or match.end() == position:
+                raise InvalidSelectorException(f"Invalid CSS selector: {selector}")
+            whitespace = group[position].isspace()
+            if whitespace and compound is not None and not match.group("combinator"):
+                steps.append((combinator, compound))
+                compound, combinator = None, " "
+            position = match.end()
+
+            if match.group("combinator"):
+                if compound is None:
+                    raise InvalidSelectorException(f"Invalid CSS selector: {selector}")
+                steps.append((combinator, compound))
+                compound, combinator = None, ">"
+                continue
+
+            compound = compound or {"tag": None, "id": None, "classes": [], "attrs": []}
+            if match.group("tag"):
+                compound["tag"] = match.group("tag").lower()
+            elif match.group("id"):
+                compound["id"] = match.group("id")
+            elif match.group("cls"):
+                compound["classes"].append(match.group("cls"))
+            else:
+                value = next(
+                    (match.group(name) for name in ("dq", "sq", "bare")
+                     if match.group(name) is not None),
+                    None,
+                )
+                compound["attrs"].append((match.group("attr"), match.group("op"), value))
+        if compound is None:
+            raise InvalidSelectorException(f"Invalid CSS selector: {selector}")
+        steps.append((combinator, compound))
+        groups.append(steps)
+    return groups
+
+
+def match_attr(node: Node, name: str, op: t.Optional[str], value: t.Optional[str]) -> bool:
+    if name not in node.attrs:
+        return False
+    actual = node.attrs[name]
+    if op is None:
+        return True
+    if op == "=":
+        return actual == value
+    if op == "~=":
+        return value in actual.split()
+    if op == "^=":
+        return actual.startswith(value)
+    if op == "$=":
+        return actual.endswith(value)
+    return value in actual
+
+
+def match_compound(node: Node, compound: dict) -> bool:
+    if compound["tag"] not in (None, "*") and node.tag != compound["tag"]:
+        return False
+    if compound["id"] is not None and node.attrs.get("id") != compound["id"]:
+        return False
+    classes = node.classes
+    if any(cls not in classes for cls in compound["classes"]):
+        return False
+    return all(match_attr(node, *attr) for attr in compound["attrs"])
+
+
+def match_steps(node: Node, steps: list, scope: Node) -> bool:
+    """Match the compound steps right to left, staying within the scope."""
+    combinator, compound = steps[-1]
+    if not match_compound(node, compound):
+        return False
+    if len(steps) == 1:
+        return True
+
+    ancestors = []
+    for ancestor in node.iter_ancestors():
+        if ancestor is scope.parent:
+            break
+        ancestors.append(ancestor)
+    if combinator == ">":
+        return bool(ancestors) and match_steps(ancestors[0], steps[:-1], scope)
+    return any(match_steps(ancestor, steps[:-1], scope) for ancestor in ancestors)
+
+
+def select_css(scope: Node, selector: str) -> list:
+    groups = parse_css(selector)
+    return [
+        node for node in scope.iter_descendants()
+        if any(match_steps(node, steps, scope) for steps in groups)
+    ]
+
+
+# --- XPath subset --- #
+
+XPATH_STRING_RE = r"(?:\"([^\"]*)\"|'([^']*)')"
+XPATH_STEP_RE = re.compile(r"(//|/)?(\*|[a-zA-Z][\w-]*)")
+
+
+class XPathParser:
+    """Evaluate the small XPath subset used by the project and by Select:
+
+        //a[contains(text(), 'Continue')]
+        //a[.//h5/span[contains(@class, 'fa-calendar-minus')]]
+        .//option[normalize-space(.) = "Toronto"]
+    """
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        self.position = 0
+
+    def error(self):
+        return InvalidSelectorException(f"Invalid XPath expression: {self.expression}")
+
+    def skip_spaces(self):
+        while self.position < len(self.expression) and self.expression[self.position].isspace():
+            self.position += 1
+
+    def consume(self, token: str) -> bool:
+        self.skip_spaces()
+        if self.expression.startswith(token, self.position):
+            self.position += len(token)
+            return True
+        return False
+
+    def parse_string(self) -> str:
+        self.skip_spaces()
+        match = re.compile(XPATH_STRING_RE).match(self.expression, self.position)
+        if not match:
+            raise self.error()
+        self.position = match.end()
+        return match.group(1) if match.group(1) is not None else match.group(2)
+
+    def parse_path(self) -> list:
+        """Return a list of (axis, name, predicates)."""
+        steps = []
+        self.consume(".")
+        while True:
+            self.skip_spaces()
+            match = XPATH_STEP_RE.match(self.expression, self.position)
+            if not match:
+                break
+            if steps and not match.group(1):
+                break
+            self.position = match.end()
+            axis = "descendant" if match.group(1) == "//" else "child"
+            predicates = []
+            while self.consume("["):
+                predicates.append(self.parse_predicate())
+                if not self.consume("]"):
+                    raise self.error()
+            steps.append((axis, match.group(2).lower(), predicates))
+        if not steps:
+            raise self.error()
+        return steps
+
+    def parse_value(self) -> t.Callable:
+        """Parse text(), . or @attr into a function of the node."""
+        if self.consume("text()"):
+            return lambda node: node.own_text
+        if self.consume("@"):
+            match = re.compile(r"[\w-]+").match(self.expression, self.position)
+            if not match:
+                raise self.error()
+            self.position = match.end()
+            name = match.group(0)
+            return lambda node: node.attrs.get(name)
+        if self.consume("."):
+            return lambda node: node.text_content
+        raise self.error()
+
+    def parse_predicate(self) -> t.Callable:
+        if self.consume("contains("):
+            value = self.parse_value()
+            if not self.consume(","):
+                raise self.error()
+            needle = self.parse_string()
+            if not self.consume(")"):
+                raise self.error()
+            return lambda node: needle in (value(node) or "")
+        if self.consume("normalize-space("):
+            value = self.parse_value()
+            if not (self.consume(")") and self.consume("=")):
+                raise self.error()
+            expected = self.parse_string()
+            return lambda node: " ".join((value(node) or "").split()) == expected
+
+        self.skip_spaces()
+        if self.expression.startswith(("@", "text()"), self.position):
+            value = self.parse_value()
+            if self.consume("="):
+                expected = self.parse_string()
+                return lambda node: value(node) == expected
+            return lambda node: value(node) is not None
+
+        steps = self.parse_path()
+        return lambda node: bool(evaluate_xpath_steps(node, steps))
+
+    def parse(self) -> list:
+        steps = self.parse_path()
+        self.skip_spaces()
+        if self.position != len(self.expression):
+            raise self.error()
+        return steps
+
+
+def evaluate_xpath_steps(scope: Node, steps: list) -> list:
+    nodes = [scope]
+    for axis, name, predicates in steps:
+        found = []
+        seen = set()
+        for node in nodes:
+            candidates = node.iter_descendants() if axis == "descendant" else node.element_children
+            for candidate in candidates:
+                if id(candidate) in seen or (name != "*" and candidate.tag != name):
+                    continue
+                if all(predicate(candidate) for predicate in predicates):
+                    seen.add(id(candidate))
+                    found.append(candidate)
+        nodes = found
+    return nodes
+
+
+def select_xpath(scope: Node, expression: str) -> list:
+    steps = XPathParser(expression).parse()
+    if expression.startswith("/"):
+        while scope.parent is not None:
+            scope = scope.parent
+    return evaluate_xpath_steps(scope, steps)
+
+
+def find_nodes(scope: Node, by_type: str, key: str) -> list:
+    """Find nodes below the scope with any of Selenium's "by" strategies."""
+    if by_type == By.ID:
+        return [node for node in scope.iter_descendants() if node.attrs.get("id") == key]
+    if by_type == By.NAME:
+        return [node for node in scope.iter_descendants() if node.attrs.get("name") == key]
+    if by_type == By.CLASS_NAME:
+        return [node for node in scope.iter_descendants() if key in node.classes]
+    if by_type == By.TAG_NAME:
+        return [node for node in scope.iter_descendants() if node.tag == key.lower()]
+    if by_type == By.LINK_TEXT:
+        return [
+            node for node in scope.iter_descendants()
+            if node.tag == "a" and node.visible_text == key
+        ]
+    if by_type == By.CSS_SELECTOR:
+        return select_css(scope, key)
+    if by_type == By.XPATH:
+        return select_xpath(scope, key)
+    raise InvalidSelectorException(f"Unsupported locator strategy: {by_type}")
+
+
+# --- Network --- #
+
+class FakeResponse:
+    def __init__(self, status_code=200, body=b"", headers=None, reason="OK"):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {}
+        self.reason = reason
+
+
+class FakeRequest:
+    def __init__(self, url: str, response: t.Optional[FakeResponse] = None, method="GET"):
+        self.url = url
+        self.method = method
+        self.response = response
+        self.headers = {}
+
+    @property
+    def path(self) -> str:
+        return urlparse(self.url).path
+
+    def __repr__(self):
+        return f"<FakeRequest {self.method} {self.url}>"
+
+
+# --- Browser --- #
+
+class FakeSwitchTo:
+    """Subset of the `driver.switch_to` API dealing with windows."""
+
+    def __init__(self, driver):
+        self._driver = driver
+
+    def window(self, handle: str):
+        self._driver.switch_window(handle)
+
+    def new_window(self, type_hint=None):
+        self._driver.open_window()
+
+
+class FakeElement:
+    """Wrap a Node with the WebElement API."""
+
+    def __init__(self, driver, node: Node):
+        self._driver = driver
+        self._node = node
+
+    def __eq__(self, other):
+        return isinstance(other, FakeElement) and other._node is self._node
+
+    def __hash__(self):
+        return id(self._node)
+
+    def check_attached(self):
+        """Raise like Selenium once the page holding the element was navigated away."""
+        root = self._node
+        while root.parent is not None:
+            root = root.parent
+        if root is not self._driver.document:
+            raise StaleElementReferenceException("Element is no longer attached to the page")
+
+    @property
+    def tag_name(self) -> str:
+        return self._node.tag
+
+    @property
+    def text(self) -> str:
+        self.check_attached()
+        return self._node.visible_text
+
+    def get_attribute(self, name: str) -> t.Optional[str]:
+        self.check_attached()
+        node = self._node
+        if name == "value" and node.tag == "option" and "value" not in node.attrs:
+            return node.text_content.strip()
+        if name == "index" and node.tag == "option":
+            select = self._driver.get_parent_select(node)
+            options = find_nodes(select, By.TAG_NAME, "option") if select else [node]
+            return str(options.index(node))
+        if name == "href" and "href" in node.attrs:
+            return urljoin(self._driver.current_url, node.attrs["href"])
+        return node.attrs.get(name)
+
+    def get_dom_attribute(self, name: str) -> t.Optional[str]:
+        return self._node.attrs.get(name)
+
+    def get_property(self, name: str):
+        return self.get_attribute(name)
+
+    def is_selected(self) -> bool:
+        return "selected" in self._node.attrs or "checked" in self._node.attrs
+
+    def is_enabled(self) -> bool:
+        return "disabled" not in self._node.attrs
+
+    def is_displayed(self) -> bool:
+        return not any(
+            "display:none" in node.attrs.get("style", "").replace(" ", "")
+            for node in (self._node, *self._node.iter_ancestors())
+        )
+
+    def value_of_css_property(self, name: str) -> str:
+        if name == "display":
+            return "block" if self.is_displayed() else "none"
+        return ""
+
+    def click(self):
+        self.check_attached()
+        self._driver.click_node(self._node)
+
+    def send_keys(self, *values):
+        text = "".join(str(value) for value in values)
+        if text and all(ord(char) >= 0xE000 for char in text):
+            return  # Special keys, such as ESCAPE
+        self._node.attrs["value"] = self._node.attrs.get("value", "") + text
+
+    def clear(self):
+        self._node.attrs["value"] = ""
+
+    def find_element(self, by=By.ID, value=None):
+        self._driver.command_count += 1
+        return self._driver.wrap_first(find_nodes(self._node, by, value), by, value)
+
+    def find_elements(self, by=By.ID, value=None) -> list:
+        self._driver.command_count += 1
+        return [FakeElement(self._driver, node) for node in find_nodes(self._node, by, value)]
+
+
+class FakeDriver:
+    """Replay a recorded site without a browser.
+
+    The snapshot directory holds the recorded HTML pages and JSON responses,
+    along with a `manifest.json` describing how they are linked:
+
+        {
+            "base_url": "https://ais.example.com",
+            "pages": {"/en-ca/niv/users/sign_in": "sign_in.html"},
+            "responses": {"/en-ca/niv/.../days/94.json": "days_94.json"},
+            "submits": {"/en-ca/niv/users/sign_in": "/en-ca/niv/groups/1"},
+            "triggers": {"<select id>": "/en-ca/niv/.../days/{value}.json"}
+        }
+
+    Selecting an option of a select listed in "triggers" (or loading a page
+    where it has a selected option) records a request to the formatted URL, the
+    same way the real page fetches availability.
+    """
+
+    def __init__(
+        self, pages: dict, responses: t.Optional[dict] = None, submits: t.Optional[dict] = None,
+        triggers: t.Optional[dict] = None, base_url="https://ais.example.com"
+    ):
+        self.pages = pages
+        self.responses = responses or {}
+        self.submits = submits or {}
+        self.triggers = triggers or {}
+        self.base_url = base_url
+        self.scripts = {
+            PAGE_STATE_SCRIPT: run_page_state_script,
+            FACILITY_SCRIPT: run_facility_script,
+            TIME_PREFETCH_SCRIPT: run_time_prefetch_script,
+            TIME_COLLECT_SCRIPT: run_time_collect_script,
+            FACILITY_REFRESH_SCRIPT: run_facility_refresh_script,
+        }
+        # Stand-in for values scripts keep on the window object
+        self.window = {}
+        self.current_url = "about:blank"
+        self.page_source = ""
+        self.document = parse_html("")
+        self.status_code = 200
+        self._requests = []
+        self.command_count = 0
+        self.closed = False
+        self.cookies = []
+        # The page attributes of the current tab live on the driver itself
+        self.current_window_handle = f"fake-window-{next(WINDOW_IDS)}"
+        self.tabs = {self.current_window_handle: None}
+        self.switch_to = FakeSwitchTo(self)
+
+    @classmethod
+    def from_snapshot_dir(cls, path: str, **kwargs):
+        """Load recorded pages and responses described by a manifest."""
+        with open(os.path.join(path, "manifest.json")) as manifest_file:
+            manifest = json.load(manifest_file)
+
+        def read(file_name) -> str:
+            with open(os.path.join(path, file_name), encoding="utf-8") as snapshot_file:
+                return snapshot_file.read()
+
+        return cls(
+            pages={url: read(file_name) for url, file_name in manifest["pages"].items()},
+            responses={
+                url: read(file_name).encode()
+                for url, file_name in manifest.get("responses", {}).items()
+            },
+            submits=manifest.get("submits", {}),
+            triggers=manifest.get("triggers", {}),
+            base_url=manifest.get("base_url", "https://ais.example.com"),
+            **kwargs,
+        )
+
+    # --- selenium-wire API --- #
+
+    @property
+    def requests(self) -> list:
+        return list(self._requests)
+
+    @requests.deleter
+    def requests(self):
+        self._requests = []
+
+    # --- WebDriver API --- #
+
+    @property
+    def window_handles(self) -> list:
+        return list(self.tabs)
+
+    @property
+    def title(self) -> str:
+        titles = find_nodes(self.document, By.TAG_NAME, "title")
+        return titles[0].text_content.strip() if titles else ""
+
+    def get(self, url: str):
+        self.command_count += 1
+        self.load(urljoin(self.current_url if self.current_url != "about:blank"
+                          else self.base_url, url))
+
+    def refresh(self):
+        self.command_count += 1
+        self.load(self.current_url)
+
+    def find_element(self, by=By.ID, value=None):
+        self.command_count += 1
+        return self.wrap_first(find_nodes(self.document, by, value), by, value)
+
+    def find_elements(self, by=By.ID, value=None) -> list:
+        self.command_count += 1
+        return [FakeElement(self, node) for node in find_nodes(self.document, by, value)]
+
+    def execute_script(self, script: str, *args):
+        self.command_count += 1
+        handler = self.scripts.get(script)
+        return handler(self, *args) if handler else None
+
+    def get_cookies(self) -> list:
+        return [dict(cookie) for cookie in self.cookies]
+
+    def add_cookie(self, cookie: dict):
+        self.cookies = [item for item in self.cookies if item["name"] != cookie["name"]]
+        self.cookies.append(dict(cookie))
+
+    def execute_cdp_cmd(self, cmd: str, cmd_args: dict):
+        return {}
+
+    def close(self):
+        """Close the current tab, and the browser along with its last tab."""
+        self.tabs.pop(self.current_window_handle, None)
+        if not self.tabs:
+            self.closed = True
+
+    def quit(self):
+        self.closed = True
+
+    # --- Emulation --- #
+
+    def switch_window(self, handle: str):
+        if handle not in self.tabs:
+            raise NoSuchWindowException(f"No such window: {handle}")
+        self.command_count += 1
+        if self.current_window_handle in self.tabs:
+            self.tabs[self.current_window_handle] = {
+                name: getattr(self, name) for name in TAB_ATTRIBUTES
+            }
+        for name, value in self.tabs[handle].items():
+            setattr(self, name, value)
+        self.current_window_handle = handle
+
+    def open_window(self):
+        """Open a blank tab and switch to it."""
+        handle = f"fake-window-{next(WINDOW_IDS)}"
+        self.tabs[handle] = {
+            "current_url": "about:blank", "page_source": "", "document": parse_html(""),
+            "status_code": 200, "window": {},
+        }
+        self.switch_window(handle)
+
+    def wrap_first(self, nodes: list, by, value) -> FakeElement:
+        if not nodes:
+            raise NoSuchElementException(f"Unable to locate element: {by}={value}")
+        return FakeElement(self, nodes[0])
+
+    def make_response(self, url: str) -> FakeResponse:
+        parsed = urlparse(url)
+        path = parsed.path
+        if path in self.pages:
+            return FakeResponse(200, self.pages[path].encode(), {"Content-Type": "text/html"})
+        # Responses may be recorded for a given query string, or for any
+        for key in (f"{path}?{parsed.query}", path):
+            if key in self.responses:
+                return FakeResponse(200, self.responses[key], {"Content-Type": "application/json"})
+        return FakeResponse(
+            404, NOT_FOUND_HTML.encode(), {"Content-Type": "text/html"}, "Not Found"
+        )
+
+    def record_request(self, url: str) -> FakeRequest:
+        request = FakeRequest(urljoin(self.base_url, url), self.make_response(url))
+        self._requests.append(request)
+        return request
+
+    def load(self, url: str):
+        """Navigate to a URL, recording the document and its XHR requests."""
+        self.window = {}
+        request = self.record_request(url)
+        self.current_url = request.url
+        self.status_code = request.response.status_code
+        self.page_source = request.response.body.decode()
+        self.document = parse_html(self.page_source)
+        for select_id in self.triggers:
+            for select in find_nodes(self.document, By.ID, select_id):
+                selected = [
+                    option for option in find_nodes(select, By.TAG_NAME, "option")
+                    if "selected" in option.attrs
+                ]
+                if selected:
+                    self.fire_change(select, FakeElement(self, selected[0]).get_attribute("value"))
+
+    def fire_change(self, select: Node, value: str):
+        url_template = self.triggers.get(select.attrs.get("id"))
+        if url_template and value:
+            self.record_request(url_template.format(value=value))
+
+    def submit_form(self):
+        destination = self.submits.get(urlparse(self.current_url).path)
+        if destination:
+            self.load(destination)
+
+    @staticmethod
+    def get_parent_select(node: Node) -> t.Optional[Node]:
+        return next((parent for parent in node.iter_ancestors() if parent.tag == "select"), None)
+
+    def click_node(self, node: Node):
+        self.command_count += 1
+        if node.tag == "option":
+            select = self.get_parent_select(node)
+            if select is not None:
+                for option in find_nodes(select, By.TAG_NAME, "option"):
+                    option.attrs.pop("selected", None)
+                node.attrs["selected"] = ""
+                self.fire_change(select, FakeElement(self, node).get_attribute("value"))
+            return
+        if node.tag == "input" and node.attrs.get("type") == "checkbox":
+            if "checked" in node.attrs:
+                node.attrs.pop("checked")
+            else:
+                node.attrs["checked"] = ""
+            return
+        if (
+            (node.tag == "input" and node.attrs.get("type") == "submit")
+            or (node.tag == "button" and node.attrs.get("type", "submit") == "submit")
+        ):
+            self.submit_form()
+            return
+        link = node if node.tag == "a" else next(
+            (parent for parent in node.iter_ancestors() if parent.tag == "a"), None
+        )
+        if link is not None:
+            href = link.attrs.get("href", "")
+            if href and not href.startswith(("#", "javascript:")):
+                self.load(urljoin(self.current_url, href))
+
+
+def run_page_state_script(driver: FakeDriver, probes: list, default: str) -> str:
+    """Evaluate PAGE_STATE_SCRIPT against the fake document."""
+    text = driver.document.visible_text.lower()
+    for state, selector, needle in probes:
+        if selector and select_css(driver.document, selector):
+            return state
+        if needle and needle in text:
+            return state
+    return default
+
+
+def run_time_prefetch_script(driver: FakeDriver, urls: list):
+    """Evaluate TIME_PREFETCH_SCRIPT; the fetches complete immediately."""
+    store = driver.window["__autovisaTimes"] = {}
+    for url in urls:
+        response = driver.record_request(url).response
+        times = None
+        if response.status_code == 200:
+            times = json.loads(response.body).get("available_times") or []
+        store[url] = {"done": True, "times": times}
+
+
+def run_time_collect_script(driver: FakeDriver, urls: list) -> dict:
+    """Evaluate TIME_COLLECT_SCRIPT against the fake window."""
+    store = driver.window.get("__autovisaTimes", {})
+    return {url: store.get(url) for url in urls}
+
+
+def run_facility_refresh_script(driver: FakeDriver, select_id: str, value: str) -> t.Optional[str]:
+    """Evaluate FACILITY_REFRESH_SCRIPT against the fake document."""
+    selects = find_nodes(driver.document, By.ID, select_id)
+    if not selects:
+        return None
+    options = find_nodes(selects[0], By.TAG_NAME, "option")
+    chosen = [
+        option for option in options
+        if FakeElement(driver, option).get_attribute("value") == value
+    ]
+    if not chosen:
+        return ""
+    for option in options:
+        option.attrs.pop("selected", None)
+    chosen[0].attrs["selected"] = ""
+    driver.fire_change(selects[0], value)
+    return value
+
+
+def run_facility_script(driver: FakeDriver, select_id: str, known_fingerprint=None):
+    """Evaluate FACILITY_SCRIPT against the fake document."""
+    selects = find_nodes(driver.document, By.ID, select_id)
+    if not selects:
+        return None
+    options, signature = [], ""
+    for node in find_nodes(selects[0], By.TAG_NAME, "option"):
+        option = FakeElement(driver, node)
+        value = option.get_attribute("value")
+        if not value:
+            continue
+        name = node.text_content.strip()
+        options.append([value, name, option.is_selected()])
+        signature += f"{value}={name}|"
+
+    # Same 32-bit djb2 hash over UTF-16 code units as the page script
+    fingerprint = 5381
+    data = signature.encode("utf-16-le")
+    for index in range(0, len(data), 2):
+        code_unit = int.from_bytes(data[index:index + 2], "little")
+        fingerprint = ((fingerprint << 5) + fingerprint + code_unit) & 0xFFFFFFFF
+    if fingerprint >= 0x80000000:
+        fingerprint -= 0x100000000
+    fingerprint = str(fingerprint)
+    return {
+        "fingerprint": fingerprint,
+        "options": None if fingerprint == known_fingerprint else options,
+    }
+
+
+@contextmanager
+def instant_delays():
+    """Skip the human-like pauses while driving a FakeDriver.
+
+    This patches `time.sleep` globally, so use it in tests and benchmarks only.
+    """
+    with patch("autovisa.src.utils.time.sleep"):
+        yield
@@ -0,0 +1,157 @@
+"""Stand-in for the visa site that injects network and session faults.
+
+`FaultyDriver` serves the same recorded snapshot as `FakeDriver`, but delays,
+corrupts or fails the responses the scheduler depends on, following a
+`FaultProfile`. Time only passes on a `VirtualClock`, so hours of checks can be
+replayed in seconds and every run with the same seed injects the same faults.
+"""
+import gzip
+import logging
+import random
+import typing as t
+from collections import Counter
+from contextlib import contextmanager
+from unittest.mock import patch
+from urllib.parse import urlparse
+
+from autovisa.src.constants import DEFAULT_LOCALE, LOGGER_NAME, LOGIN_PATH_TEMPLATE
+from autovisa.src.fake_driver import FakeDriver, FakeResponse, parse_html
+
+logger = logging.getLogger(LOGGER_NAME)
+
+SESSION_EXPIRED_BODY = b'{"error":"You need to sign in or sign up before continuing."}'
+SESSION_EXPIRED_FLASH = (
+    "<p class='flash'>Your session expired, please sign in again to continue.</p>"
+)
+SERVER_ERROR_HTML = (
+    b"<html><head><title>Service Unavailable</title></head>"
+    b"<body><h1>503 Service Unavailable</h1></body></html>"
+)
+
+
+class FaultProfile(t.NamedTuple):
+    name: str
+    # Seconds added to every days or times request
+    json_latency_s: float = 0.0
+    # Seconds added to every page load
+    page_latency_s: float = 0.0
+    # Probabilities, drawn for each JSON response
+    truncate_rate: float = 0.0
+    compress_rate: float = 0.0
+    error_rate: float = 0.0
+    expiry_rate: float = 0.0
+
+
+FAULT_PROFILES = {
+    profile.name: profile for profile in (
+        FaultProfile("clean"),
+        FaultProfile("latency", json_latency_s=2.0, page_latency_s=3.0),
+        FaultProfile("slow_pages", page_latency_s=20.0),
+        FaultProfile("truncated", truncate_rate=0.05),
+        FaultProfile("compressed", compress_rate=0.5),
+        FaultProfile("server_errors", error_rate=0.05),
+        FaultProfile("session_expiry", expiry_rate=0.02),
+        FaultProfile(
+            "degraded", json_latency_s=1.0, page_latency_s=5.0, truncate_rate=0.02,
+            compress_rate=0.5, error_rate=0.02, expiry_rate=0.01,
+        ),
+    )
+}
+
+
+class VirtualClock:
+    """Time that only passes when slept through."""
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def sleep(self, seconds: float):
+        self.now += max(0.0, seconds)
+
+    def monotonic(self) -> float:
+        return self.now
+
+    @contextmanager
+    def patched(self):
+        """Route `time.sleep` and `time.monotonic` through the clock, so the
+        scheduler's delays and WebDriverWait timeouts take no real time.
+        """
+        with patch("time.sleep", self.sleep), patch("time.monotonic", self.monotonic):
+            yield self
+
+
+class FaultyDriver(FakeDriver):
+    """FakeDriver whose responses are degraded according to a fault profile.
+
+    The session starts signed out; submitting the sign-in form signs it in, and
+    an expired session redirects page loads to the sign-in page and answers JSON
+    requests with 401, until the scheduler signs in again.
+    """
+
+    def __init__(
+        self, *args, profile: FaultProfile = FAULT_PROFILES["clean"],
+        clock: t.Optional[VirtualClock] = None, seed: t.Optional[int] = None,
+        login_path=LOGIN_PATH_TEMPLATE.format(locale=DEFAULT_LOCALE), **kwargs
+    ):
+        self.profile = profile
+        self.clock = clock or VirtualClock()
+        self.rng = random.Random(seed)
+        self.login_path = login_path
+        self.signed_in = False
+        # Number of faults injected, by kind
+        self.faults = Counter()
+        super().__init__(*args, **kwargs)
+
+    def expire_session(self):
+        logger.debug("> expire_session")
+        self.signed_in = False
+        self.faults["session_expiries"] += 1
+
+    def load(self, url: str):
+        path = urlparse(url).path
+        if path not in self.pages:
+            super().load(url)
+            return
+
+        self.clock.sleep(self.profile.page_latency_s)
+        if self.signed_in or path == self.login_path:
+            super().load(url)
+            return
+
+        self.faults["session_redirects"] += 1
+        super().load(self.login_path)
+        self.page_source = self.page_source.replace("<body>", f"<body>{SESSION_EXPIRED_FLASH}", 1)
+        self.document = parse_html(self.page_source)
+
+    def submit_form(self):
+        if urlparse(self.current_url).path == self.login_path:
+            self.signed_in = True
+        super().submit_form()
+
+    def make_response(self, url: str) -> FakeResponse:
+        response = super().make_response(url)
+        if not urlparse(url).path.endswith(".json"):
+            return response
+
+        self.clock.sleep(self.profile.json_latency_s)
+        if self.signed_in and self.rng.random() < self.profile.expiry_rate:
+            self.expire_session()
+        if not self.signed_in:
+            return FakeResponse(
+                401, SESSION_EXPIRED_BODY, {"Content-Type": "application/json"}, "Unauthorized"
+            )
+        if self.rng.random() < self.profile.error_rate:
+            self.faults["server_errors"] += 1
+            return FakeResponse(
+                503, SERVER_ERROR_HTML, {"Content-Type": "text/html"}, "Service Unavailable"
+            )
+        if response.status_code != 200:
+            return response
+        if self.rng.random() < self.profile.truncate_rate:
+            self.faults["truncated_bodies"] += 1
+            return FakeResponse(200, response.body[:len(response.body) // 2], response.headers)
+        if self.rng.random() < self.profile.compress_rate:
+            self.faults["compressed_bodies"] += 1
+            headers = dict(response.headers, **{"Content-Encoding": "gzip"})
+            return FakeResponse(200, gzip.compress(response.body), headers)
+        return response
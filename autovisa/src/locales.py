@@ -0,0 +1,104 @@
+"""Locale-specific tables for parsing the consulate pages."""
+import logging
+import re
+import typing as t
+import unicodedata
+from functools import lru_cache
+from urllib.parse import urlparse
+
+from autovisa.src.constants import DEFAULT_LOCALE, LOGGER_NAME
+
+logger = logging.getLogger(LOGGER_NAME)
+
+LOCALE_CODE_RE = re.compile(r"^[a-z]{2}-[a-z]{2}$")
+
+# Patterns use unicode letters so accented month, city and applicant names
+# parse the same way in every language.
+LETTERS = r"[^\W\d_]"
+DEFAULT_ADDRESS_PATTERN = (
+    rf"\s*(\d+)\s*(?:de\s+)?({LETTERS}+)\s*,?\s*(?:de\s+)?(\d+)\s*,?\s*(\d\d:\d\d)\s*({LETTERS}+).*"
+)
+DEFAULT_INFO_PATTERN = rf"({LETTERS}(?:{LETTERS}|['\- ])*)\s+(\w{{2}}\d{{6}})"
+
+MONTH_NAMES = {
+    "en": (
+        "January", "February", "March", "April", "May", "June", "July", "August",
+        "September", "October", "November", "December",
+    ),
+    "es": (
+        "enero", "febrero", "marzo", "abril", "mayo", "junio", "julio", "agosto",
+        "septiembre", "octubre", "noviembre", "diciembre",
+    ),
+    "fr": (
+        "janvier", "février", "mars", "avril", "mai", "juin", "juillet", "août",
+        "septembre", "octobre", "novembre", "décembre",
+    ),
+    "pt": (
+        "janeiro", "fevereiro", "março", "abril", "maio", "junho", "julho", "agosto",
+        "setembro", "outubro", "novembro", "dezembro",
+    ),
+}
+
+
+def fold_name(name: str) -> str:
+    """Lowercase a name and strip its accents, for lookups."""
+    decomposed = unicodedata.normalize("NFKD", name.strip().lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+class LocalePack:
+    """Month lookup table and compiled patterns for one locale."""
+    __slots__ = ("code", "language", "month_ints", "address_re", "info_re")
+
+    def __init__(
+        self, code: str, month_names: t.Sequence[str],
+        address_pattern=DEFAULT_ADDRESS_PATTERN, info_pattern=DEFAULT_INFO_PATTERN
+    ):
+        self.code = code
+        self.language = code.split("-")[0]
+        self.month_ints = {}
+        for month, month_name in enumerate(month_names, 1):
+            self.month_ints[fold_name(month_name)] = month
+        self.address_re = re.compile(address_pattern)
+        self.info_re = re.compile(info_pattern)
+
+    def __repr__(self):
+        return f"<LocalePack {self.code}>"
+
+    def get_month_int(self, month_name: str) -> int:
+        """Map a month name to its number (1-12)."""
+        try:
+            return self.month_ints[fold_name(month_name)]
+        except KeyError:
+            raise ValueError(f"Unknown month for {self.code}: {month_name}") from None
+
+
+@lru_cache
+def get_locale_pack(code: str = DEFAULT_LOCALE) -> LocalePack:
+    """Build the tables for a locale code such as "en-ca", once per code.
+
+    Languages without tables of their own use the English ones.
+    """
+    code = code.lower()
+    language = code.split("-")[0]
+    month_names = MONTH_NAMES.get(language)
+    if month_names is None:
+        logger.warning("! No month names for locale %s, parsing it as English", code)
+        month_names = MONTH_NAMES["en"]
+    return LocalePack(code, month_names)
+
+
+def get_locale_code(base_url: t.Optional[str]) -> str:
+    """Read the locale from the first path segment of the base URL, if any."""
+    segments = urlparse(base_url or "").path.strip("/").split("/")
+    if segments and LOCALE_CODE_RE.match(segments[0].lower()):
+        return segments[0].lower()
+    return DEFAULT_LOCALE
+
+
+def get_site_root(base_url: t.Optional[str]) -> str:
+    """Return the scheme and host of the base URL."""
+    parsed = urlparse(base_url or "")
+    if not parsed.netloc:
+        return (base_url or "").rstrip("/")
+    return f"{parsed.scheme}://{parsed.netloc}"
@@ -0,0 +1,148 @@
+"""Logging pipeline that keeps formatting and I/O off the scheduler thread."""
+import atexit
+import copy
+import datetime
+import json
+import logging
+import os
+import queue
+import sys
+import typing as t
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from autovisa.src.constants import LOG_BACKUP_COUNT, LOG_MAX_BYTES, LOGGER_NAME, LOGGING_LEVEL
+
+LOG_FORMATS = ("text", "json")
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {
+    "message", "asctime", "taskName",
+}
+SCALAR_TYPES = (str, int, float, bool, type(None))
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": datetime.datetime.fromtimestamp(record.created).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "func": record.funcName,
+            "line": record.lineno,
+            "thread": record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRIBUTES and not key.startswith("_"):
+                data[key] = value
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data["exc_info"] = record.exc_text
+        if record.stack_info:
+            data["stack_info"] = self.formatStack(record.stack_info)
+        return json.dumps(data, default=str, ensure_ascii=False)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """Queue records with their message merged, but not formatted.
+
+    Arguments are merged into the message and tracebacks rendered in the
+    calling thread, so the log shows the state at the time of the call; the
+    output format is applied by the listener's handlers.
+    """
+    exception_formatter = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or self.exception_formatter.formatException(
+                record.exc_info
+            )
+            record.exc_info = None
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRIBUTES and not isinstance(value, SCALAR_TYPES):
+                # Extras may be changed by the caller before they are written
+                setattr(record, key, json.loads(json.dumps(value, default=str)))
+        return record
+
+
+def create_handler(log_format="text", log_file: t.Optional[str] = None,
+                   max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUP_COUNT) -> logging.Handler:
+    """Build the handler that writes records, from the listener thread."""
+    if log_format not in LOG_FORMATS:
+        raise ValueError(f"Unknown log format: {log_format}")
+
+    if log_file:
+        log_file = os.path.expanduser(log_file)
+        os.makedirs(os.path.dirname(os.path.abspath(log_file)), exist_ok=True)
+        handler = RotatingFileHandler(
+            log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True
+        )
+    else:
+        handler = logging.StreamHandler(sys.stderr)
+
+    if log_format == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+    return handler
+
+
+def configure_logging(
+    level=LOGGING_LEVEL, log_format="text", log_file: t.Optional[str] = None,
+    max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUP_COUNT
+) -> QueueListener:
+    """Route the autovisa logger through a queue to a background writer.
+
+    Logging calls only enqueue the record; formatting, rotation and disk
+    writes happen in the listener thread. Calling this again replaces the
+    previous pipeline.
+    """
+    handler = create_handler(log_format, log_file, max_bytes, backup_count)
+    record_queue = queue.SimpleQueue()
+    listener = QueueListener(record_queue, handler, respect_handler_level=True)
+
+    stop_logging()
+    logger = logging.getLogger(LOGGER_NAME)
+    queue_handler = DeferredQueueHandler(record_queue)
+    queue_handler.listener = listener
+    logger.addHandler(queue_handler)
+    logger.setLevel(level)
+    logger.propagate = False
+
+    listener.start()
+    atexit.unregister(stop_logging)
+    atexit.register(stop_logging)
+    return listener
+
+
+def stop_logging():
+    """Detach the queue from the autovisa logger and flush pending records."""
+    logger = logging.getLogger(LOGGER_NAME)
+    for handler in list(logger.handlers):
+        if isinstance(handler, DeferredQueueHandler):
+            logger.removeHandler(handler)
+            handler.listener.stop()
+
+
+def configure_logging_from_env() -> QueueListener:
+    """Configure logging from LOG_LEVEL, LOG_FORMAT, LOG_FILE, LOG_MAX_BYTES
+    and LOG_BACKUP_COUNT.
+    """
+    level = os.getenv("LOG_LEVEL", "").strip().upper() or LOGGING_LEVEL
+    return configure_logging(
+        level=level,
+        log_format=os.getenv("LOG_FORMAT", "text").strip().lower() or "text",
+        log_file=os.getenv("LOG_FILE", "").strip() or None,
+        max_bytes=int(os.getenv("LOG_MAX_BYTES") or LOG_MAX_BYTES),
+        backup_count=int(os.getenv("LOG_BACKUP_COUNT") or LOG_BACKUP_COUNT),
+    )
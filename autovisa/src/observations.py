@@ -0,0 +1,157 @@
+"""Availability readings shared between scheduler processes on one host."""
+import datetime
+import json
+import logging
+import os
+import socket
+import sqlite3
+import time
+import typing as t
+
+from autovisa.src.constants import LOGGER_NAME, OBSERVATION_MAX_AGE, OBSERVATION_RETENTION
+
+logger = logging.getLogger(LOGGER_NAME)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    facility_id TEXT NOT NULL,
+    facility_name TEXT NOT NULL,
+    observed_at REAL NOT NULL,
+    source TEXT NOT NULL,
+    dates TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS observations_facility_time
+    ON observations (facility_id, observed_at);
+"""
+
+
+def get_source_name() -> str:
+    """Identify this process among the ones sharing the store."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class Observation(t.NamedTuple):
+    facility_id: str
+    facility_name: str
+    observed_at: float
+    source: str
+    dates: tuple
+
+    @property
+    def earliest(self) -> t.Optional[datetime.date]:
+        return datetime.date.fromisoformat(self.dates[0]) if self.dates else None
+
+    def age(self, now: t.Optional[float] = None) -> float:
+        return (time.time() if now is None else now) - self.observed_at
+
+    @classmethod
+    def from_row(cls, row: tuple):
+        facility_id, facility_name, observed_at, source, dates = row
+        return cls(facility_id, facility_name, observed_at, source, tuple(json.loads(dates)))
+
+
+class ObservationStore:
+    """Append-only log of per-facility availability in a SQLite database.
+
+    WAL mode lets several processes read while one of them writes.
+    """
+    COLUMNS = "facility_id, facility_name, observed_at, source, dates"
+
+    def __init__(self, path: str, max_age=OBSERVATION_MAX_AGE, source: t.Optional[str] = None):
+        self.path = path
+        self.max_age = max_age
+        self.source = source or get_source_name()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(path, timeout=5, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def publish(
+        self, facility_id: str, facility_name: str, dates: t.Iterable[str],
+        observed_at: t.Optional[float] = None
+    ) -> Observation:
+        """Store a fresh reading of the dates offered by a facility."""
+        observation = Observation(
+            str(facility_id), facility_name,
+            time.time() if observed_at is None else observed_at,
+            self.source, tuple(dates),
+        )
+        self.connection.execute(
+            f"INSERT INTO observations ({self.COLUMNS}) VALUES (?, ?, ?, ?, ?)",
+            (*observation[:4], json.dumps(observation.dates)),
+        )
+        return observation
+
+    def latest(self, facility_id: str) -> t.Optional[Observation]:
+        row = self.connection.execute(
+            f"SELECT {self.COLUMNS} FROM observations WHERE facility_id = ? "
+            "ORDER BY observed_at DESC LIMIT 1",
+            (str(facility_id),),
+        ).fetchone()
+        return Observation.from_row(row) if row else None
+
+    def get_fresh(
+        self, facility_id: str, max_age: t.Optional[float] = None, now: t.Optional[float] = None
+    ) -> t.Optional[Observation]:
+        """Return the latest reading of a facility if it is still fresh."""
+        observation = self.latest(facility_id)
+        max_age = self.max_age if max_age is None else max_age
+        if observation is None or observation.age(now) > max_age:
+            return None
+        return observation
+
+    def iter_observations(
+        self, since: t.Optional[float] = None, until: t.Optional[float] = None,
+        facility_ids: t.Optional[t.Iterable[str]] = None
+    ) -> t.Iterator[Observation]:
+        """Yield stored readings in chronological order."""
+        clauses, params = [], []
+        if since is not None:
+            clauses.append("observed_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("observed_at < ?")
+            params.append(until)
+        if facility_ids is not None:
+            facility_ids = [str(facility_id) for facility_id in facility_ids]
+            clauses.append(f"facility_id IN ({', '.join('?' * len(facility_ids))})")
+            params.extend(facility_ids)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        cursor = self.connection.execute(
+            f"SELECT {self.COLUMNS} FROM observations {where} ORDER BY observed_at, id", params
+        )
+        for row in cursor:
+            yield Observation.from_row(row)
+
+    def prune(self, older_than: float) -> int:
+        """Delete readings taken before the given timestamp."""
+        cursor = self.connection.execute(
+            "DELETE FROM observations WHERE observed_at < ?", (older_than,)
+        )
+        return cursor.rowcount
+
+
+def open_observation_store() -> t.Optional[ObservationStore]:
+    """Open the store configured by OBSERVATION_DB, if any, pruning old readings."""
+    path = os.getenv("OBSERVATION_DB", "").strip()
+    if not path:
+        return None
+    try:
+        store = ObservationStore(os.path.expanduser(path))
+    except (OSError, sqlite3.Error) as err:
+        logger.warning("! Failed to open observation store %s: %s", path, str(err))
+        return None
+    try:
+        pruned = store.prune(time.time() - OBSERVATION_RETENTION)
+    except sqlite3.Error as err:
+        logger.warning("! Failed to prune observation store %s: %s", path, str(err))
+    else:
+        if pruned:
+            logger.info("... Pruned %d old observation(s) from %s", pruned, path)
+    return store
@@ -0,0 +1,63 @@
+"""Classify the page currently loaded in the browser."""
+import logging
+
+from autovisa.src.constants import LOGGER_NAME
+
+logger = logging.getLogger(LOGGER_NAME)
+
+
+class PageState:
+    """Names of the pages the scheduler knows how to handle."""
+    SIGN_IN = "sign_in"
+    APPOINTMENT_LIST = "appointment_list"
+    APPOINTMENT_ACTIONS = "appointment_actions"
+    RESCHEDULE_FORM = "reschedule_form"
+    SESSION_EXPIRED = "session_expired"
+    MAINTENANCE = "maintenance"
+    RATE_LIMITED = "rate_limited"
+    UNKNOWN = "unknown"
+
+    ALL = (
+        SIGN_IN, APPOINTMENT_LIST, APPOINTMENT_ACTIONS, RESCHEDULE_FORM,
+        SESSION_EXPIRED, MAINTENANCE, RATE_LIMITED, UNKNOWN,
+    )
+
+
+# Probes are evaluated in order and the first match wins, so error pages come
+# before the regular ones (e.g. an expired session still renders a sign-in form).
+# Each probe is (state, CSS selector or None, lowercase body text or None).
+PAGE_STATE_PROBES = (
+    (PageState.RATE_LIMITED, None, "too many requests"),
+    (PageState.RATE_LIMITED, None, "rate limit"),
+    (PageState.MAINTENANCE, None, "down for maintenance"),
+    (PageState.MAINTENANCE, None, "scheduled maintenance"),
+    (PageState.SESSION_EXPIRED, None, "your session expired"),
+    (PageState.RESCHEDULE_FORM, "#appointments_consulate_appointment_facility_id", None),
+    (PageState.APPOINTMENT_ACTIONS, "a h5 span.fa-calendar-minus", None),
+    (PageState.APPOINTMENT_LIST, ".application.attend_appointment", None),
+    (PageState.SIGN_IN, "#user_email", None),
+)
+
+PAGE_STATE_SCRIPT = """
+var probes = arguments[0];
+var body = document.body;
+var text = body ? (body.innerText || body.textContent || "").toLowerCase() : "";
+for (var i = 0; i < probes.length; i++) {
+    var selector = probes[i][1], needle = probes[i][2];
+    if (selector && document.querySelector(selector)) return probes[i][0];
+    if (needle && text.indexOf(needle) !== -1) return probes[i][0];
+}
+return arguments[1];
+"""
+
+
+def detect_page_state(driver) -> str:
+    """Identify the current page with a single script call."""
+    state = driver.execute_script(
+        PAGE_STATE_SCRIPT,
+        [list(probe) for probe in PAGE_STATE_PROBES],
+        PageState.UNKNOWN,
+    )
+    if state not in PageState.ALL:
+        return PageState.UNKNOWN
+    return state
@@ -0,0 +1,123 @@
+"""Keep the recent events of a cycle in memory and write them out when it fails."""
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import traceback
+import typing as t
+from collections import deque
+
+from autovisa.src.constants import LOGGER_NAME, RECORDER_CAPACITY, RECORDER_MAX_DUMPS
+from autovisa.src.utils import get_cache_dir
+
+logger = logging.getLogger(LOGGER_NAME)
+
+RECORDINGS_DIR = "recordings"
+
+
+class FlightRecorder:
+    """Fixed-size buffer of recent events: phases, WebDriver commands,
+    responses and page states.
+
+    Recording an event only appends a tuple, so it stays on at any log level.
+    """
+
+    def __init__(self, capacity=RECORDER_CAPACITY):
+        self.buffer = deque(maxlen=capacity)
+
+    def record(self, kind: str, **fields):
+        self.buffer.append((time.time(), kind, fields))
+
+    def events(self) -> t.List[dict]:
+        return [
+            {"at": round(at, 3), "kind": kind, **fields}
+            for at, kind, fields in list(self.buffer)
+        ]
+
+    def attach(self, driver):
+        """Record every command the driver sends to the browser, with its duration.
+
+        Command parameters are left out, since they carry the typed credentials.
+        """
+        execute = getattr(driver, "execute", None)
+        if execute is None:
+            return
+        recorder = self
+
+        def recorded_execute(driver_command, params=None):
+            start = time.perf_counter()
+            error = None
+            try:
+                return execute(driver_command, params)
+            except Exception as err:
+                error = type(err).__name__
+                raise
+            finally:
+                recorder.record(
+                    "command", command=driver_command,
+                    duration_ms=round((time.perf_counter() - start) * 1000, 1), error=error,
+                )
+
+        driver.execute = recorded_execute
+
+    def dump(
+        self, driver, error: t.Optional[BaseException] = None,
+        directory: t.Optional[str] = None
+    ) -> threading.Thread:
+        """Write the recent events, the page source and a screenshot to a new directory.
+
+        The browser is read on a background thread, so a hung browser cannot
+        hold up the caller; join the returned thread before closing the browser.
+        """
+        if directory is None:
+            recordings_dir = os.path.join(get_cache_dir(), RECORDINGS_DIR)
+            directory = os.path.join(
+                recordings_dir, time.strftime("%Y%m%d-%H%M%S") + f"-{os.getpid()}"
+            )
+            prune_dumps(recordings_dir)
+        thread = threading.Thread(
+            target=write_dump, args=(directory, self.events(), error, driver),
+            name="flight-recorder", daemon=True,
+        )
+        thread.start()
+        return thread
+
+
+def write_dump(directory: str, events: t.List[dict], error, driver):
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "events.jsonl"), "w") as events_file:
+            for event in events:
+                events_file.write(json.dumps(event, default=str) + "\n")
+        if error is not None:
+            with open(os.path.join(directory, "error.txt"), "w") as error_file:
+                error_file.write("".join(traceback.format_exception(error)))
+    except OSError as err:
+        logger.warning("! Failed to write flight recording: %s", str(err))
+        return
+
+    try:
+        page_source = driver.page_source
+        with open(os.path.join(directory, "page.html"), "w", encoding="utf-8") as page_file:
+            page_file.write(page_source)
+    except Exception as err:
+        logger.warning("! Failed to record page source: %s", str(err))
+    try:
+        screenshot = driver.get_screenshot_as_png()
+        with open(os.path.join(directory, "screenshot.png"), "wb") as screenshot_file:
+            screenshot_file.write(screenshot)
+    except Exception as err:
+        logger.warning("! Failed to record screenshot: %s", str(err))
+    logger.info("... Flight recording written to %s", directory)
+
+
+def prune_dumps(recordings_dir: str, keep=RECORDER_MAX_DUMPS):
+    """Remove the oldest recordings, leaving room for a new one."""
+    try:
+        names = sorted(os.listdir(recordings_dir))
+    except OSError:
+        return
+    for name in names[:max(0, len(names) - keep + 1)]:
+        shutil.rmtree(os.path.join(recordings_dir, name), ignore_errors=True)
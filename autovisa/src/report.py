@@ -0,0 +1,340 @@
+"""Summarise recorded availability into CSV files and a static HTML page.
+
+Run with ``python -m autovisa.src.report --db observations.db --output report/``.
+
+Each facility's readings are turned into compact arrays once, then every
+summary is a single pass over them: the earliest date offered over time, the
+time of day new dates are released, how long released dates stay offered and
+how often the earliest date improves.
+"""
+import argparse
+import bisect
+import csv
+import datetime
+import html
+import logging
+import os
+import statistics
+import time
+import typing as t
+from array import array
+
+from autovisa.src.constants import LOGGER_NAME
+from autovisa.src.observations import ObservationStore
+from autovisa.src.simulator import Timeline
+
+logger = logging.getLogger(LOGGER_NAME)
+
+DEFAULT_BUCKET_S = 3600
+# Leading dates of each reading whose release and lifetime are followed
+DEFAULT_SLOTS = 10
+NO_DATE = 0
+# Upper bounds of the slot lifetime histogram (s)
+LIFETIME_BINS = (60, 300, 900, 3600, 6 * 3600, 86400, float("inf"))
+
+
+class FacilityReport(t.NamedTuple):
+    facility_id: str
+    facility_name: str
+    times: array
+    # Proleptic ordinal of the earliest date of each reading, NO_DATE if none
+    earliest: array
+    # (bucket start, earliest date ordinal, readings) for each bucket with readings
+    earliest_over_time: t.List[t.Tuple[float, int, int]]
+    # Dates released during each hour of the day
+    release_hours: t.List[int]
+    # Seconds released dates stayed offered, for those that were withdrawn
+    slot_lifetimes: array
+    # (time, days gained) each time the earliest date moved sooner
+    improvements: t.List[t.Tuple[float, int]]
+
+    @property
+    def span_days(self) -> float:
+        return (self.times[-1] - self.times[0]) / 86400 if self.times else 0.0
+
+    def summary(self) -> dict:
+        lifetimes = sorted(self.slot_lifetimes)
+        offered = [ordinal for ordinal in self.earliest if ordinal != NO_DATE]
+        gains = [days for _, days in self.improvements]
+        return {
+            "facility_id": self.facility_id,
+            "facility_name": self.facility_name,
+            "readings": len(self.times),
+            "span_days": round(self.span_days, 2),
+            "best_date": datetime.date.fromordinal(min(offered)).isoformat() if offered else "",
+            "releases": sum(self.release_hours),
+            "improvements": len(self.improvements),
+            "improvements_per_day": round(len(self.improvements) / self.span_days, 3)
+            if self.span_days else "",
+            "mean_days_gained": round(statistics.mean(gains), 1) if gains else "",
+            "median_slot_lifetime_s": round(statistics.median(lifetimes)) if lifetimes else "",
+            "p90_slot_lifetime_s": round(lifetimes[int(0.9 * (len(lifetimes) - 1))])
+            if lifetimes else "",
+        }
+
+
+def get_earliest_ordinals(date_lists: t.Sequence[tuple]) -> array:
+    return array("l", (
+        datetime.date.fromisoformat(dates[0]).toordinal() if dates else NO_DATE
+        for dates in date_lists
+    ))
+
+
+def get_earliest_over_time(
+    times: array, earliest: array, bucket_s=DEFAULT_BUCKET_S, utc_offset_s=0
+) -> t.List[t.Tuple[float, int, int]]:
+    """Return the earliest date offered within each time bucket."""
+    rows = []
+    bucket = None
+    for observed_at, ordinal in zip(times, earliest):
+        start = observed_at - (observed_at + utc_offset_s) % bucket_s
+        if start != bucket:
+            rows.append([start, NO_DATE, 0])
+            bucket = start
+        row = rows[-1]
+        row[2] += 1
+        if ordinal != NO_DATE and (row[1] == NO_DATE or ordinal < row[1]):
+            row[1] = ordinal
+    return [tuple(row) for row in rows]
+
+
+def get_improvements(times: array, earliest: array) -> t.List[t.Tuple[float, int]]:
+    """Return when the earliest date moved sooner than in the previous reading."""
+    improvements = []
+    previous = NO_DATE
+    for observed_at, ordinal in zip(times, earliest):
+        if ordinal != NO_DATE and previous != NO_DATE and ordinal < previous:
+            improvements.append((observed_at, previous - ordinal))
+        if ordinal != NO_DATE:
+            previous = ordinal
+    return improvements
+
+
+def follow_slots(
+    times: t.Sequence[float], date_lists: t.Sequence[tuple], slots=DEFAULT_SLOTS,
+    utc_offset_s=0
+) -> t.Tuple[t.List[int], array]:
+    """Find when leading dates are released and how long they stay offered.
+
+    Dates offered by the first reading were released earlier, so they count
+    for neither. A date leaving the leading window because sooner ones
+    appeared is no longer followed, since it may still be offered.
+    """
+    release_hours = [0] * 24
+    lifetimes = array("d")
+    # Date -> release time, or None when not seen released
+    released_at = {}
+    previous_window = None
+    for index, (observed_at, dates) in enumerate(zip(times, date_lists)):
+        window = dates[:slots]
+        if window == previous_window:
+            # Most readings repeat the previous one
+            continue
+        previous_window = window
+        offered = set(window)
+        last_followed = window[-1] if len(dates) > slots else None
+        for date in list(released_at):
+            if date in offered:
+                continue
+            since = released_at.pop(date)
+            if since is not None and (last_followed is None or date < last_followed):
+                lifetimes.append(observed_at - since)
+        for date in window:
+            if date in released_at:
+                continue
+            if index == 0:
+                released_at[date] = None
+                continue
+            released_at[date] = observed_at
+            release_hours[int((observed_at + utc_offset_s) % 86400 // 3600)] += 1
+    return release_hours, lifetimes
+
+
+def get_lifetime_histogram(lifetimes: t.Iterable[float]) -> t.List[int]:
+    counts = [0] * len(LIFETIME_BINS)
+    for lifetime in lifetimes:
+        counts[bisect.bisect_left(LIFETIME_BINS, lifetime)] += 1
+    return counts
+
+
+def build_report(
+    timeline: Timeline, bucket_s=DEFAULT_BUCKET_S, slots=DEFAULT_SLOTS, utc_offset_s=0
+) -> t.List[FacilityReport]:
+    """Summarise the readings of every facility in the timeline."""
+    reports = []
+    for facility_id in sorted(timeline.times):
+        times = array("d", timeline.times[facility_id])
+        date_lists = timeline.dates[facility_id]
+        earliest = get_earliest_ordinals(date_lists)
+        release_hours, lifetimes = follow_slots(times, date_lists, slots, utc_offset_s)
+        reports.append(FacilityReport(
+            facility_id, timeline.names[facility_id], times, earliest,
+            get_earliest_over_time(times, earliest, bucket_s, utc_offset_s),
+            release_hours, lifetimes, get_improvements(times, earliest),
+        ))
+    return reports
+
+
+def format_time(timestamp: float, utc_offset_s=0) -> str:
+    return datetime.datetime.fromtimestamp(
+        timestamp, datetime.timezone(datetime.timedelta(seconds=utc_offset_s))
+    ).isoformat(timespec="minutes")
+
+
+def format_date(ordinal: int) -> str:
+    return datetime.date.fromordinal(ordinal).isoformat() if ordinal != NO_DATE else ""
+
+
+def write_csv(path: str, header: t.Sequence[str], rows: t.Iterable[t.Sequence]):
+    with open(path, "w", newline="") as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def write_csv_files(reports: t.Sequence[FacilityReport], directory: str, utc_offset_s=0):
+    summaries = [report.summary() for report in reports]
+    write_csv(
+        os.path.join(directory, "facilities.csv"), list(summaries[0]) if summaries else [],
+        [list(summary.values()) for summary in summaries],
+    )
+    write_csv(
+        os.path.join(directory, "earliest_dates.csv"),
+        ["facility_id", "bucket_start", "earliest_date", "readings"],
+        [
+            (report.facility_id, format_time(start, utc_offset_s), format_date(ordinal), count)
+            for report in reports
+            for start, ordinal, count in report.earliest_over_time
+        ],
+    )
+    write_csv(
+        os.path.join(directory, "release_hours.csv"),
+        ["facility_id", "hour", "releases"],
+        [
+            (report.facility_id, hour, count)
+            for report in reports
+            for hour, count in enumerate(report.release_hours)
+        ],
+    )
+    write_csv(
+        os.path.join(directory, "slot_lifetimes.csv"),
+        ["facility_id", "max_lifetime_s", "slots"],
+        [
+            (report.facility_id, upper, count)
+            for report in reports
+            for upper, count in zip(LIFETIME_BINS, get_lifetime_histogram(report.slot_lifetimes))
+        ],
+    )
+
+
+def render_line_svg(points: t.Sequence[t.Tuple[float, int]], width=720, height=160) -> str:
+    """Plot dates over time, sooner dates lower."""
+    points = [(x, y) for x, y in points if y != NO_DATE]
+    if not points:
+        return "<p>No dates offered.</p>"
+    min_x, max_x = points[0][0], points[-1][0]
+    min_y, max_y = min(y for _, y in points), max(y for _, y in points)
+    scale_x = (width - 10) / ((max_x - min_x) or 1)
+    scale_y = (height - 10) / ((max_y - min_y) or 1)
+    path = " ".join(
+        f"{5 + (x - min_x) * scale_x:.1f},{height - 5 - (y - min_y) * scale_y:.1f}"
+        for x, y in points
+    )
+    return (
+        f'<svg width="{width}" height="{height}" role="img">'
+        f'<polyline fill="none" stroke="#1f6feb" stroke-width="1.5" points="{path}"/></svg>'
+        f"<p>From {format_date(min_y)} to {format_date(max_y)}.</p>"
+    )
+
+
+def render_bars_svg(counts: t.Sequence[int], width=720, height=120) -> str:
+    top = max(counts) or 1
+    bar_width = width / len(counts)
+    bars = "".join(
+        f'<rect x="{index * bar_width + 1:.1f}" y="{height - 15 - count / top * (height - 20):.1f}"'
+        f' width="{bar_width - 2:.1f}" height="{count / top * (height - 20):.1f}"'
+        f' fill="#2da44e"><title>{index:02d}:00 {count}</title></rect>'
+        f'<text x="{index * bar_width + bar_width / 2:.1f}" y="{height - 2}" font-size="9"'
+        f' text-anchor="middle">{index}</text>'
+        for index, count in enumerate(counts)
+    )
+    return f'<svg width="{width}" height="{height}" role="img">{bars}</svg>'
+
+
+def render_html(reports: t.Sequence[FacilityReport], generated_at: float, utc_offset_s=0) -> str:
+    summaries = [report.summary() for report in reports]
+    header = "".join(f"<th>{html.escape(name)}</th>" for name in summaries[0]) if summaries else ""
+    rows = "".join(
+        "<tr>" + "".join(f"<td>{html.escape(str(value))}</td>" for value in summary.values())
+        + "</tr>"
+        for summary in summaries
+    )
+    sections = "".join(
+        f"<h2>{html.escape(report.facility_name)} ({html.escape(report.facility_id)})</h2>"
+        f"<h3>Earliest date offered</h3>"
+        f"{render_line_svg([(start, ordinal) for start, ordinal, _ in report.earliest_over_time])}"
+        f"<h3>Releases by hour of day (UTC{utc_offset_s / 3600:+g})</h3>"
+        f"{render_bars_svg(report.release_hours)}"
+        for report in reports
+    )
+    return (
+        "<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>Availability report</title>"
+        "<style>body{font-family:sans-serif;margin:2em}table{border-collapse:collapse}"
+        "td,th{border:1px solid #ccc;padding:.3em .6em;text-align:right}</style></head><body>"
+        f"<h1>Availability report</h1><p>Generated {format_time(generated_at, utc_offset_s)}.</p>"
+        f"<table><tr>{header}</tr>{rows}</table>{sections}</body></html>"
+    )
+
+
+def write_report(
+    reports: t.Sequence[FacilityReport], directory: str, utc_offset_s=0,
+    generated_at: t.Optional[float] = None
+):
+    os.makedirs(directory, exist_ok=True)
+    write_csv_files(reports, directory, utc_offset_s)
+    generated_at = time.time() if generated_at is None else generated_at
+    with open(os.path.join(directory, "report.html"), "w") as html_file:
+        html_file.write(render_html(reports, generated_at, utc_offset_s))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m autovisa.src.report",
+        description="Summarise recorded availability as CSV files and an HTML page.",
+    )
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument(
+        "--db", default=os.getenv("OBSERVATION_DB"), help="observation store to summarise"
+    )
+    source.add_argument("--timeline", help="JSON file with recorded readings")
+    parser.add_argument("--output", default="report", help="directory to write the report to")
+    parser.add_argument("--days", type=float, help="only summarise the last DAYS days")
+    parser.add_argument("--bucket", type=int, default=DEFAULT_BUCKET_S // 60,
+                        help="minutes per earliest-date bucket")
+    parser.add_argument("--slots", type=int, default=DEFAULT_SLOTS,
+                        help="leading dates followed in each reading")
+    parser.add_argument("--utc-offset", type=float, default=time.localtime().tm_gmtoff / 3600,
+                        help="hours from UTC used for times of day (default: local)")
+    args = parser.parse_args(argv)
+
+    logger.setLevel(logging.WARNING)
+    since = time.time() - args.days * 86400 if args.days else None
+    if args.timeline:
+        timeline = Timeline.from_json(args.timeline)
+    elif args.db:
+        store = ObservationStore(args.db)
+        timeline = Timeline.from_store(store, since)
+        store.close()
+    else:
+        parser.error("either --db (or OBSERVATION_DB) or --timeline is required")
+    if not len(timeline):
+        parser.error("the timeline has no readings")
+
+    utc_offset_s = round(args.utc_offset * 3600)
+    reports = build_report(timeline, args.bucket * 60, args.slots, utc_offset_s)
+    write_report(reports, args.output, utc_offset_s)
+    print(os.path.join(args.output, "report.html"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""Asyncio runner keeping the blocking browser work on a thread of its own.
+
+Every Scheduler method, and so every WebDriver call, runs in order on a
+single-thread executor. The waits between checks and between sessions are
+awaited on the event loop instead, so background tasks keep running while the
+browser idles.
+"""
+import asyncio
+import datetime
+import functools
+import logging
+import typing as t
+from concurrent.futures import ThreadPoolExecutor
+
+from autovisa.src.config import Config, ConfigLoader
+from autovisa.src.constants import LOGGER_NAME, RECORDER_DUMP_TIMEOUT, STATUS_LOG_INTERVAL
+from autovisa.src.schedule import Scheduler
+from autovisa.src.utils import get_sleep_duration
+
+logger = logging.getLogger(LOGGER_NAME)
+
+
+def create_scheduler(config: Config, config_loader: ConfigLoader, controller=None) -> Scheduler:
+    """Launch a browser and prepare a scheduler for a new session."""
+    scheduler = Scheduler()
+    scheduler.apply_config(config)
+    scheduler.config_loader = config_loader
+    scheduler.controller = controller
+    if controller:
+        controller.scheduler = scheduler
+    return scheduler
+
+
+def close_observation_store(scheduler: Scheduler):
+    """Release the observation store opened for the session, if any."""
+    if scheduler.observation_store is None:
+        return
+    try:
+        scheduler.observation_store.close()
+    except Exception as close_err:
+        logger.warning("! Failed to close observation store: %s", str(close_err))
+    scheduler.observation_store = None
+
+
+def close_failed_session(scheduler: Scheduler, err: Exception):
+    """Record what the browser showed when the session failed, then close it."""
+    logger.error(str(err), exc_info=err)
+    # Read the page before the browser goes away, without waiting on a hung one
+    scheduler.recorder.dump(scheduler.driver, err).join(RECORDER_DUMP_TIMEOUT)
+    close_observation_store(scheduler)
+    try:
+        logger.info("... Closing browser.")
+        # close() would only close the current tab
+        scheduler.driver.quit()
+    except Exception as close_err:
+        logger.warning("! Failed to close browser: %s", str(close_err))
+
+
+def quit_browser(scheduler: Scheduler):
+    close_observation_store(scheduler)
+    try:
+        scheduler.driver.quit()
+    except Exception as quit_err:
+        logger.warning("! Failed to quit browser: %s", str(quit_err))
+
+
+class AsyncRuntime:
+    """Run scheduler sessions from an event loop, with the browser on one thread.
+
+    The Scheduler is created on the driver thread too, as its SQLite connection
+    may only be used from the thread that opened it.
+    """
+    scheduler: t.Optional[Scheduler] = None
+
+    def __init__(self, controller=None):
+        self.controller = controller
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="autovisa-driver")
+        self.loop: t.Optional[asyncio.AbstractEventLoop] = None
+        self.tasks: t.Set[asyncio.Task] = set()
+
+    async def call(self, function: t.Callable, *args, **kwargs):
+        """Run a blocking call on the driver thread and await its result."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, functools.partial(function, *args, **kwargs)
+        )
+
+    async def sleep(self, duration: float) -> bool:
+        """Wait without holding the driver thread, letting the controller cut it short.
+
+        Return whether the wait was cut short by a command.
+        """
+        if self.controller is None:
+            await asyncio.sleep(duration)
+            return False
+        return await self.controller.async_wait(duration)
+
+    def wait_from_driver(self, duration: float) -> bool:
+        """Wait from the driver thread, with the wait itself awaited on the event loop."""
+        return asyncio.run_coroutine_threadsafe(self.sleep(duration), self.loop).result()
+
+    def start_task(self, coroutine: t.Coroutine, name: t.Optional[str] = None) -> asyncio.Task:
+        """Run a coroutine alongside the sessions until the runtime stops."""
+        task = asyncio.get_running_loop().create_task(coroutine, name=name)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
+    def every(self, interval: float, function: t.Callable, name: t.Optional[str] = None):
+        """Call a quick, non-blocking function every `interval` seconds."""
+        async def repeat():
+            while True:
+                await asyncio.sleep(interval)
+                try:
+                    function()
+                except Exception as err:
+                    logger.warning("! Background task %s failed: %s", name, str(err))
+
+        return self.start_task(repeat(), name=name)
+
+    def log_status(self):
+        if self.scheduler is None:
+            return
+        status = self.scheduler.get_status()
+        logger.info(
+            "... Status: %s, %d checks, %d reschedules",
+            status["phase"], status["metrics"].get("checks", 0),
+            status["metrics"].get("reschedules", 0)
+        )
+
+    @property
+    def is_draining(self) -> bool:
+        return bool(self.controller and self.controller.is_draining)
+
+    async def run_session(
+        self, config: Config, config_loader: ConfigLoader, applicant_info: str
+    ) -> Scheduler:
+        """Log in and check for appointments until the session ends or fails."""
+        logger.info("=" * 80)
+        logger.info("/ Initiating new instance at %s", datetime.datetime.now())
+        scheduler = await self.call(create_scheduler, config, config_loader, self.controller)
+        scheduler.runtime = self
+        self.scheduler = scheduler
+        try:
+            await self.call(scheduler.run_reschedule_suite, applicant_info=applicant_info)
+        except Exception as err:
+            await self.call(close_failed_session, scheduler, err)
+        return scheduler
+
+    async def run(self, config: Config, config_loader: ConfigLoader, applicant_info: str):
+        """Run sessions one after another, hibernating in between, until drained."""
+        self.loop = asyncio.get_running_loop()
+        self.every(STATUS_LOG_INTERVAL, self.log_status, name="status")
+        try:
+            while True:
+                config = config_loader.reload_if_changed() or config
+                scheduler = await self.run_session(config, config_loader, applicant_info)
+                # Keep the settings reloaded during the session
+                config = scheduler.config
+                if not self.is_draining:
+                    logger.info("... Hibernating at %s", datetime.datetime.now())
+                    await self.sleep(get_sleep_duration(*config.hibernate_bounds))
+
+                if self.is_draining:
+                    logger.info("... Drained, exiting at %s", datetime.datetime.now())
+                    await self.call(quit_browser, scheduler)
+                    break
+        finally:
+            await self.close()
+
+    async def close(self):
+        """Stop the background tasks and release the driver thread."""
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.executor.shutdown(wait=False)
@@ -1,49 +1,404 @@
 """Provide class for scheduling visa."""
 import datetime
+import hashlib
 import logging
 import os
+import time
 import typing as t
+from collections import Counter
 from urllib.parse import urlparse
 
-from selenium.common import TimeoutException
+from selenium.common import NoSuchElementException, TimeoutException, WebDriverException
 from selenium.webdriver import Keys
 from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support.select import Select
 from selenium.webdriver.support.wait import WebDriverWait
 from seleniumwire.request import Request
 
 from autovisa.src.appointment import Appointment
+from autovisa.src.checkpoint import (
+    Checkpoint, clear_checkpoint, get_checkpoint_path, load_checkpoint, save_checkpoint
+)
+from autovisa.src.config import Config, ConfigLoader
 from autovisa.src.constants import (
-    ALLOWED_CITY_IDS, CITY_NAME_ID_MAP, EXCLUDE_DATE_END, EXCLUDE_DATE_START,
-    LOGIN_PATH, LOGGER_NAME
+    ALLOWED_CITY_IDS, DEFAULT_LOCALE, LOGIN_MODE_FAST, LOGIN_PATH_TEMPLATE, LOGIN_TIMEOUT,
+    LOGGER_NAME, MAX_CALENDAR_PAGES, MAX_NAVIGATION_STEPS, TIME_PREFETCH_DATES
+)
+from autovisa.src.decoding import iter_json_items, load_json_response
+from autovisa.src.exceptions import (
+    MissingDatesException, NavigationException, SiteUnavailableException,
+    UnknownFacilityException
 )
-from autovisa.src.exceptions import MissingDatesException
+from autovisa.src.facilities import (
+    FACILITY_SELECT_ID, FacilityCatalog, load_catalog, refresh_facility_days, revalidate_catalog
+)
+from autovisa.src.locales import LocalePack, get_locale_code, get_locale_pack, get_site_root
+from autovisa.src.observations import Observation, ObservationStore, open_observation_store
+from autovisa.src.page_state import PageState, detect_page_state
+from autovisa.src.tabs import FacilityTabs
+from autovisa.src.timeslots import TimePrefetch, choose_date_with_slots
 from autovisa.src.utils import (
-    get_credentials, get_dict_response,
-    is_prod, long_sleep, quick_sleep, rand_sleep, wait_page_load, wait_request
+    get_credentials, get_login_mode, get_sleep_duration,
+    is_prod, is_tabs_mode, rand_sleep, wait_page_load, wait_request
 )
+from autovisa.src.watchdog import MemoryWatchdog
 from autovisa.src.webdriver import WebDriver
 
 logger = logging.getLogger(LOGGER_NAME)
 
+DATE_INPUT_ID = "appointments_consulate_appointment_date"
+TIME_SELECT_ID = "appointments_consulate_appointment_time"
+DATE_CELL_SELECTOR = "td[data-handler='selectDay'][data-month='{month}'][data-year='{year}'] a"
+CONFIRM_BUTTON_SELECTOR = "body > div.reveal-overlay > div > div > a.button.alert"
+
+
+class Phase:
+    """Names of the steps the scheduler goes through."""
+    STARTING = "starting"
+    LOGIN = "login"
+    APPOINTMENT_LIST = "appointment_list"
+    NAVIGATION = "navigation"
+    CHECK = "check"
+    WAITING = "waiting"
+    RESCHEDULE = "reschedule"
+    DONE = "done"
+
+
+class DetectionState(t.NamedTuple):
+    """What the check that found the new appointment left behind."""
+    facility_id: t.Optional[str]
+    dates: t.Tuple[str, ...]
+    detected_at: float
+    # Whether the form in the browser shows the calendar of this facility
+    on_page: bool
+
+
+class LoginTiming(t.NamedTuple):
+    mode: str
+    # From the first field to the submission
+    fill_s: float
+    # From the submission to the next page
+    page_load_s: float
+
 
 class Scheduler(WebDriver):
     """Class for encapsulating business logic for scheduling interviews."""
     current_appointment_list: t.Optional[t.List[Appointment]] = None
     current_appointment: t.Optional[Appointment] = None
+    # Position of the current appointment in the list
+    current_index = 0
+    appointment_list_url: t.Optional[str] = None
+    applicant_info: t.Optional[str] = None
+    # Where the state is saved after each phase; None disables checkpoints
+    checkpoint_path: t.Optional[str] = None
     new_appointment: t.Optional[Appointment] = None
+    detection: t.Optional[DetectionState] = None
+    time_prefetch: t.Optional[TimePrefetch] = None
+    last_commit_latency: t.Optional[float] = None
+    last_login: t.Optional[LoginTiming] = None
+    reschedule_url: t.Optional[str] = None
+    facility_catalog: t.Optional[FacilityCatalog] = None
+    allowed_city_ids: t.Sequence[str] = ALLOWED_CITY_IDS
+    config = Config()
+    # Re-read between checks when set
+    config_loader: t.Optional[ConfigLoader] = None
+    observation_store: t.Optional[ObservationStore] = None
+    # One form tab per facility, when FACILITY_TABS is set
+    facility_tabs: t.Optional[FacilityTabs] = None
+    controller = None
+    # Set when run by the asyncio runtime, which awaits the waits between checks
+    runtime = None
+    phase = Phase.STARTING
+
+    def __init__(self):
+        super().__init__()
+        self.observations = {}
+        self.metrics = Counter()
+        self.watchdog = MemoryWatchdog()
+        self.observation_store = open_observation_store()
+        # Digest and dates of the last days payload evaluated per facility
+        self.payload_digests = {}
+        if is_tabs_mode():
+            self.facility_tabs = FacilityTabs()
+
+    def set_phase(self, phase: str):
+        """Record the step the scheduler is currently in."""
+        logger.debug("> set_phase %s", phase)
+        self.phase = phase
+        self.recorder.record("phase", phase=phase)
+        self.write_checkpoint()
+
+    def write_checkpoint(self):
+        """Save the state needed to resume after a restart."""
+        if self.checkpoint_path is None or not self.current_appointment_list:
+            return
+        try:
+            cookies = tuple(self.driver.get_cookies())
+        except WebDriverException as err:
+            logger.warning("! Failed to read cookies: %s", str(err))
+            cookies = ()
+        checkpoint = Checkpoint(
+            self.applicant_info, tuple(self.current_appointment_list), self.current_index,
+            self.appointment_list_url, self.reschedule_url, self.observations, cookies,
+            time.time(),
+        )
+        try:
+            save_checkpoint(checkpoint, self.checkpoint_path)
+        except (OSError, TypeError, ValueError) as err:
+            logger.warning("! Failed to save checkpoint: %s", str(err))
+
+    def resume_from_checkpoint(self, applicant_info=None) -> bool:
+        """Restore the state saved by a previous run for the same applicant.
+
+        The saved session cookies are put back and the last page is loaded;
+        whether the session is still valid is left to the navigation to find out.
+        """
+        checkpoint = load_checkpoint(self.checkpoint_path) if self.checkpoint_path else None
+        if (
+            checkpoint is None or checkpoint.applicant_info != applicant_info
+            or checkpoint.current_index >= len(checkpoint.appointments)
+        ):
+            return False
+
+        logger.info("... Resuming from checkpoint saved at %s",
+                    datetime.datetime.fromtimestamp(checkpoint.saved_at))
+        self.current_appointment_list = list(checkpoint.appointments)
+        self.current_index = checkpoint.current_index
+        self.appointment_list_url = checkpoint.appointment_list_url
+        self.reschedule_url = checkpoint.reschedule_url
+        self.observations.update(checkpoint.observations or {})
+
+        resume_url = checkpoint.reschedule_url or checkpoint.appointment_list_url
+        if resume_url:
+            # Cookies can only be set on a page of their domain
+            self.driver.get(resume_url)
+            for cookie in checkpoint.cookies:
+                try:
+                    self.driver.add_cookie(cookie)
+                except WebDriverException as err:
+                    logger.warning(
+                        "! Failed to restore cookie %s: %s", cookie.get("name"), str(err)
+                    )
+            self.driver.get(resume_url)
+        self.metrics["resumes"] += 1
+        return True
+
+    def record_observation(self, city: str, candidate: t.Optional[datetime.date]):
+        """Keep the latest availability reading for a facility."""
+        self.observations[city] = {
+            "date": candidate.isoformat() if candidate else None,
+            "observed_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        }
+
+    def publish_observation(self, city: str, dates: t.List[str]):
+        """Share a fresh availability reading with the other local processes."""
+        if self.observation_store is None:
+            return
+        facility = self.get_facility_catalog().get(city)
+        if facility is None:
+            return
+        self.observation_store.publish(facility.id, facility.name, dates)
+
+    def get_shared_observation(self, facility) -> t.Optional[Observation]:
+        """Return a fresh reading of a facility published by another process."""
+        if self.observation_store is None:
+            return None
+        observation = self.observation_store.get_fresh(facility.id)
+        if observation is None or observation.source == self.observation_store.source:
+            return None
+        logger.debug("> get_shared_observation %s from %s", facility.id, observation.source)
+        self.metrics["shared_observations"] += 1
+        return observation
+
+    def get_status(self) -> dict:
+        """Return a JSON-serializable snapshot of the scheduler state."""
+        return {
+            "phase": self.phase,
+            "current_appointment": repr(self.current_appointment)
+            if self.current_appointment else None,
+            "observations": dict(self.observations),
+            "metrics": dict(self.metrics),
+            "last_commit_latency_s": self.last_commit_latency,
+            "last_login": self.last_login._asdict() if self.last_login else None,
+        }
+
+    def should_stop(self) -> bool:
+        """Return whether an operator asked the scheduler to drain and exit."""
+        return bool(self.controller and self.controller.is_draining)
+
+    def wait_next_check(self):
+        """Wait between checks, letting the controller cut the wait short."""
+        self.set_phase(Phase.WAITING)
+        if self.runtime is not None:
+            self.runtime.wait_from_driver(get_sleep_duration(*self.config.sleep_bounds))
+        elif self.controller:
+            self.controller.wait(get_sleep_duration(*self.config.sleep_bounds))
+        else:
+            rand_sleep(*self.config.sleep_bounds)
+
+    def apply_config(self, config: Config):
+        """Use new settings from the next check on."""
+        self.config = config
+        self.allowed_city_ids = config.allowed_city_ids
+        # Unchanged payloads may be judged differently now
+        self.payload_digests.clear()
+
+    def reload_config(self) -> bool:
+        """Pick up configuration changes; only call this between checks."""
+        if self.config_loader is None:
+            return False
+        config = self.config_loader.reload_if_changed()
+        if config is None:
+            return False
+        self.apply_config(config)
+        self.metrics["config_reloads"] += 1
+        return True
+
+    def recycle_driver_if_needed(self) -> bool:
+        """Replace the browser when memory usage exceeds the watchdog thresholds.
+
+        Only call this between checks, when no action is in flight.
+        """
+        sample = self.watchdog.sample(self.driver)
+        if not self.watchdog.should_recycle(sample):
+            return False
+
+        self.metrics["driver_recycles"] += 1
+        self.recycle_driver()
+        self.watchdog.reset()
+        return True
+
+    def wait_for_new_appointment(self):
+        """Keep checking cities until a suitable date shows up."""
+        while not self.new_appointment:
+            logger.info("... No good appointments found.")
+            self.wait_next_check()
+            if self.should_stop():
+                return
+            self.reload_config()
+            if self.check_shared_observations():
+                continue
+            if not self.recycle_driver_if_needed():
+                self.refresh_availability()
+            logger.info("... Checking cities again.")
+            self.get_best_date()
+
+    def refresh_availability(self) -> bool:
+        """Get fresh availability into the loaded form without reloading the page.
+
+        The form fetches the days of its selected facility again, as it does when
+        the facility changes; the page is only reloaded when it is not the form.
+        Return whether the page was kept.
+        """
+        if self.detect_page_state() == PageState.RESCHEDULE_FORM:
+            if self.facility_tabs is not None or len(self.allowed_city_ids) > 1:
+                # The check refreshes the tabs or reselects every facility itself
+                return True
+            city_select_element = self.find_element(By.ID, FACILITY_SELECT_ID)
+            facility_id = (
+                Select(city_select_element).first_selected_option.get_attribute("value")
+                if city_select_element else None
+            )
+            if facility_id:
+                del self.driver.requests
+                if refresh_facility_days(self.driver, facility_id):
+                    self.metrics["availability_refreshes"] += 1
+                    return True
+
+        logger.info("... Reloading the page.")
+        self.metrics["page_reloads"] += 1
+        # Only the days requested by the reloaded page may be evaluated
+        del self.driver.requests
+        self.driver.refresh()
+        return False
+
+    def check_shared_observations(self) -> bool:
+        """Evaluate the readings published by other processes in place of a check.
+
+        Return False, leaving the browser to do the check, unless every allowed
+        facility has a fresh reading.
+        """
+        if self.observation_store is None:
+            return False
+        facilities = self.get_facility_catalog().resolve(self.allowed_city_ids)
+        observations = [self.get_shared_observation(facility) for facility in facilities]
+        if not facilities or not all(observations):
+            return False
+
+        logger.info("... Using availability shared by other processes.")
+        self.new_appointment = None
+        self.detection = None
+        self.time_prefetch = None
+        for facility, observation in zip(facilities, observations):
+            try:
+                if self.evaluate_dates(facility.name, observation.dates, on_page=False):
+                    break
+            except MissingDatesException as err:
+                logger.info("... No dates for %s: %s", facility.name, str(err))
+        return True
+
+    @property
+    def locale_pack(self) -> LocalePack:
+        """Return the parsing tables for the locale of the base URL."""
+        return get_locale_pack(get_locale_code(os.getenv("BASE_URL")))
+
+    def get_facility_catalog(self) -> FacilityCatalog:
+        """Return the facility catalog, loading the cached one on first use."""
+        if self.facility_catalog is None:
+            locale = self.locale_pack.code
+            self.facility_catalog = load_catalog(locale) or (
+                FacilityCatalog.from_city_map(locale=locale)
+                if locale == DEFAULT_LOCALE else FacilityCatalog([], locale=locale)
+            )
+        return self.facility_catalog
+
+    def refresh_facility_catalog(self) -> FacilityCatalog:
+        """Revalidate the catalog against the loaded reschedule form."""
+        self.facility_catalog = revalidate_catalog(
+            self.driver, self.get_facility_catalog(), self.locale_pack.code
+        )
+        return self.facility_catalog
 
     def navigate_login_page(self):
         logger.debug("> navigate_login_page")
-        login_url = os.getenv("BASE_URL", "").rstrip("/") + LOGIN_PATH
+        base_url = os.getenv("BASE_URL", "")
+        login_url = get_site_root(base_url) + LOGIN_PATH_TEMPLATE.format(
+            locale=get_locale_code(base_url)
+        )
         self.driver.get(login_url)
         wait_page_load()
 
     def execute_login(self):
+        """Fill in credentials, consent to privacy policy and try logging in.
+
+        Filling the form and loading the next page are timed separately.
+        """
         logger.debug("> execute_login")
-        """Fill in credentials, consent to privacy policy and try logging in."""
+        self.set_phase(Phase.LOGIN)
+        mode = get_login_mode()
         email, password = get_credentials()
 
+        start = time.monotonic()
+        if mode == LOGIN_MODE_FAST:
+            self.fill_login_form(email, password)
+        else:
+            self.type_login_form(email, password)
+        submitted = time.monotonic()
+        if mode == LOGIN_MODE_FAST:
+            self.wait_login_page()
+        else:
+            wait_page_load()
+
+        self.last_login = LoginTiming(mode, submitted - start, time.monotonic() - submitted)
+        self.recorder.record("login", **self.last_login._asdict())
+        logger.info(
+            "... Login form filled in %.2f s (%s), next page in %.2f s",
+            self.last_login.fill_s, mode, self.last_login.page_load_s
+        )
+
+    def type_login_form(self, email: str, password: str):
+        """Type the credentials and submit them, with human-like delays."""
         email_input = self.quick_select_element("user_email")
         self.write_input(email_input, email)
 
@@ -55,11 +410,27 @@ class Scheduler(WebDriver):
 
         # Click CTA
         self.slow_select_element("commit")
-        wait_page_load()
+
+    def fill_login_form(self, email: str, password: str):
+        """Fill each field in a single command and submit, without delays."""
+        self.fill_input(self.instant_select_element("user_email"), email)
+        self.fill_input(self.instant_select_element("user_password"), password)
+        self.instant_select_element(".icheckbox")
+        self.instant_select_element("commit")
+
+    def wait_login_page(self, timeout=LOGIN_TIMEOUT):
+        """Wait until the browser leaves the sign-in page."""
+        try:
+            WebDriverWait(self.driver, timeout, poll_frequency=0.2).until(
+                lambda driver: detect_page_state(driver) != PageState.SIGN_IN
+            )
+        except TimeoutException:
+            logger.warning("! Still on the sign-in page %d s after submitting.", timeout)
 
     def gen_current_appointment_list(self, applicant_info=None):
         """Parse raw text in page and store new Appointment instances."""
         logger.debug("> get_current_appointment_list")
+        self.set_phase(Phase.APPOINTMENT_LIST)
         rand_sleep(1, 2)
 
         # Find appointment element
@@ -69,7 +440,7 @@ class Scheduler(WebDriver):
 
         current_appointment_list = []
         for base_element in appointment_cards:
-            appointment = Appointment.create_from_element(base_element)
+            appointment = Appointment.create_from_element(base_element, self.locale_pack)
             if applicant_info and appointment.match_applicant(applicant_info):
                 current_appointment_list.append(appointment)
                 logger.info("... Current appointment: %s", appointment)
@@ -80,16 +451,80 @@ class Scheduler(WebDriver):
     def navigate_reschedule_page(self):
         """Expand appropriate section and click CTAs to open the rescheduling page."""
         logger.debug("> navigate_reschedule_page")
-        # Click "continue" CTA
-        self.slow_select_element("//a[contains(text(), 'Continue')]")
+        self.open_appointment_actions()
+        self.open_reschedule_form()
+
+    def open_appointment_actions(self):
+        """Leave the appointment list, preferring a known reschedule URL."""
+        logger.debug("> open_appointment_actions")
+        if self.reschedule_url:
+            self.driver.get(self.reschedule_url)
+        elif self.current_appointment and self.current_appointment.link:
+            self.driver.get(self.current_appointment.link)
+        else:
+            # Click "continue" CTA
+            self.slow_select_element("//a[contains(text(), 'Continue')]")
         wait_page_load()
 
+    def open_reschedule_form(self):
+        """Expand the reschedule section and click its CTA."""
+        logger.debug("> open_reschedule_form")
         # Expand "reschedule" section
         self.slow_select_element("//a[.//h5/span[contains(@class, 'fa-calendar-minus')]]")
         # Click "reschedule" CTA
         self.slow_select_element("//a[contains(text(), 'Reschedule Appointment')]")
         wait_page_load()
 
+    def reopen_known_page(self):
+        """Load the last reschedule form, or the login page if none is known."""
+        logger.debug("> reopen_known_page")
+        if self.reschedule_url:
+            self.driver.get(self.reschedule_url)
+            wait_page_load()
+        else:
+            self.navigate_login_page()
+
+    def detect_page_state(self) -> str:
+        """Classify the page currently loaded in the browser."""
+        state = detect_page_state(self.driver)
+        logger.debug("> detect_page_state %s", state)
+        self.recorder.record("page_state", state=state, url=self.driver.current_url)
+        return state
+
+    def get_navigation_transition(self, state: str) -> t.Callable:
+        """Return the action that moves the browser one step closer to the
+        reschedule form from the given page state.
+        """
+        return {
+            PageState.SIGN_IN: self.execute_login,
+            PageState.SESSION_EXPIRED: self.navigate_login_page,
+            PageState.APPOINTMENT_LIST: self.open_appointment_actions,
+            PageState.APPOINTMENT_ACTIONS: self.open_reschedule_form,
+            PageState.UNKNOWN: self.reopen_known_page,
+        }[state]
+
+    def navigate_to_reschedule_form(self, max_steps=MAX_NAVIGATION_STEPS) -> str:
+        """Drive the browser from wherever it currently is to the reschedule form,
+        taking the fewest navigations allowed by the page state.
+        """
+        logger.debug("> navigate_to_reschedule_form")
+        state = PageState.UNKNOWN
+        for _ in range(max_steps):
+            state = self.detect_page_state()
+            if state == PageState.RESCHEDULE_FORM:
+                self.reschedule_url = self.driver.current_url
+                return state
+            if state in (PageState.MAINTENANCE, PageState.RATE_LIMITED):
+                raise SiteUnavailableException(f"Site unavailable: {state}")
+
+            logger.info("... Navigating from %s page", state)
+            self.set_phase(Phase.NAVIGATION)
+            self.metrics["navigations"] += 1
+            self.get_navigation_transition(state)()
+        raise NavigationException(
+            f"Reschedule form not reached after {max_steps} steps (last page: {state})"
+        )
+
     def find_json_request(self, city) -> t.Optional[Request]:
         """Traverse requests list multiple times to find the JSON response,
         which contains the available dates.
@@ -116,7 +551,7 @@ class Scheduler(WebDriver):
             self, candidate, candidate_repr, city
     ) -> bool:
         """Ensure candidate for new best date is sooner than the best ones so far."""
-        logger.debug(f"> validate_candidate {candidate}")
+        logger.debug("> validate_candidate %s", candidate)
         if candidate >= self.current_appointment.date:
             logger.info(
                 "Best available date for %s ignored: %s "
@@ -125,7 +560,7 @@ class Scheduler(WebDriver):
             )
             return False
 
-        if EXCLUDE_DATE_START <= candidate <= EXCLUDE_DATE_END:
+        if self.config.is_excluded(candidate):
             logger.info(
                 "Best date for %s ignored: %s (within exclude date range)",
                 city, candidate_repr
@@ -134,8 +569,7 @@ class Scheduler(WebDriver):
         return True
 
     def choose_best_date_for_city(self, option_text):
-        date_select = self.slow_select_element(
-            "appointments_consulate_appointment_date")
+        date_select = self.slow_select_element(DATE_INPUT_ID)
         if not date_select:
             # No dates for selected city
             logger.info("... No dates for %s", option_text)
@@ -144,21 +578,107 @@ class Scheduler(WebDriver):
                 raise MissingDatesException(error_txt.text)
             raise MissingDatesException("No field for selecting dates found in the form.")
 
-        request = self.find_json_request(option_text)
+        return self.evaluate_days_request(option_text, self.find_json_request(option_text))
+
+    def evaluate_days_request(self, city: str, request) -> t.Optional[Appointment]:
+        """Evaluate the available dates carried by a captured days request.
+
+        A payload identical to the last one of the facility is not evaluated again,
+        and only the leading dates are decoded unless the whole list is shared.
+        """
         if not request:
-            MissingDatesException("Could not find JSON request with available dates.")
+            raise MissingDatesException("Could not find JSON request with available dates.")
+        self.metrics["json_requests"] += 1
 
-        # Get first date
-        response = get_dict_response(request)
-        candidate_repr = response[0]["date"]
+        response = request.response
+        self.recorder.record(
+            "response", url=request.url, status=response.status_code, size=len(response.body)
+        )
+        # Compare the body as captured, so an unchanged one is not even decompressed
+        digest = hashlib.blake2b(response.body, digest_size=16).digest()
+        last_digest, last_dates = self.payload_digests.get(city, (None, None))
+        if last_digest == digest:
+            logger.info("... Availability for %s unchanged.", city)
+            self.metrics["unchanged_payloads"] += 1
+            # Still a fresh reading, for the other processes and the timelines
+            self.record_observation(
+                city, datetime.date.fromisoformat(last_dates[0]) if last_dates else None
+            )
+            self.publish_observation(city, last_dates)
+            return None
+
+        if self.observation_store is None:
+            dates = self.read_candidate_dates(iter_json_items(response))
+        else:
+            dates = [day["date"] for day in load_json_response(response)]
+        # Kept once decoded, so a body that failed is not skipped as unchanged
+        self.payload_digests[city] = (digest, dates)
+        self.publish_observation(city, dates)
+        return self.evaluate_dates(city, dates)
+
+    def read_candidate_dates(self, days: t.Iterable[dict]) -> t.List[str]:
+        """Read the dates of a days payload only as far as they can be picked.
+
+        Reading stops at the first date that does not beat the current appointment,
+        as no later one can, or once the dates to prefetch after the first
+        acceptable one are read.
+        """
+        dates = []
+        first_index = None
+        for day in days:
+            dates.append(day["date"])
+            candidate = datetime.date.fromisoformat(day["date"])
+            if candidate >= self.current_appointment.date:
+                break
+            if first_index is None and not self.config.is_excluded(candidate):
+                first_index = len(dates) - 1
+            if first_index is not None and len(dates) - first_index >= TIME_PREFETCH_DATES:
+                break
+        return dates
+
+    def find_candidate_index(self, dates: t.Sequence[str]) -> int:
+        """Return the index of the first date outside the exclude date range, or of
+        the first one that does not beat the current appointment, if that is sooner.
+        """
+        for index, candidate_repr in enumerate(dates):
+            candidate = datetime.date.fromisoformat(candidate_repr)
+            if candidate >= self.current_appointment.date or not self.config.is_excluded(candidate):
+                return index
+        return len(dates) - 1
+
+    def evaluate_dates(
+        self, city: str, dates: t.Sequence[str], on_page=True
+    ) -> t.Optional[Appointment]:
+        """Keep the first available date that meets the constraints, if any.
+
+        `on_page` tells whether the form currently shows this facility.
+        """
+        if not dates:
+            raise MissingDatesException("The list of available dates is empty.")
 
-        year, month, day = list(map(int, candidate_repr.split("-")))
-        candidate = datetime.date(year, month, day)
+        # The first date is the earliest offered, whether it is picked or not
+        self.record_observation(city, datetime.date.fromisoformat(dates[0]))
+        index = self.find_candidate_index(dates)
+        if index:
+            logger.info(
+                "... Skipped %d date(s) for %s within exclude date range", index, city
+            )
+        dates = dates[index:]
+        candidate_repr = dates[0]
+        candidate = datetime.date.fromisoformat(candidate_repr)
         if not self.validate_candidate(
-                candidate, candidate_repr, option_text
+                candidate, candidate_repr, city
         ):
             return
-        self.new_appointment = Appointment(day, month, year, "", option_text)
+        self.new_appointment = Appointment(
+            candidate.day, candidate.month, candidate.year, "", city
+        )
+        facility = self.get_facility_catalog().get(city)
+        self.detection = DetectionState(
+            facility.id if facility else None, tuple(dates), time.monotonic(), on_page
+        )
+        self.start_time_prefetch(city, dates)
+        self.metrics["candidates"] += 1
 
         logger.info(
             "//////////////\n\n//// New best date found: %s\n\n//////////////",
@@ -166,39 +686,93 @@ class Scheduler(WebDriver):
         )
         return self.new_appointment
 
+    def start_time_prefetch(self, city: str, dates: t.Sequence[str]):
+        """Request in the page the time slots of the leading acceptable dates,
+        without waiting for them.
+        """
+        self.time_prefetch = None
+        facility = self.get_facility_catalog().get(city)
+        if not self.reschedule_url or facility is None:
+            return
+
+        # The first date was validated by evaluate_dates already
+        candidates = list(dates[:1])
+        for candidate_repr in dates[1:TIME_PREFETCH_DATES]:
+            candidate = datetime.date.fromisoformat(candidate_repr)
+            if self.validate_candidate(candidate, candidate_repr, city):
+                candidates.append(candidate_repr)
+        prefetch = TimePrefetch(self.reschedule_url, facility.id, candidates)
+        try:
+            prefetch.start(self.driver)
+        except WebDriverException as err:
+            logger.warning("! Failed to prefetch time slots: %s", str(err))
+            return
+        logger.debug("> start_time_prefetch %s", prefetch)
+        self.time_prefetch = prefetch
+
+    def get_prefetched_slot(self) -> t.Optional[t.Tuple[datetime.date, t.Optional[str]]]:
+        """Pick the date to commit from the prefetched time slots.
+
+        Return the new appointment's date when nothing was prefetched, and None
+        when every candidate date turned out to have no slots.
+        """
+        if self.time_prefetch is None:
+            return self.new_appointment.date, None
+        try:
+            times_by_date = self.time_prefetch.collect(self.driver)
+        except WebDriverException as err:
+            logger.warning("! Failed to collect prefetched time slots: %s", str(err))
+            return self.new_appointment.date, None
+        choice = choose_date_with_slots(times_by_date)
+        if choice is None:
+            return None
+        return datetime.date.fromisoformat(choice[0]), choice[1]
+
     def get_best_date(self) -> Appointment | None:
         """Find the soonest available date among all cities."""
         logger.debug("> get_best_date")
-        if "schedule" not in self.driver.current_url:
-            # return  # todo revert
-            raise Exception("Session ended")
+        self.navigate_to_reschedule_form()
+        self.set_phase(Phase.CHECK)
+        self.metrics["checks"] += 1
         self.new_appointment = None
+        self.detection = None
+        self.time_prefetch = None
+
+        facilities = self.refresh_facility_catalog().resolve(self.allowed_city_ids)
+        if not facilities:
+            raise UnknownFacilityException(
+                f"None of the allowed facilities {self.allowed_city_ids} is offered by the form"
+            )
+
+        if self.facility_tabs is not None and len(facilities) > 1:
+            return self.get_best_date_from_tabs(facilities)
 
         outside_text = self.instant_select_element(".user-info-footer")
-        city_select_element = self.slow_select_element(
-            "appointments_consulate_appointment_facility_id")
+        city_select_element = self.slow_select_element(FACILITY_SELECT_ID)
         city_select = Select(city_select_element)
-        n_allowed_cities = len(ALLOWED_CITY_IDS)
+        n_allowed_cities = len(facilities)
         n_errors = 0
         if n_allowed_cities > 1:
-            for option in city_select.options:
-                city_id = option.get_attribute("value")
-
-                if city_id not in ALLOWED_CITY_IDS:
-                    continue
-
-                # Set clean slate / in case of "continue", close the calendar
-                city_select_element.send_keys(Keys.ESCAPE)
-                outside_text.click()
-                city_select_element.click()
+            for facility in facilities:
+                shared = self.get_shared_observation(facility)
+                if shared is None:
+                    # Set clean slate / in case of "continue", close the calendar
+                    city_select_element.send_keys(Keys.ESCAPE)
+                    outside_text.click()
+                    city_select_element.click()
 
-                del self.driver.requests
+                    del self.driver.requests
 
-                city_select.select_by_value(city_id)
+                    city_select.select_by_value(facility.id)
                 try:
-                    new_appointment = self.choose_best_date_for_city(option.text)
+                    if shared is not None:
+                        new_appointment = self.evaluate_dates(
+                            facility.name, shared.dates, on_page=False
+                        )
+                    else:
+                        new_appointment = self.choose_best_date_for_city(facility.name)
                 except MissingDatesException as err:
-                    logger.warning("Couldn't get dates for city %s: %s", option.text, str(err))
+                    logger.warning("Couldn't get dates for city %s: %s", facility.name, str(err))
                     n_errors += 1
                     new_appointment = None
                     if n_errors >= n_allowed_cities:
@@ -207,75 +781,210 @@ class Scheduler(WebDriver):
 
                 if new_appointment:
                     return new_appointment
-        elif n_allowed_cities == 1:
-            for city, city_id in CITY_NAME_ID_MAP.items():
-                if city_id == ALLOWED_CITY_IDS[0]:
-                    return self.choose_best_date_for_city(city)
+        else:
+            return self.choose_best_date_for_city(facilities[0].name)
 
-    def execute_reschedule(self):
-        """Select the info for the best appointment found."""
-        logger.debug("> execute_reschedule")
-        city_select = Select(
-            self.slow_select_element("appointments_consulate_appointment_facility_id")
-        )
-        city_select.select_by_value(CITY_NAME_ID_MAP[self.new_appointment.city])
+    def refresh_facility_tab(self, facility_id: str) -> bool:
+        """Refresh the days of a facility in its tab, reloading the tab if it
+        left the form.
+        """
+        self.metrics["tab_refreshes"] += 1
+        if self.facility_tabs.refresh(self.driver, facility_id):
+            return True
+        logger.warning("! Tab of facility %s left the form, reloading it.", facility_id)
+        self.driver.get(self.facility_tabs.form_url)
+        return self.facility_tabs.refresh(self.driver, facility_id)
+
+    def get_best_date_from_tabs(self, facilities) -> Appointment | None:
+        """Find the soonest available date with each facility in its own tab.
+
+        Every tab is refreshed in place before any is read, so the days of all
+        facilities are fetched concurrently instead of reselecting them in turn.
+        """
+        tabs = self.facility_tabs
+        facility_ids = [facility.id for facility in facilities]
+        form_url = self.driver.current_url
+        if not tabs.is_open(self.driver, form_url, facility_ids):
+            logger.info("... Opening a form tab for each of %d facilities.", len(facilities))
+            tabs.open(self.driver, form_url, facility_ids)
+            self.metrics["tab_opens"] += 1
+
+        shared = {facility.id: self.get_shared_observation(facility) for facility in facilities}
+        del self.driver.requests
+        refreshed = [
+            facility.id for facility in facilities
+            if shared[facility.id] is None and self.refresh_facility_tab(facility.id)
+        ]
+        requests = tabs.wait_days_requests(self.driver, refreshed)
+
+        n_errors = 0
+        for facility in facilities:
+            tabs.switch_to(self.driver, facility.id)
+            try:
+                if shared[facility.id] is not None:
+                    new_appointment = self.evaluate_dates(
+                        facility.name, shared[facility.id].dates, on_page=False
+                    )
+                else:
+                    new_appointment = self.evaluate_days_request(
+                        facility.name, requests.get(facility.id)
+                    )
+            except MissingDatesException as err:
+                logger.warning("Couldn't get dates for city %s: %s", facility.name, str(err))
+                n_errors += 1
+                new_appointment = None
+                if n_errors >= len(facilities):
+                    # All cities failed
+                    raise err
+
+            if new_appointment:
+                return new_appointment
+
+    def is_facility_selected(self, facility_id: str) -> bool:
+        """Return whether the form still shows the calendar the detection came from."""
+        if not (self.detection and self.detection.on_page):
+            return False
+        if self.detection.facility_id != facility_id:
+            return False
+        city_select_element = self.find_element(By.ID, FACILITY_SELECT_ID)
+        if not city_select_element:
+            return False
+        selected = Select(city_select_element).first_selected_option
+        return selected.get_attribute("value") == facility_id
+
+    def find_date_cell(
+        self, target: datetime.date, max_pages=MAX_CALENDAR_PAGES
+    ) -> t.Optional[WebElement]:
+        """Page through the datepicker until the cell of the target date shows up."""
+        selector = DATE_CELL_SELECTOR.format(month=target.month - 1, year=target.year)
+        for _ in range(max_pages):
+            for cell in self.driver.find_elements(By.CSS_SELECTOR, selector):
+                if cell.text.strip() == str(target.day):
+                    return cell
+            next_button = self.find_element(By.CSS_SELECTOR, ".ui-datepicker-next")
+            if not next_button:
+                break
+            next_button.click()
+        return None
 
-        # Select soonest date in calendar
-        self.slow_select_element("appointments_consulate_appointment_date")
-        free_date_cell_key = ".ui-state-default[href]"
-        free_date_cell = self.find_element(By.CSS_SELECTOR, free_date_cell_key)
+    def wait_time_select(self, timeout=10) -> Select:
+        """Wait for the time slots of the chosen date to load."""
+        def get_loaded_select(driver):
+            element = driver.find_element(By.ID, TIME_SELECT_ID)
+            options = element.find_elements(By.TAG_NAME, "option")
+            return element if any(option.get_attribute("value") for option in options) else False
 
-        while not free_date_cell:
-            self.quick_select_element(".ui-datepicker-next")
-            free_date_cell = self.find_element(By.CSS_SELECTOR, free_date_cell_key)
+        try:
+            element = WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(
+                get_loaded_select
+            )
+        except TimeoutException:
+            element = self.find_element(By.ID, TIME_SELECT_ID)
+        return Select(element)
+
+    def record_commit_latency(self):
+        """Log the time elapsed between the detection and the submission."""
+        if self.detection is None:
+            return
+        self.last_commit_latency = time.monotonic() - self.detection.detected_at
+        logger.info("... Detection to submit: %.2f s", self.last_commit_latency)
+
+    def execute_reschedule(self):
+        """Select the info for the best appointment found.
 
-        quick_sleep()
+        The facility is only selected again when the form no longer shows the
+        calendar the detection came from; the date and time are then picked
+        without the human-like delays.
+        """
+        logger.debug("> execute_reschedule")
+        self.set_phase(Phase.RESCHEDULE)
+        facility_id = self.get_facility_catalog().get_id(self.new_appointment.city)
+        tabs = self.facility_tabs
+        if tabs is not None and tabs.handles.get(facility_id) in self.driver.window_handles:
+            tabs.switch_to(self.driver, facility_id)
+        if not self.is_facility_selected(facility_id):
+            city_select = Select(self.slow_select_element(FACILITY_SELECT_ID))
+            city_select.select_by_value(facility_id)
+
+        slot = self.get_prefetched_slot()
+        if slot is None:
+            logger.info("... None of the candidate dates has time slots.")
+            self.metrics["discarded_commits"] += 1
+            return False
+        target_date, prefetched_time = slot
+        if target_date != self.new_appointment.date:
+            self.new_appointment = Appointment(
+                target_date.day, target_date.month, target_date.year, "",
+                self.new_appointment.city,
+            )
+
+        # Open the calendar on the chosen date
+        self.instant_select_element(DATE_INPUT_ID)
+        free_date_cell = self.find_date_cell(self.new_appointment.date)
+        if not free_date_cell:
+            logger.info("... Date %s is no longer offered.", self.new_appointment.date)
+            return False
         free_date_cell.click()
 
         # Pick latest time
         logger.info("///// Picking latest time")
-        time_select = Select(
-            self.slow_select_element("appointments_consulate_appointment_time")
-        )
-        option = time_select.options[-1]
-        if not option.get_attribute("value"):
+        time_select = self.wait_time_select()
+        latest_time = prefetched_time or time_select.options[-1].get_attribute("value")
+        if not latest_time:
             logger.info("... Date has no time slots.")
             return False
-
-        time_select.select_by_value(option.get_attribute("value"))
-
-        self.slow_select_element("#appointments_submit")
+        try:
+            time_select.select_by_value(latest_time)
+        except NoSuchElementException:
+            logger.info("... Prefetched time %s is not offered, picking the latest.", latest_time)
+            time_select.select_by_value(time_select.options[-1].get_attribute("value"))
+        # Submitting leaves the form, so read the time while it is still there
+        appointment_time = time_select.first_selected_option.get_attribute("value")
+
+        self.instant_select_element("#appointments_submit")
         if is_prod():
             # Confirm modal
             logger.info("///// Confirming")
-            button = self.slow_select_element(
-                "body > div.reveal-overlay > div > div > a.button.alert"
+            WebDriverWait(self.driver, 10, poll_frequency=0.1).until(
+                lambda driver: self.instant_select_element(CONFIRM_BUTTON_SELECTOR)
             )
-            button.click()
+        self.record_commit_latency()
+        self.metrics["reschedules"] += 1
+        self.mark_rescheduled(appointment_time)
         return True
 
+    def mark_rescheduled(self, appointment_time: str):
+        """Keep the new date as the current one, so a resume never moves it back."""
+        if not self.current_appointment_list or self.current_appointment is None:
+            return
+        if self.current_index >= len(self.current_appointment_list):
+            return
+        current, new = self.current_appointment, self.new_appointment
+        self.current_appointment_list[self.current_index] = Appointment(
+            new.date.day, new.date.month, new.date.year, appointment_time, new.city,
+            current.applicant_name, current.passport, current.link,
+        )
+        self.write_checkpoint()
+
     def reschedule_current_appointment(self):
-        logger.debug(f"> reschedule_current_appointment {self.current_appointment}")
-        self.navigate_reschedule_page()
+        logger.debug("> reschedule_current_appointment %s", self.current_appointment)
+        self.reschedule_url = None
+        # Payloads seen for another appointment must be evaluated again
+        self.payload_digests.clear()
         self.get_best_date()
 
         if len(self.current_appointment_list) == 1:
             # Stay in page to retry single match
-            while not self.new_appointment:
-                logger.info("... No good appointments found.")
-                long_sleep()
-                self.driver.refresh()
-                logger.info("... Checking cities again.")
-                self.get_best_date()
+            self.wait_for_new_appointment()
+
+        if self.should_stop():
+            return
 
         if not self.execute_reschedule():
             self.new_appointment = None
-            while not self.new_appointment:
-                logger.info("... No good appointments found.")
-                long_sleep()
-                self.driver.refresh()
-                logger.info("... Checking cities again.")
-                self.get_best_date()
+            self.wait_for_new_appointment()
+            if self.should_stop():
+                return
             self.execute_reschedule()
 
         self.current_appointment = None
@@ -286,16 +995,29 @@ class Scheduler(WebDriver):
         to a date that is sooner than the currently scheduled appointment.
         """
         logger.debug("> run_reschedule_suite")
-        self.navigate_login_page()
-        self.execute_login()
-        self.current_appointment_list = self.gen_current_appointment_list(applicant_info)
+        self.applicant_info = applicant_info
+        self.checkpoint_path = get_checkpoint_path()
+        if not self.resume_from_checkpoint(applicant_info):
+            self.navigate_login_page()
+            self.execute_login()
+            self.current_appointment_list = self.gen_current_appointment_list(applicant_info)
+            self.appointment_list_url = self.driver.current_url
+            self.current_index = 0
 
         if not self.current_appointment_list:
             logger.error("No upcoming appointments found!")
             return
 
-        appointment_list_url = self.driver.current_url
-        for appointment in self.current_appointment_list:
-            self.current_appointment = appointment
+        completed = True
+        for index in range(self.current_index, len(self.current_appointment_list)):
+            if self.should_stop():
+                completed = False
+                break
+            self.current_index = index
+            self.current_appointment = self.current_appointment_list[index]
+            self.write_checkpoint()
             self.reschedule_current_appointment()
-            self.driver.get(appointment_list_url)
+            self.driver.get(self.appointment_list_url)
+        self.set_phase(Phase.DONE)
+        if completed:
+            clear_checkpoint(self.checkpoint_path)
@@ -0,0 +1,354 @@
+"""Replay recorded availability to compare polling policies offline.
+
+Run with ``python -m autovisa.src.simulator --db observations.db --current-date 2023-11-21``.
+"""
+import argparse
+import bisect
+import datetime
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import typing as t
+from collections import Counter
+
+from autovisa.src.appointment import Appointment
+from autovisa.src.constants import (
+    ALLOWED_CITY_IDS, DEFAULT_LOCALE, HIBERNATE_BOUNDS, LOGGER_NAME, LONG_SLEEP_BOUNDS
+)
+from autovisa.src.config import parse_bounds
+from autovisa.src.exceptions import MissingDatesException
+from autovisa.src.facilities import Facility, FacilityCatalog
+from autovisa.src.observations import Observation, ObservationStore
+from autovisa.src.schedule import Scheduler
+from autovisa.src.utils import get_sleep_duration
+
+logger = logging.getLogger(LOGGER_NAME)
+
+# Requests issued to log in and reach the reschedule form, then to submit it
+SESSION_REQUESTS = 4
+RESCHEDULE_REQUESTS = 1
+
+
+class Policy(t.NamedTuple):
+    """Polling choices to evaluate."""
+    name: str
+    facility_ids: t.Tuple[str, ...] = ALLOWED_CITY_IDS
+    sleep_bounds: t.Tuple[int, int] = LONG_SLEEP_BOUNDS
+    hibernate_bounds: t.Tuple[int, int] = HIBERNATE_BOUNDS
+    # Checks before the session ends and the scheduler hibernates (0: never)
+    checks_per_session: int = 0
+
+
+class Detection(t.NamedTuple):
+    detected_at: float
+    facility_id: str
+    previous_date: datetime.date
+    new_date: datetime.date
+    # Time since a better date was first offered, if the timeline shows it
+    latency: t.Optional[float]
+
+    @property
+    def days_gained(self) -> int:
+        return (self.previous_date - self.new_date).days
+
+
+class SimulationReport(t.NamedTuple):
+    policy: Policy
+    duration: float
+    checks: int
+    requests: int
+    sessions: int
+    detections: t.List[Detection]
+    missed: int
+    final_date: datetime.date
+
+    @property
+    def days_gained(self) -> int:
+        return sum(detection.days_gained for detection in self.detections)
+
+    def to_dict(self) -> dict:
+        latencies = [
+            detection.latency for detection in self.detections if detection.latency is not None
+        ]
+        return {
+            "policy": self.policy._asdict(),
+            "simulated_hours": round(self.duration / 3600, 2),
+            "checks": self.checks,
+            "requests": self.requests,
+            "sessions": self.sessions,
+            "detections": len(self.detections),
+            "missed_opportunities": self.missed,
+            "days_gained": self.days_gained,
+            "final_date": self.final_date.isoformat(),
+            "mean_time_to_detection": round(statistics.mean(latencies), 1) if latencies else None,
+            "median_time_to_detection": round(statistics.median(latencies), 1)
+            if latencies else None,
+        }
+
+
+class Timeline:
+    """Dates offered by each facility over time, from recorded readings."""
+
+    def __init__(self, observations: t.Iterable[Observation]):
+        self.times = {}
+        self.dates = {}
+        self.names = {}
+        for observation in sorted(observations, key=lambda obs: obs.observed_at):
+            self.times.setdefault(observation.facility_id, []).append(observation.observed_at)
+            self.dates.setdefault(observation.facility_id, []).append(observation.dates)
+            self.names[observation.facility_id] = observation.facility_name
+
+    def __len__(self):
+        return sum(len(times) for times in self.times.values())
+
+    @classmethod
+    def from_store(
+        cls, store: ObservationStore, since: t.Optional[float] = None,
+        until: t.Optional[float] = None
+    ):
+        return cls(store.iter_observations(since, until))
+
+    @classmethod
+    def from_json(cls, path: str):
+        """Load readings from a JSON list of objects with the Observation fields."""
+        with open(path) as timeline_file:
+            data = json.load(timeline_file)
+        return cls(
+            Observation(
+                str(row["facility_id"]), row.get("facility_name", str(row["facility_id"])),
+                float(row["observed_at"]), row.get("source", ""), tuple(row["dates"]),
+            )
+            for row in data
+        )
+
+    @property
+    def start(self) -> float:
+        return min(times[0] for times in self.times.values())
+
+    @property
+    def end(self) -> float:
+        return max(times[-1] for times in self.times.values())
+
+    def get(self, facility_id: str, at: float) -> tuple:
+        """Return the dates a facility offered at the given time."""
+        times = self.times.get(facility_id)
+        if not times:
+            return ()
+        index = bisect.bisect_right(times, at) - 1
+        return self.dates[facility_id][index] if index >= 0 else ()
+
+    def get_catalog(self, locale=DEFAULT_LOCALE) -> FacilityCatalog:
+        return FacilityCatalog(
+            [Facility(facility_id, name, locale) for facility_id, name in self.names.items()],
+            locale=locale,
+        )
+
+    def iter_events(self, facility_ids: t.Iterable[str]) -> t.Iterator[t.Tuple[float, str]]:
+        """Yield (time, facility id) for every reading of the given facilities."""
+        events = [
+            (observed_at, facility_id)
+            for facility_id in facility_ids
+            for observed_at in self.times.get(facility_id, ())
+        ]
+        events.sort()
+        return iter(events)
+
+
+class SimulatedScheduler(Scheduler):
+    """Scheduler deciding on a recorded timeline instead of a live page.
+
+    No browser is launched; only the decision methods are used.
+    """
+
+    def __init__(
+        self, timeline: Timeline, current_appointment: Appointment,
+        allowed_city_ids: t.Sequence[str] = ALLOWED_CITY_IDS
+    ):
+        self.timeline = timeline
+        self.current_appointment = current_appointment
+        self.allowed_city_ids = tuple(allowed_city_ids)
+        self.facility_catalog = timeline.get_catalog()
+        self.observations = {}
+        self.metrics = Counter()
+        self.clock = timeline.start
+
+    def record_observation(self, city: str, candidate: t.Optional[datetime.date]):
+        self.observations[city] = {
+            "date": candidate.isoformat() if candidate else None,
+            "observed_at": self.clock,
+        }
+
+    def get_allowed_facilities(self) -> t.List[Facility]:
+        return self.get_facility_catalog().resolve(self.allowed_city_ids)
+
+    def check_at(self, now: float) -> t.Optional[Appointment]:
+        """Go through the allowed facilities as get_best_date does, at a given time."""
+        self.clock = now
+        self.new_appointment = None
+        self.metrics["checks"] += 1
+        self.metrics["requests"] += 1  # Reschedule form reload
+        for facility in self.get_allowed_facilities():
+            self.metrics["requests"] += 1
+            try:
+                new_appointment = self.evaluate_dates(
+                    facility.name, self.timeline.get(facility.id, now)
+                )
+            except MissingDatesException:
+                continue
+            if new_appointment:
+                return new_appointment
+        return None
+
+    def is_better(self, dates: tuple) -> bool:
+        """Return whether any offered date would be accepted."""
+        if not dates:
+            return False
+        candidate_repr = dates[self.find_candidate_index(dates)]
+        candidate = datetime.date.fromisoformat(candidate_repr)
+        return self.validate_candidate(candidate, candidate_repr, "")
+
+
+def simulate(
+    timeline: Timeline, policy: Policy, current_date: datetime.date, seed: int = 0
+) -> SimulationReport:
+    """Run a policy over the timeline under a virtual clock."""
+    rng = random.Random(seed)
+    scheduler = SimulatedScheduler(
+        timeline, Appointment(current_date.day, current_date.month, current_date.year, "", ""),
+        policy.facility_ids,
+    )
+    facility_ids = [facility.id for facility in scheduler.get_allowed_facilities()]
+    events = timeline.iter_events(facility_ids)
+    next_event = next(events, None)
+
+    # Facilities currently offering an acceptable date, per the full timeline
+    better = set()
+    opportunity_since = None
+    missed = 0
+    detections = []
+    sessions = 0
+    session_checks = 0
+
+    now, end = timeline.start, timeline.end
+    while now <= end:
+        while next_event is not None and next_event[0] <= now:
+            event_time, facility_id = next_event
+            if scheduler.is_better(timeline.get(facility_id, event_time)):
+                better.add(facility_id)
+                if opportunity_since is None:
+                    opportunity_since = event_time
+            else:
+                better.discard(facility_id)
+                if not better and opportunity_since is not None:
+                    missed += 1
+                    opportunity_since = None
+            next_event = next(events, None)
+
+        if session_checks == 0:
+            sessions += 1
+            scheduler.metrics["requests"] += SESSION_REQUESTS
+        session_checks += 1
+
+        new_appointment = scheduler.check_at(now)
+        if new_appointment:
+            facility = scheduler.get_facility_catalog().get(new_appointment.city)
+            detections.append(Detection(
+                now, facility.id, scheduler.current_appointment.date, new_appointment.date,
+                now - opportunity_since if opportunity_since is not None else None,
+            ))
+            scheduler.metrics["requests"] += RESCHEDULE_REQUESTS
+            scheduler.current_appointment = new_appointment
+            better = {
+                facility_id for facility_id in better
+                if scheduler.is_better(timeline.get(facility_id, now))
+            }
+            opportunity_since = now if better else None
+
+        if new_appointment or (
+            policy.checks_per_session and session_checks >= policy.checks_per_session
+        ):
+            session_checks = 0
+            now += get_sleep_duration(*policy.hibernate_bounds, rng=rng)
+        else:
+            now += get_sleep_duration(*policy.sleep_bounds, rng=rng)
+
+    return SimulationReport(
+        policy=policy,
+        duration=end - timeline.start,
+        checks=scheduler.metrics["checks"],
+        requests=scheduler.metrics["requests"],
+        sessions=sessions,
+        detections=detections,
+        missed=missed,
+        final_date=scheduler.current_appointment.date,
+    )
+
+
+def build_policies(
+    intervals: t.Sequence[str], facility_sets: t.Sequence[str], checks_per_session: int = 0
+) -> t.List[Policy]:
+    """Combine every sleep interval with every facility set."""
+    return [
+        Policy(
+            name=f"every {interval}s at {facility_set}",
+            facility_ids=tuple(facility_set.split(",")),
+            sleep_bounds=parse_bounds(interval),
+            checks_per_session=checks_per_session,
+        )
+        for interval in intervals
+        for facility_set in facility_sets
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m autovisa.src.simulator",
+        description="Compare polling policies over recorded availability.",
+    )
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument(
+        "--db", default=os.getenv("OBSERVATION_DB"), help="observation store to replay"
+    )
+    source.add_argument("--timeline", help="JSON file with recorded readings")
+    parser.add_argument(
+        "--current-date", required=True, type=datetime.date.fromisoformat,
+        help="date of the appointment to improve (YYYY-MM-DD)",
+    )
+    parser.add_argument(
+        "--intervals", nargs="+", default=["-".join(map(str, LONG_SLEEP_BOUNDS))],
+        help="sleep bounds between checks, as MIN-MAX seconds",
+    )
+    parser.add_argument(
+        "--facility-sets", nargs="+", default=[",".join(ALLOWED_CITY_IDS)],
+        help="comma-separated facility ids checked by each policy",
+    )
+    parser.add_argument("--checks-per-session", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    logger.setLevel(logging.WARNING)
+    if args.timeline:
+        timeline = Timeline.from_json(args.timeline)
+    elif args.db:
+        store = ObservationStore(args.db)
+        timeline = Timeline.from_store(store)
+        store.close()
+    else:
+        parser.error("either --db (or OBSERVATION_DB) or --timeline is required")
+    if not len(timeline):
+        parser.error("the timeline has no readings")
+
+    policies = build_policies(args.intervals, args.facility_sets, args.checks_per_session)
+    reports = [
+        simulate(timeline, policy, args.current_date, args.seed).to_dict()
+        for policy in policies
+    ]
+    json.dump(reports, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Keep one reschedule form tab per facility in the same browser."""
+import logging
+import typing as t
+from urllib.parse import urlparse
+
+from selenium.common import TimeoutException
+from selenium.webdriver.support.wait import WebDriverWait
+
+from autovisa.src.constants import LOGGER_NAME
+from autovisa.src.facilities import refresh_facility_days
+
+logger = logging.getLogger(LOGGER_NAME)
+
+DAYS_PATH_TEMPLATE = "/days/{facility_id}.json"
+
+
+def is_days_request(request, facility_id: str) -> bool:
+    """Return whether a captured request fetched the days of a facility."""
+    path = urlparse(request.url).path
+    return (
+        path.endswith(DAYS_PATH_TEMPLATE.format(facility_id=facility_id))
+        and getattr(request, "response", None) is not None
+    )
+
+
+class FacilityTabs:
+    """Reschedule form tabs, by facility id, sharing one browser process.
+
+    The captured requests are shared by all the tabs, so each tab's
+    availability is told apart by the facility id in the days URL.
+    """
+
+    def __init__(self):
+        self.form_url: t.Optional[str] = None
+        self.handles: t.Dict[str, str] = {}
+
+    def __repr__(self):
+        return f"<FacilityTabs {list(self.handles)}>"
+
+    def is_open(self, driver, form_url: str, facility_ids: t.Sequence[str]) -> bool:
+        """Return whether every facility has a tab on this form in this browser."""
+        if form_url != self.form_url:
+            return False
+        open_handles = set(driver.window_handles)
+        return all(self.handles.get(facility_id) in open_handles for facility_id in facility_ids)
+
+    def open(self, driver, form_url: str, facility_ids: t.Sequence[str]):
+        """Open a form tab for each facility, keeping the current one for the first.
+
+        Tabs left from a previous set of facilities are closed.
+        """
+        current_handle = driver.current_window_handle
+        for handle in driver.window_handles:
+            if handle != current_handle:
+                driver.switch_to.window(handle)
+                driver.close()
+        driver.switch_to.window(current_handle)
+
+        handles = {facility_ids[0]: current_handle}
+        for facility_id in facility_ids[1:]:
+            driver.switch_to.new_window("tab")
+            driver.get(form_url)
+            handles[facility_id] = driver.current_window_handle
+        driver.switch_to.window(current_handle)
+        self.form_url = form_url
+        self.handles = handles
+
+    def switch_to(self, driver, facility_id: str):
+        driver.switch_to.window(self.handles[facility_id])
+
+    def refresh(self, driver, facility_id: str) -> bool:
+        """Make the tab of a facility fetch its days again, without reloading it.
+
+        Return False when the tab no longer shows the form.
+        """
+        self.switch_to(driver, facility_id)
+        return refresh_facility_days(driver, facility_id)
+
+    @staticmethod
+    def find_days_request(requests, facility_id: str):
+        """Return the latest captured days request of a facility, if any."""
+        for request in reversed(requests):
+            if is_days_request(request, facility_id):
+                return request
+        return None
+
+    def wait_days_requests(self, driver, facility_ids: t.Sequence[str], timeout=10) -> dict:
+        """Wait for the days of the facilities to arrive and map each id to its request.
+
+        Facilities whose days did not arrive in time map to None.
+        """
+        if not facility_ids:
+            return {}
+
+        def get_requests(driver):
+            requests = driver.requests
+            found = {
+                facility_id: self.find_days_request(requests, facility_id)
+                for facility_id in facility_ids
+            }
+            return found if all(found.values()) else False
+
+        try:
+            return WebDriverWait(driver, timeout, poll_frequency=0.1).until(get_requests)
+        except TimeoutException:
+            logger.error("JSON requests not found for facilities %s", list(facility_ids))
+        requests = driver.requests
+        return {
+            facility_id: self.find_days_request(requests, facility_id)
+            for facility_id in facility_ids
+        }
@@ -0,0 +1,92 @@
+"""Fetch the time slots of candidate dates ahead of the commit."""
+import logging
+import time
+import typing as t
+from urllib.parse import urlparse
+
+from autovisa.src.constants import LOGGER_NAME, TIME_PREFETCH_TIMEOUT
+
+logger = logging.getLogger(LOGGER_NAME)
+
+TIMES_PATH_TEMPLATE = (
+    "{form_path}/times/{facility_id}.json?date={date}&appointments[expedite]=false"
+)
+
+# Start the requests in the page and return right away; the responses are kept
+# in a window property until collected. Each start replaces the responses of the
+# previous one, as the page may stay loaded for a whole session.
+TIME_PREFETCH_SCRIPT = """
+var store = window.__autovisaTimes = {};
+arguments[0].forEach(function (url) {
+    store[url] = {"done": false, "times": null};
+    fetch(url, {
+        credentials: "same-origin",
+        headers: {"Accept": "application/json", "X-Requested-With": "XMLHttpRequest"}
+    })
+        .then(function (response) { return response.ok ? response.json() : null; })
+        .then(function (data) {
+            store[url] = {"done": true, "times": data ? (data.available_times || []) : null};
+        })
+        .catch(function () { store[url] = {"done": true, "times": null}; });
+});
+"""
+TIME_COLLECT_SCRIPT = """
+var store = window.__autovisaTimes || {};
+var result = {};
+arguments[0].forEach(function (url) { result[url] = store[url] || null; });
+return result;
+"""
+
+
+def get_times_url(form_url: str, facility_id: str, date: str) -> str:
+    """Build the URL the form requests the time slots of a date from."""
+    form_path = urlparse(form_url).path.rstrip("/")
+    return TIMES_PATH_TEMPLATE.format(form_path=form_path, facility_id=facility_id, date=date)
+
+
+class TimePrefetch:
+    """Time slots requested in the page for the leading dates of a facility."""
+
+    def __init__(self, form_url: str, facility_id: str, dates: t.Sequence[str]):
+        self.facility_id = facility_id
+        self.urls = {date: get_times_url(form_url, facility_id, date) for date in dates}
+
+    def __repr__(self):
+        return f"<TimePrefetch {self.facility_id} {list(self.urls)}>"
+
+    def start(self, driver):
+        driver.execute_script(TIME_PREFETCH_SCRIPT, list(self.urls.values()))
+
+    def collect(self, driver, timeout=TIME_PREFETCH_TIMEOUT, poll_interval=0.1) -> dict:
+        """Wait for the responses and map each date to its times.
+
+        Dates whose times could not be fetched in time map to None.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            entries = driver.execute_script(TIME_COLLECT_SCRIPT, list(self.urls.values())) or {}
+            done = all((entries.get(url) or {}).get("done") for url in self.urls.values())
+            if done or time.monotonic() >= deadline:
+                break
+            time.sleep(poll_interval)
+
+        times = {}
+        for date, url in self.urls.items():
+            entry = entries.get(url) or {}
+            times[date] = entry.get("times") if entry.get("done") else None
+        return times
+
+
+def choose_date_with_slots(times_by_date: dict) -> t.Optional[t.Tuple[str, t.Optional[str]]]:
+    """Return the first date that may have slots, with its latest known slot.
+
+    Dates known to have no slots are skipped; a date whose times are unknown is
+    returned without a slot, leaving the form to tell.
+    """
+    for date, times in times_by_date.items():
+        if times is None:
+            return date, None
+        if times:
+            return date, times[-1]
+        logger.info("... Date %s has no time slots, skipping it.", date)
+    return None
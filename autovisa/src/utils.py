@@ -1,5 +1,4 @@
 """Utility functions."""
-import calendar
 import json
 import logging
 import os
@@ -12,21 +11,23 @@ from seleniumwire.request import Request
 from seleniumwire.utils import decode
 
 from autovisa.src.constants import (
-    DEFAULT_USERAGENT, FALSY_STRINGS, MAX_ACTION_SLEEP, MIN_ACTION_SLEEP,
-    TEST_LOGIN, TEST_PWD, TEST_USERAGENT, LOGGER_NAME
+    DEFAULT_CACHE_DIR, DEFAULT_LOCALE, DEFAULT_USERAGENT, FALSY_STRINGS, HIBERNATE_BOUNDS,
+    LONG_SLEEP_BOUNDS, LOGIN_MODE_FAST, LOGIN_MODE_HUMAN, LOGIN_MODES, MAX_ACTION_SLEEP,
+    MIN_ACTION_SLEEP, TEST_LOGIN, TEST_PWD, TEST_USERAGENT, LOGGER_NAME
 )
+from autovisa.src.locales import get_locale_pack
 
 logger = logging.getLogger(LOGGER_NAME)
 
 
 def delayed(function):
     """Decorate function to add a random delay before taking action."""
-    logger.debug(f">> delayed decorator")
+    logger.debug(">> delayed decorator")
 
     @wraps(function)
     def wrapper(*args, **kwargs):
         """Add delay and execute wrapped function."""
-        logger.debug(f">>> delayed wrapper")
+        logger.debug(">>> delayed wrapper")
         rand_sleep()
         return function(*args, **kwargs)
 
@@ -35,27 +36,38 @@ def delayed(function):
 
 def quick_delayed(function):
     """Decorate function to add a quick delay before taking action."""
-    logger.debug(f">> quick_delayed decorator")
+    logger.debug(">> quick_delayed decorator")
 
     @wraps(function)
     def wrapper(*args, **kwargs):
         """Add delay and execute wrapped function."""
-        logger.debug(f">>> quick_delayed wrapper")
+        logger.debug(">>> quick_delayed wrapper")
         quick_sleep()
         return function(*args, **kwargs)
 
     return wrapper
 
 
-def rand_sleep(min_sleep=MIN_ACTION_SLEEP, max_sleep=MAX_ACTION_SLEEP):
-    """Set execution to halt for a random amount of time, in seconds."""
+def get_sleep_duration(
+    min_sleep=MIN_ACTION_SLEEP, max_sleep=MAX_ACTION_SLEEP, rng=random
+) -> float:
+    """Draw a random amount of time, in seconds, within the given bounds."""
     if max_sleep <= 0 or max_sleep <= min_sleep:
-        return
+        return 0.0
 
     max_sleep = max(0, max_sleep - 1)
 
-    sleep_duration = float(random.randint(min_sleep, max_sleep))
-    sleep_duration += random.random() / 2  # Add decimal to prevent always integer
+    sleep_duration = float(rng.randint(min_sleep, max_sleep))
+    sleep_duration += rng.random() / 2  # Add decimal to prevent always integer
+    return sleep_duration
+
+
+def rand_sleep(min_sleep=MIN_ACTION_SLEEP, max_sleep=MAX_ACTION_SLEEP):
+    """Set execution to halt for a random amount of time, in seconds."""
+    sleep_duration = get_sleep_duration(min_sleep, max_sleep)
+    if not sleep_duration:
+        return
+
     logger.debug("> sleeping for %f seconds", sleep_duration)
     time.sleep(sleep_duration)
 
@@ -67,12 +79,12 @@ def quick_sleep():
 
 def long_sleep():
     """Sleep for some time, more than 1 minute."""
-    return rand_sleep(min_sleep=60, max_sleep=60 * 2)
+    return rand_sleep(*LONG_SLEEP_BOUNDS)
 
 
 def hibernate():
     """Sleep for a very long time, more than 8 minutes."""
-    return rand_sleep(min_sleep=60 * 8, max_sleep=60 * 16)
+    return rand_sleep(*HIBERNATE_BOUNDS)
 
 
 def wait_page_load():
@@ -124,6 +136,30 @@ def is_prod() -> bool:
     return is_env("PRODUCTION")
 
 
+@lru_cache
+def is_tabs_mode() -> bool:
+    """Check whether each facility should be checked in its own browser tab."""
+    return is_env("FACILITY_TABS")
+
+
+@lru_cache
+def get_login_mode() -> str:
+    """Return how the login form is filled, from LOGIN_MODE.
+
+    The fast mode is meant for local runs, so production always types like a human.
+    """
+    mode = os.environ.get("LOGIN_MODE", "").strip().lower() or LOGIN_MODE_HUMAN
+    if mode not in LOGIN_MODES:
+        logger.warning("! Unknown LOGIN_MODE %s, using %s", mode, LOGIN_MODE_HUMAN)
+        return LOGIN_MODE_HUMAN
+    if mode == LOGIN_MODE_FAST and is_prod():
+        logger.warning(
+            "! LOGIN_MODE %s is ignored in production, using %s", mode, LOGIN_MODE_HUMAN
+        )
+        return LOGIN_MODE_HUMAN
+    return mode
+
+
 @lru_cache
 def is_testing() -> bool:
     """Check whether current instance is for testing."""
@@ -146,15 +182,26 @@ def get_credentials() -> tuple:
     return login, password
 
 
+def clear_env_caches():
+    """Forget the cached environment lookups, after the environment changed."""
+    for helper in (is_env, is_prod, is_tabs_mode, get_login_mode, is_testing, get_credentials):
+        helper.cache_clear()
+
+
+def get_cache_dir() -> str:
+    """Return the directory for files cached across runs."""
+    return os.path.expanduser(os.environ.get("AUTOVISA_CACHE_DIR") or DEFAULT_CACHE_DIR)
+
+
 def get_user_agent() -> str:
     """Retrieve user agent string to be used in the webdriver."""
     user_agent = TEST_USERAGENT if is_testing() else FakeUserAgent().chrome
     return user_agent or DEFAULT_USERAGENT
 
 
-def get_month_int(month_name: str) -> int:
-    """Map a month name (title formatting) to an integer (0-indexed)."""
-    return list(calendar.month_name).index(month_name.title())
+def get_month_int(month_name: str, locale: str = DEFAULT_LOCALE) -> int:
+    """Map a month name, in any letter case, to an integer (1-12)."""
+    return get_locale_pack(locale).get_month_int(month_name)
 
 
 def filter_out_empty(old_list: list) -> list:
@@ -0,0 +1,159 @@
+"""Track memory usage of the browser and of this process."""
+import logging
+import os
+import time
+import typing as t
+from collections import deque
+
+from autovisa.src.constants import (
+    LOGGER_NAME, MAX_DRIVER_RSS_MB, MAX_PYTHON_RSS_MB, MEMORY_SAMPLE_HISTORY
+)
+
+logger = logging.getLogger(LOGGER_NAME)
+
+PROC_ROOT = "/proc"
+
+
+class MemorySample(t.NamedTuple):
+    timestamp: float
+    driver_rss_kb: int
+    python_rss_kb: int
+
+
+def read_rss_kb(pid: int, proc_root=PROC_ROOT) -> int:
+    """Read the resident set size of a process, in KiB (0 if it is gone)."""
+    try:
+        with open(os.path.join(proc_root, str(pid), "status")) as status_file:
+            for line in status_file:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+
+def get_parent_map(proc_root=PROC_ROOT) -> dict:
+    """Map every visible process id to its parent process id."""
+    parent_map = {}
+    for entry in os.listdir(proc_root):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(os.path.join(proc_root, entry, "stat")) as stat_file:
+                stat = stat_file.read()
+        except OSError:
+            continue
+        # The command name may contain spaces, so parse after its closing paren
+        fields = stat[stat.rfind(")") + 2:].split()
+        if len(fields) > 1:
+            parent_map[int(entry)] = int(fields[1])
+    return parent_map
+
+
+def get_process_tree(root_pids: t.Iterable[int], proc_root=PROC_ROOT) -> set:
+    """Return the given processes along with all of their descendants."""
+    children = {}
+    for pid, parent_pid in get_parent_map(proc_root).items():
+        children.setdefault(parent_pid, []).append(pid)
+
+    tree = set()
+    pending = [pid for pid in root_pids if pid]
+    while pending:
+        pid = pending.pop()
+        if pid in tree:
+            continue
+        tree.add(pid)
+        pending.extend(children.get(pid, []))
+    return tree
+
+
+def get_driver_pids(driver) -> list:
+    """Return the ids of the processes started for the driver."""
+    pids = []
+    process = getattr(getattr(driver, "service", None), "process", None)
+    if getattr(process, "pid", None):
+        pids.append(process.pid)
+    # undetected_chromedriver launches the browser itself, outside the service
+    if getattr(driver, "browser_pid", None):
+        pids.append(driver.browser_pid)
+    return [pid for pid in pids if isinstance(pid, int)]
+
+
+class MemoryWatchdog:
+    """Sample memory usage and decide when the browser should be recycled."""
+
+    def __init__(
+        self, max_driver_rss_mb=MAX_DRIVER_RSS_MB, max_python_rss_mb=MAX_PYTHON_RSS_MB,
+        history_size=MEMORY_SAMPLE_HISTORY, proc_root=PROC_ROOT
+    ):
+        self.max_driver_rss_kb = max_driver_rss_mb * 1024
+        self.max_python_rss_kb = max_python_rss_mb * 1024
+        self.proc_root = proc_root
+        self.samples = deque(maxlen=history_size)
+        self.python_over_limit = False
+
+    @property
+    def is_supported(self) -> bool:
+        return os.path.isdir(os.path.join(self.proc_root, "self"))
+
+    def sample(self, driver) -> t.Optional[MemorySample]:
+        """Measure the driver's process tree and this process."""
+        if not self.is_supported:
+            return None
+
+        tree = get_process_tree(get_driver_pids(driver), self.proc_root)
+        sample = MemorySample(
+            timestamp=time.time(),
+            driver_rss_kb=sum(read_rss_kb(pid, self.proc_root) for pid in tree),
+            python_rss_kb=read_rss_kb(os.getpid(), self.proc_root),
+        )
+        self.samples.append(sample)
+        self.log_trend(sample)
+        return sample
+
+    def get_trend_kb_per_hour(self) -> tuple:
+        """Return the growth rate of (driver, python) RSS over the kept samples."""
+        if len(self.samples) < 2:
+            return 0.0, 0.0
+        first, last = self.samples[0], self.samples[-1]
+        hours = (last.timestamp - first.timestamp) / 3600
+        if hours <= 0:
+            return 0.0, 0.0
+        return (
+            (last.driver_rss_kb - first.driver_rss_kb) / hours,
+            (last.python_rss_kb - first.python_rss_kb) / hours,
+        )
+
+    def log_trend(self, sample: MemorySample):
+        driver_trend, python_trend = self.get_trend_kb_per_hour()
+        logger.info(
+            "... Memory: driver %d MiB (%+.1f MiB/h), python %d MiB (%+.1f MiB/h)",
+            sample.driver_rss_kb // 1024, driver_trend / 1024,
+            sample.python_rss_kb // 1024, python_trend / 1024,
+        )
+
+    def should_recycle(self, sample: t.Optional[MemorySample]) -> bool:
+        """Return whether the browser exceeds its threshold.
+
+        A new browser would not lower the memory of this process, so its own
+        threshold is only reported.
+        """
+        if sample is None:
+            return False
+        self.check_python_rss(sample)
+        return sample.driver_rss_kb > self.max_driver_rss_kb
+
+    def check_python_rss(self, sample: MemorySample) -> bool:
+        """Warn once when this process goes over its threshold, until it is back under."""
+        over_limit = sample.python_rss_kb > self.max_python_rss_kb
+        if over_limit and not self.python_over_limit:
+            logger.warning(
+                "! Python memory %d MiB is over %d MiB; only a restart will release it.",
+                sample.python_rss_kb // 1024, self.max_python_rss_kb // 1024,
+            )
+        self.python_over_limit = over_limit
+        return over_limit
+
+    def reset(self):
+        """Forget the trend, e.g. after the browser has been replaced."""
+        self.samples.clear()
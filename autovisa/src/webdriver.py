@@ -1,3 +1,4 @@
+import gc
 import logging
 import random
 import typing as t
@@ -7,6 +8,8 @@ from selenium import webdriver
 from selenium.common import ElementNotInteractableException, NoSuchElementException, \
     InvalidSelectorException
 from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service as ChromeService
+from selenium.webdriver.firefox.service import Service as FirefoxService
 from selenium.webdriver.remote.webelement import WebElement
 from seleniumwire import undetected_chromedriver
 from seleniumwire.undetected_chromedriver import ChromeOptions
@@ -15,6 +18,10 @@ from autovisa.src.constants import (
     BY_TYPE_ORDER,
     DEFAULT_WEBDRIVER_CLASS, LOGGER_NAME
 )
+from autovisa.src.drivers import (
+    get_backend_class, get_backend_for_class, get_backend_name, resolve_driver_binary
+)
+from autovisa.src.recorder import FlightRecorder
 from autovisa.src.utils import (
     delayed, get_user_agent,
     quick_delayed, quick_sleep
@@ -24,19 +31,51 @@ logger = logging.getLogger(LOGGER_NAME)
 
 
 class WebDriver:
-    _WEBDRIVER_CLASS = DEFAULT_WEBDRIVER_CLASS
+    # Driver class to launch; None picks the WEBDRIVER_BACKEND one, or the default
+    _WEBDRIVER_CLASS = None
     driver = None
+    recorder: t.Optional[FlightRecorder] = None
 
     def __init__(self):
+        if self._WEBDRIVER_CLASS is None:
+            backend = get_backend_name()
+            self._WEBDRIVER_CLASS = (
+                get_backend_class(backend) if backend else DEFAULT_WEBDRIVER_CLASS
+            )
+        self.recorder = FlightRecorder()
+        self.driver = self.create_driver()
+
+    def create_driver(self):
+        """Launch a new browser."""
         driver_args, driver_kwargs = self.get_driver_args()
-        self.driver = DEFAULT_WEBDRIVER_CLASS(*driver_args, **driver_kwargs)
-        self.driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": True})
+        driver = self._WEBDRIVER_CLASS(*driver_args, **driver_kwargs)
+        if hasattr(driver, "execute_cdp_cmd"):
+            driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": True})
+        if self.recorder is not None:
+            self.recorder.attach(driver)
+        return driver
+
+    def recycle_driver(self):
+        """Replace the browser with a fresh one, releasing captured requests."""
+        logger.info("... Recycling browser.")
+        try:
+            del self.driver.requests
+        except Exception as err:
+            logger.warning("! Failed to clear captured requests: %s", str(err))
+        try:
+            self.driver.quit()
+        except Exception as err:
+            logger.warning("! Failed to quit browser: %s", str(err))
+        self.driver = None
+        gc.collect()
+        self.driver = self.create_driver()
 
     def get_driver_args(self) -> tuple:
         """Return arguments for instantiating driver."""
         driver_args = []
         driver_kwargs = {}
         user_agent = get_user_agent()
+        backend = get_backend_for_class(self._WEBDRIVER_CLASS)
 
         if self._WEBDRIVER_CLASS in (webdriver.Chrome, seleniumwire.webdriver.Chrome):
             options = Options()
@@ -44,7 +83,10 @@ class WebDriver:
             options.add_argument('--ignore-ssl-errors=yes')
             options.add_argument('--ignore-certificate-errors')
             options.add_argument('--allow-insecure-localhost')
-            driver_kwargs["chrome_options"] = options
+            driver_kwargs["options"] = options
+            binary = resolve_driver_binary(backend)
+            if binary.driver_path:
+                driver_kwargs["service"] = ChromeService(executable_path=binary.driver_path)
         elif self._WEBDRIVER_CLASS == undetected_chromedriver.Chrome:
             options = ChromeOptions()
             options.add_argument(f"user-agent={user_agent}")
@@ -52,11 +94,17 @@ class WebDriver:
             options.add_argument('--ignore-certificate-errors')
             options.add_argument('--allow-insecure-localhost')
             driver_kwargs["options"] = options
-            driver_kwargs["version_main"] = 140
-        elif self._WEBDRIVER_CLASS == webdriver.Firefox:
-            profile = webdriver.FirefoxProfile()
-            profile.set_preference("general.user_agent.override", user_agent)
-            driver_args.append(profile)
+            binary = resolve_driver_binary(backend)
+            driver_kwargs["version_main"] = binary.browser_version
+            driver_kwargs["driver_executable_path"] = binary.driver_path
+            driver_kwargs["browser_executable_path"] = binary.browser_path
+        elif self._WEBDRIVER_CLASS in (webdriver.Firefox, seleniumwire.webdriver.Firefox):
+            options = webdriver.FirefoxOptions()
+            options.set_preference("general.user_agent.override", user_agent)
+            driver_kwargs["options"] = options
+            binary = resolve_driver_binary(backend or "firefox")
+            if binary.driver_path:
+                driver_kwargs["service"] = FirefoxService(executable_path=binary.driver_path)
 
         return driver_args, driver_kwargs
 
@@ -98,6 +146,12 @@ class WebDriver:
         selector = random.choice(selector_choices)
         return self.slow_select_element(selector)
 
+    def fill_input(self, element: WebElement, text: str):
+        """Replace the value of an input element in a single command."""
+        logger.debug("> fill_input")
+        element.clear()
+        element.send_keys(text)
+
     @delayed
     def write_input(self, element: WebElement, text: str):
         """Send text to input element, character by character."""
@@ -84,6 +84,19 @@ class TestAppointment(unittest.TestCase):
         self.assertTrue(appointment.match_applicant("AB123456"))
         self.assertFalse(appointment.match_applicant("CD789012"))
 
+    def test_compact_round_trip(self):
+        """Test the compact form restores every field."""
+        appointment = Appointment(
+            day=15, month=6, year=2023, time="10:30", city="Toronto",
+            applicant_name="JOHN DOE", passport="AB123456", link="http://example.com"
+        )
+
+        restored = Appointment.from_compact(appointment.to_compact())
+
+        self.assertEqual(restored.to_compact(), appointment.to_compact())
+        self.assertEqual(restored.date, date(2023, 6, 15))
+        self.assertFalse(hasattr(restored, "__dict__"))
+
 
 class TestAppointmentClassMethods(unittest.TestCase):
     """Test cases for Appointment class methods."""
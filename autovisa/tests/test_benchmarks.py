@@ -0,0 +1,119 @@
+"""Unit tests for benchmarks runner."""
+import os
+import unittest
+from unittest.mock import patch
+
+from autovisa.benchmarks.runner import BENCHMARKS, compare, load_benchmarks, run_benchmarks
+from autovisa.benchmarks.resilience import run_resilience_benchmarks
+from autovisa.benchmarks.startup import run_startup_benchmarks
+from autovisa.src.drivers import DriverBinary
+from autovisa.src.fake_driver import FakeDriver
+
+SNAPSHOT_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "site")
+
+
+class TestCompare(unittest.TestCase):
+    """Test cases for compare function."""
+
+    def setUp(self):
+        self.baseline = {"results": {
+            "fast": {"per_call_s": 1.0},
+            "slow": {"per_call_s": 1.0},
+        }}
+
+    def test_regression_detected(self):
+        """Test slowdowns beyond the threshold are reported."""
+        report = {"results": {
+            "fast": {"per_call_s": 1.1},
+            "slow": {"per_call_s": 1.5},
+        }}
+
+        regressions = compare(report, self.baseline, threshold=0.25)
+
+        self.assertEqual([regression["name"] for regression in regressions], ["slow"])
+        self.assertAlmostEqual(regressions[0]["ratio"], 1.5)
+
+    def test_new_benchmark_ignored(self):
+        """Test benchmarks missing from the baseline never fail."""
+        report = {"results": {"new": {"per_call_s": 10.0}}}
+
+        self.assertEqual(compare(report, self.baseline), [])
+
+
+class TestRunBenchmarks(unittest.TestCase):
+    """Test cases for run_benchmarks function."""
+
+    def test_registered(self):
+        """Test the hot paths are covered."""
+        load_benchmarks()
+
+        for name in (
+            "appointment.get_address_from_element", "utils.get_month_int",
+            "utils.get_dict_response.5k_days", "scheduler.validate_candidate",
+            "scheduler.find_json_request.20k_requests",
+        ):
+            self.assertIn(name, BENCHMARKS)
+
+    def test_run_single(self):
+        """Test a benchmark produces a machine-readable result."""
+        report = run_benchmarks(["appointment.address_re_pattern"], repeat=1)
+
+        result = report["results"]["appointment.address_re_pattern"]
+        self.assertGreater(result["per_call_s"], 0)
+        self.assertGreaterEqual(result["number"], 1)
+
+
+class TestStartupBenchmarks(unittest.TestCase):
+    """Test cases for run_startup_benchmarks function."""
+
+    def test_unavailable_backend_skipped(self):
+        """Test backends without a resolvable driver are skipped."""
+        with patch('autovisa.benchmarks.startup.resolve_driver_binary',
+                   side_effect=DriverBinary):
+            report = run_startup_benchmarks(["firefox"], repeat=1)
+
+        self.assertIn("skipped", report["results"]["firefox"])
+
+    def test_time_to_first_page(self):
+        """Test launch and first page times are reported per backend."""
+        binary = DriverBinary("wire", "/usr/bin/chromedriver")
+        with patch('autovisa.benchmarks.startup.resolve_driver_binary', return_value=binary):
+            # Stored as a class attribute by the launcher, hence the staticmethod
+            launch = staticmethod(lambda: FakeDriver.from_snapshot_dir(SNAPSHOT_DIR))
+            with patch('autovisa.benchmarks.startup.get_backend_class', return_value=launch):
+                report = run_startup_benchmarks(
+                    ["wire"], url="https://ais.example.com/en-ca/niv/users/sign_in", repeat=2
+                )
+
+        result = report["results"]["wire"]
+        self.assertEqual(result["repeat"], 2)
+        self.assertGreaterEqual(result["time_to_first_page_s"], result["launch_s"])
+
+
+class TestResilienceBenchmarks(unittest.TestCase):
+    """Test cases for run_resilience_benchmarks function."""
+
+    def test_faults_cost_coverage(self):
+        """Test failures are recovered from, at the cost of some checks."""
+        report = run_resilience_benchmarks(
+            ["clean", "server_errors"], horizon_s=4 * 3600, seed=1
+        )
+
+        clean = report["results"]["clean"]
+        faulty = report["results"]["server_errors"]
+        self.assertEqual(clean["coverage"], 1.0)
+        self.assertEqual(clean["failures"], 0)
+        self.assertGreater(faulty["failures"], 0)
+        self.assertGreater(faulty["recoveries"], 0)
+        self.assertLess(faulty["coverage"], 1.0)
+
+    def test_reproducible(self):
+        """Test the same seed injects the same faults."""
+        first = run_resilience_benchmarks(["degraded"], horizon_s=3600, seed=3)
+        second = run_resilience_benchmarks(["degraded"], horizon_s=3600, seed=3)
+
+        self.assertEqual(first, second)
+
+
+if __name__ == '__main__':
+    unittest.main()
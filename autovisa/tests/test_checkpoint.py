@@ -0,0 +1,64 @@
+"""Unit tests for checkpoint module."""
+import os
+import stat
+import tempfile
+import unittest
+
+from autovisa.src.appointment import Appointment
+from autovisa.src.checkpoint import (
+    Checkpoint, clear_checkpoint, get_checkpoint_path, load_checkpoint, save_checkpoint
+)
+
+
+class TestCheckpoint(unittest.TestCase):
+    """Test cases for saving and loading checkpoints."""
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.path = get_checkpoint_path(tmp_dir.name)
+        self.checkpoint = Checkpoint(
+            "XY123456", (Appointment(21, 11, 2023, "11:15", "Toronto", "JERRY", "XY123456"),),
+            current_index=0, reschedule_url="https://ais.example.com/schedule/1/appointment",
+            observations={"Toronto": {"date": "2023-09-07"}},
+            cookies=({"name": "_session", "value": "abc"},), saved_at=1000.0,
+        )
+
+    def test_round_trip(self):
+        """Test a saved checkpoint loads back, readable by the owner only."""
+        save_checkpoint(self.checkpoint, self.path)
+
+        loaded = load_checkpoint(self.path, now=1010.0)
+
+        self.assertEqual(loaded.applicant_info, "XY123456")
+        self.assertEqual(loaded.appointments[0].to_compact(),
+                         self.checkpoint.appointments[0].to_compact())
+        self.assertEqual(loaded.cookies, self.checkpoint.cookies)
+        self.assertEqual(loaded.observations, self.checkpoint.observations)
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o600)
+
+    def test_expired(self):
+        """Test old checkpoints are ignored."""
+        save_checkpoint(self.checkpoint, self.path)
+
+        self.assertIsNone(load_checkpoint(self.path, max_age=60, now=2000.0))
+
+    def test_unreadable(self):
+        """Test missing and corrupted checkpoints are ignored."""
+        self.assertIsNone(load_checkpoint(self.path))
+        with open(self.path, "w") as checkpoint_file:
+            checkpoint_file.write("{not json")
+        self.assertIsNone(load_checkpoint(self.path))
+
+    def test_clear(self):
+        """Test clearing removes the file and tolerates its absence."""
+        save_checkpoint(self.checkpoint, self.path)
+
+        clear_checkpoint(self.path)
+        clear_checkpoint(self.path)
+
+        self.assertFalse(os.path.exists(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
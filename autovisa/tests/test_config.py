@@ -0,0 +1,127 @@
+"""Unit tests for config module."""
+import datetime
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from autovisa.src.config import Config, ConfigLoader, apply_dotenv, build_config
+from autovisa.src.exceptions import ConfigError
+from autovisa.src.utils import clear_env_caches, is_env, is_prod
+
+
+class TestBuildConfig(unittest.TestCase):
+    """Test cases for build_config function."""
+
+    def test_defaults(self):
+        """Test missing settings keep the defaults."""
+        self.assertEqual(build_config(), Config())
+
+    def test_precedence(self):
+        """Test the command line wins over the environment, which wins over the file."""
+        config = build_config(
+            {"allowed_city_ids": ["89"], "sleep_bounds": [30, 40], "exclude_date_end": None},
+            {"ALLOWED_CITY_IDS": "94,95", "SLEEP_BOUNDS": "10-20"},
+            {"sleep_bounds": "5-6", "exclude_date_start": None},
+        )
+
+        self.assertEqual(config.allowed_city_ids, ("94", "95"))
+        self.assertEqual(config.sleep_bounds, (5, 6))
+        self.assertEqual(config.exclude_date_start, Config().exclude_date_start)
+
+    def test_facility_names(self):
+        """Test facilities may be given by name as well as by id."""
+        config = build_config(env={"ALLOWED_CITY_IDS": "94, Vancouver"})
+
+        self.assertEqual(config.allowed_city_ids, ("94", "Vancouver"))
+
+    def test_invalid(self):
+        """Test invalid settings are rejected."""
+        invalid = (
+            {"allowed_city_ids": ""},
+            {"allowed_city_ids": " , "},
+            {"exclude_date_start": "2023-09-30", "exclude_date_end": "2023-09-01"},
+            {"sleep_bounds": "20-10"},
+            {"hibernate_bounds": "soon"},
+            {"max_sleep": 3},
+        )
+        for file_data in invalid:
+            with self.assertRaises(ConfigError, msg=file_data):
+                build_config(file_data)
+
+    def test_is_excluded(self):
+        """Test open-ended exclusion ranges."""
+        config = Config(exclude_date_start=datetime.date(2023, 9, 1), exclude_date_end=None)
+
+        self.assertTrue(config.is_excluded(datetime.date(2030, 1, 1)))
+        self.assertFalse(config.is_excluded(datetime.date(2023, 8, 31)))
+        self.assertFalse(Config(None, None).is_excluded(datetime.date(2023, 8, 31)))
+
+
+class TestConfigLoader(unittest.TestCase):
+    """Test cases for ConfigLoader class."""
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.path = os.path.join(tmp_dir.name, "config.json")
+        self.dotenv_path = os.path.join(tmp_dir.name, ".env")
+        env = patch.dict('os.environ', {"VISA_EMAIL": "process@example.com"})
+        env.start()
+        self.addCleanup(env.stop)
+        self.addCleanup(is_prod.cache_clear)
+        self.mtime = 1000
+
+    def write(self, path, text):
+        with open(path, "w") as config_file:
+            config_file.write(text)
+        # Make every write visible, whatever the file system's mtime resolution
+        self.mtime += 1
+        os.utime(path, (self.mtime, self.mtime))
+
+    def test_reload_if_changed(self):
+        """Test files are only read again when they change, and bad changes are skipped."""
+        self.write(self.path, json.dumps({"allowed_city_ids": ["94"]}))
+        loader = ConfigLoader(self.path)
+        self.assertEqual(loader.load().allowed_city_ids, ("94",))
+        self.assertIsNone(loader.reload_if_changed())
+
+        self.write(self.path, "{broken")
+        self.assertIsNone(loader.reload_if_changed())
+        self.assertEqual(loader.config.allowed_city_ids, ("94",))
+
+        self.write(self.path, json.dumps({"allowed_city_ids": ["94", "95"]}))
+        self.assertEqual(loader.reload_if_changed().allowed_city_ids, ("94", "95"))
+
+    def test_dotenv_reload(self):
+        """Test dotenv changes reach the cached helpers, without replacing process variables."""
+        self.write(self.dotenv_path, "PRODUCTION=0\nVISA_EMAIL=file@example.com\n")
+        loader = ConfigLoader(dotenv_path=self.dotenv_path)
+        loader.load()
+        self.assertFalse(is_prod())
+
+        self.write(self.dotenv_path, "PRODUCTION=1\n")
+        loader.reload_if_changed()
+
+        self.assertTrue(is_prod())
+        self.assertEqual(os.environ["VISA_EMAIL"], "process@example.com")
+
+    def test_dotenv_applied_before_loading(self):
+        """Test variables applied before the loader exists are still reloaded from the file."""
+        self.addCleanup(clear_env_caches)
+        process_env_names = set(os.environ)
+        self.write(self.dotenv_path, "AUTOVISA_ASYNCIO=1\n")
+        apply_dotenv(self.dotenv_path, process_env_names)
+        self.assertTrue(is_env("AUTOVISA_ASYNCIO"))
+
+        loader = ConfigLoader(dotenv_path=self.dotenv_path, process_env_names=process_env_names)
+        loader.load()
+        self.write(self.dotenv_path, "AUTOVISA_ASYNCIO=0\n")
+        loader.reload_if_changed()
+
+        self.assertFalse(is_env("AUTOVISA_ASYNCIO"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+"""Unit tests for control module."""
+import asyncio
+import json
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+from urllib.request import Request, urlopen
+
+from autovisa.src.control import Controller, start_control_server
+
+
+class TestController(unittest.TestCase):
+    """Test cases for Controller class."""
+
+    def test_wait_times_out(self):
+        """Test waiting without commands runs the full duration."""
+        controller = Controller()
+
+        self.assertFalse(controller.wait(0.01))
+
+    def test_check_now_cuts_wait_short(self):
+        """Test "check now" wakes up a waiting scheduler."""
+        controller = Controller()
+        threading.Timer(0.05, controller.check_now).start()
+
+        start = time.monotonic()
+        self.assertTrue(controller.wait(10))
+        self.assertLess(time.monotonic() - start, 5)
+
+    def test_async_wait(self):
+        """Test the awaitable wait times out, and is cut short by "check now"."""
+        controller = Controller()
+        self.assertFalse(asyncio.run(controller.async_wait(0.01)))
+        threading.Timer(0.05, controller.check_now).start()
+
+        start = time.monotonic()
+        self.assertTrue(asyncio.run(controller.async_wait(10, poll_interval=0.01)))
+        self.assertLess(time.monotonic() - start, 5)
+
+    def test_pause_blocks_until_resumed(self):
+        """Test a paused controller holds the wait until resumed."""
+        controller = Controller()
+        controller.pause()
+        self.assertTrue(controller.is_paused)
+        threading.Timer(0.05, controller.resume).start()
+
+        controller.wait(0)
+
+        self.assertFalse(controller.is_paused)
+
+    def test_drain(self):
+        """Test draining releases a paused wait and is reported."""
+        controller = Controller()
+        controller.pause()
+        threading.Timer(0.05, controller.drain).start()
+
+        self.assertTrue(controller.wait(10))
+        self.assertTrue(controller.is_draining)
+
+    def test_status_without_scheduler(self):
+        """Test status is available before a scheduler is attached."""
+        status = Controller().status()
+
+        self.assertIsNone(status["phase"])
+        self.assertEqual(status["observations"], {})
+
+    def test_status_with_scheduler(self):
+        """Test status includes the scheduler snapshot."""
+        controller = Controller()
+        controller.scheduler = MagicMock()
+        controller.scheduler.get_status.return_value = {
+            "phase": "check", "metrics": {"checks": 3},
+        }
+
+        status = controller.status()
+
+        self.assertEqual(status["phase"], "check")
+        self.assertEqual(status["metrics"], {"checks": 3})
+
+
+class TestControlServer(unittest.TestCase):
+    """Test cases for the HTTP control endpoint."""
+
+    def setUp(self):
+        self.controller = Controller()
+        self.server = start_control_server(self.controller, 0)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def test_get_status(self):
+        """Test status is served as JSON."""
+        with urlopen(f"{self.base_url}/status") as response:
+            status = json.loads(response.read())
+
+        self.assertFalse(status["paused"])
+        self.assertFalse(status["draining"])
+
+    def test_post_command(self):
+        """Test commands are forwarded to the controller."""
+        request = Request(f"{self.base_url}/pause", method="POST", data=b"")
+        with urlopen(request) as response:
+            self.assertEqual(response.status, 202)
+
+        self.assertTrue(self.controller.is_paused)
+
+
+if __name__ == '__main__':
+    unittest.main()
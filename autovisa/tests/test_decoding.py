@@ -0,0 +1,112 @@
+"""Unit tests for decoding module."""
+import gzip
+import json
+import unittest
+import zlib
+
+from autovisa.src.decoding import (
+    iter_body_chunks, iter_json_array, iter_json_items, load_json_response, read_body
+)
+from autovisa.src.exceptions import MissingDatesException, ResponseTooLargeException
+from autovisa.src.fake_driver import FakeResponse
+
+DAYS = [{"date": f"2024-01-{day:02d}", "business_day": True} for day in range(1, 29)]
+BODY = json.dumps(DAYS).encode()
+
+
+class TestIterBodyChunks(unittest.TestCase):
+    """Test cases for iter_body_chunks function."""
+
+    def test_encodings(self):
+        """Test identity, gzip and both kinds of deflate bodies decode the same."""
+        raw_deflate = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+        bodies = {
+            "identity": BODY,
+            "gzip": gzip.compress(BODY),
+            "deflate": zlib.compress(BODY),
+            "raw-deflate": raw_deflate.compress(BODY) + raw_deflate.flush(),
+        }
+        for name, body in bodies.items():
+            encoding = "deflate" if name == "raw-deflate" else name
+            response = FakeResponse(200, body, {"Content-Encoding": encoding})
+            with self.subTest(encoding=name):
+                chunks = list(iter_body_chunks(response, chunk_size=64))
+                self.assertEqual(b"".join(chunks), BODY)
+                self.assertLessEqual(max(len(chunk) for chunk in chunks), 64)
+
+    def test_size_cap(self):
+        """Test decoding stops once the cap is exceeded, compressed or not."""
+        for body, encoding in ((BODY, "identity"), (gzip.compress(BODY), "gzip")):
+            response = FakeResponse(200, body, {"Content-Encoding": encoding})
+            with self.subTest(encoding=encoding):
+                with self.assertRaises(ResponseTooLargeException):
+                    read_body(response, max_size=400)
+
+    def test_size_cap_is_missing_dates(self):
+        """Test an oversized payload is handled like a missing one."""
+        self.assertTrue(issubclass(ResponseTooLargeException, MissingDatesException))
+
+
+class TestIterJsonArray(unittest.TestCase):
+    """Test cases for iter_json_array function."""
+
+    def test_items_split_across_chunks(self):
+        """Test items are parsed whatever the chunk boundaries."""
+        body = json.dumps([1, 23, "a,]b", {"date": "2024-01-01"}, [True, None], 4.5]).encode()
+        for size in (1, 2, 7, len(body)):
+            chunks = [body[start:start + size] for start in range(0, len(body), size)]
+            with self.subTest(size=size):
+                self.assertEqual(
+                    list(iter_json_array(chunks)),
+                    [1, 23, "a,]b", {"date": "2024-01-01"}, [True, None], 4.5]
+                )
+
+    def test_multibyte_characters(self):
+        """Test characters split across chunks are decoded."""
+        body = json.dumps(["Montréal"], ensure_ascii=False).encode()
+        chunks = [body[start:start + 1] for start in range(len(body))]
+
+        self.assertEqual(list(iter_json_array(chunks)), ["Montréal"])
+
+    def test_stops_reading(self):
+        """Test chunks past the items read are not pulled."""
+        pulled = []
+
+        def chunks():
+            for start in range(0, len(BODY), 32):
+                pulled.append(start)
+                yield BODY[start:start + 32]
+
+        items = iter_json_array(chunks())
+        self.assertEqual(next(items), DAYS[0])
+        self.assertLess(len(pulled), 3)
+
+    def test_invalid(self):
+        """Test truncated and non-array bodies raise."""
+        for body in (BODY[:len(BODY) // 2], b'{"error": "expired"}', b""):
+            with self.subTest(body=body[:20]):
+                with self.assertRaises(ValueError):
+                    list(iter_json_array([body]))
+
+
+class TestJsonResponses(unittest.TestCase):
+    """Test cases for load_json_response and iter_json_items functions."""
+
+    def test_same_items(self):
+        """Test the whole and streamed parses agree."""
+        response = FakeResponse(200, gzip.compress(BODY), {"Content-Encoding": "gzip"})
+
+        self.assertEqual(load_json_response(response), DAYS)
+        self.assertEqual(list(iter_json_items(response)), DAYS)
+
+    def test_truncated_tail_not_read(self):
+        """Test leading items are read from a body truncated further on."""
+        response = FakeResponse(200, BODY[:len(BODY) // 2], {"Content-Encoding": "identity"})
+
+        items = iter_json_items(response)
+
+        self.assertEqual([next(items) for _ in range(3)], DAYS[:3])
+
+
+if __name__ == '__main__':
+    unittest.main()
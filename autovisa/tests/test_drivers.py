@@ -0,0 +1,98 @@
+"""Unit tests for drivers module."""
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from autovisa.src.drivers import (
+    BACKENDS, DriverBinary, get_backend_class, load_driver_binary, resolve_driver_binary
+)
+from autovisa.src.webdriver import WebDriver
+
+
+class TestBackends(unittest.TestCase):
+    """Test cases for backend selection."""
+
+    def test_get_backend_class(self):
+        """Test backends are looked up by name."""
+        self.assertIs(get_backend_class("firefox"), BACKENDS["firefox"])
+        with self.assertRaises(ValueError):
+            get_backend_class("safari")
+        # Plain selenium cannot capture the days requests
+        with self.assertRaises(ValueError):
+            get_backend_class("chrome")
+
+    def test_webdriver_honors_backend(self):
+        """Test WebDriver launches the class of WEBDRIVER_BACKEND."""
+        driver_class = MagicMock()
+        with patch.dict(BACKENDS, {"wire": driver_class}):
+            with patch.dict("os.environ", {"WEBDRIVER_BACKEND": "wire"}):
+                web_driver = WebDriver()
+
+        self.assertIs(web_driver._WEBDRIVER_CLASS, driver_class)
+        self.assertIs(web_driver.driver, driver_class.return_value)
+
+    def test_webdriver_honors_class_attribute(self):
+        """Test subclasses can pin the driver class."""
+        driver_class = MagicMock()
+        launcher = type("Launcher", (WebDriver,), {"_WEBDRIVER_CLASS": driver_class})
+
+        with patch.dict("os.environ", {"WEBDRIVER_BACKEND": "firefox"}):
+            web_driver = launcher()
+
+        self.assertIs(web_driver.driver, driver_class.return_value)
+
+
+class TestResolveDriverBinary(unittest.TestCase):
+    """Test cases for resolve_driver_binary function."""
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.cache_path = os.path.join(tmp_dir.name, "drivers.json")
+        self.driver_path = os.path.join(tmp_dir.name, "chromedriver")
+        self.browser_path = os.path.join(tmp_dir.name, "chrome")
+        for path in (self.driver_path, self.browser_path):
+            with open(path, "w"):
+                pass
+        resolve_driver_binary.cache_clear()
+        self.addCleanup(resolve_driver_binary.cache_clear)
+
+        binary = DriverBinary(
+            "wire", self.driver_path, self.browser_path, 140,
+            os.stat(self.browser_path).st_mtime,
+        )
+        patcher = patch(
+            'autovisa.src.drivers.resolve_with_selenium_manager', return_value=binary
+        )
+        self.mock_resolve = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_resolved_once_per_host(self):
+        """Test resolution is cached on disk and reused by other processes."""
+        binary = resolve_driver_binary("wire", self.cache_path)
+        resolve_driver_binary.cache_clear()
+
+        self.assertEqual(resolve_driver_binary("wire", self.cache_path), binary)
+        self.assertEqual(self.mock_resolve.call_count, 1)
+        self.assertEqual(load_driver_binary("wire", self.cache_path).browser_version, 140)
+
+    def test_browser_update_invalidates(self):
+        """Test the driver is resolved again after the browser changes."""
+        resolve_driver_binary("wire", self.cache_path)
+        resolve_driver_binary.cache_clear()
+        os.utime(self.browser_path, (0, 0))
+
+        resolve_driver_binary("wire", self.cache_path)
+
+        self.assertEqual(self.mock_resolve.call_count, 2)
+
+    def test_failure_falls_back_to_defaults(self):
+        """Test launching is left to the library when resolution fails."""
+        self.mock_resolve.side_effect = RuntimeError("offline")
+
+        self.assertEqual(resolve_driver_binary("wire", self.cache_path), DriverBinary("wire"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,10 @@
 """Unit tests for exceptions module."""
 import unittest
 
-from autovisa.src.exceptions import MissingDatesException
+from autovisa.src.exceptions import (
+    MissingDatesException, NavigationException, SiteUnavailableException,
+    UnknownFacilityException
+)
 
 
 class TestExceptions(unittest.TestCase):
@@ -25,6 +28,16 @@ class TestExceptions(unittest.TestCase):
         with self.assertRaises(MissingDatesException):
             raise MissingDatesException("Test error message")
 
+    def test_navigation_exceptions(self):
+        """Test navigation exceptions keep their message."""
+        for exception_class in (
+                NavigationException, SiteUnavailableException, UnknownFacilityException
+        ):
+            exception = exception_class("Site unavailable: maintenance")
+
+            self.assertIsInstance(exception, Exception)
+            self.assertEqual(str(exception), "Site unavailable: maintenance")
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,105 @@
+"""Unit tests for facilities module."""
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from autovisa.src.facilities import (
+    FACILITY_SCRIPT, Facility, FacilityCatalog, load_catalog, revalidate_catalog,
+    save_catalog
+)
+from autovisa.src.fake_driver import FakeDriver
+
+SNAPSHOT_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "site")
+RESCHEDULE_PATH = "/en-ca/niv/schedule/2000001/appointment"
+
+
+class TestFacilityCatalog(unittest.TestCase):
+    """Test cases for FacilityCatalog class."""
+
+    def setUp(self):
+        self.catalog = FacilityCatalog(
+            [Facility("91", "Montréal"), Facility("93", "Quebec City"), Facility("94", "Toronto")],
+            fingerprint="123", fetched_at=1000.0,
+        )
+
+    def test_get_by_id_or_name(self):
+        """Test facilities are found by id or by name."""
+        self.assertEqual(self.catalog.get_id("94"), "94")
+        self.assertEqual(self.catalog.get_id("montreal"), "91")
+        self.assertEqual(self.catalog.get_id("Quebec City"), "93")
+        with self.assertRaises(KeyError):
+            self.catalog.get_id("Atlantis")
+
+    def test_resolve_in_form_order(self):
+        """Test allowed facilities are returned in form order, skipping unknown ones."""
+        facilities = self.catalog.resolve(["94", "Atlantis", "Montreal"])
+
+        self.assertEqual([facility.id for facility in facilities], ["91", "94"])
+
+    def test_expiry(self):
+        """Test catalogs expire after the TTL or without fingerprint."""
+        self.assertFalse(self.catalog.is_expired(ttl=60, now=1030.0))
+        self.assertTrue(self.catalog.is_expired(ttl=60, now=1100.0))
+        self.assertTrue(FacilityCatalog.from_city_map().is_expired())
+
+    def test_disk_round_trip(self):
+        """Test catalogs are cached per locale."""
+        with tempfile.TemporaryDirectory() as cache_dir:
+            path = os.path.join(cache_dir, "facilities.json")
+            save_catalog(self.catalog, path)
+            save_catalog(FacilityCatalog([Facility("88", "Monterrey", "es-mx")], "es-mx"), path)
+
+            loaded = load_catalog("en-ca", path)
+
+            self.assertEqual(loaded.facilities, self.catalog.facilities)
+            self.assertEqual(loaded.fingerprint, "123")
+            self.assertEqual(len(load_catalog("es-mx", path)), 1)
+            self.assertIsNone(load_catalog("pt-br", path))
+
+
+class TestRevalidateCatalog(unittest.TestCase):
+    """Test cases for revalidate_catalog function."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.path = os.path.join(self.tmp_dir.name, "facilities.json")
+        self.driver = FakeDriver.from_snapshot_dir(SNAPSHOT_DIR)
+        self.driver.get(RESCHEDULE_PATH)
+
+    def test_reads_form_in_one_call(self):
+        """Test the catalog is read from the form with a single script call."""
+        commands = self.driver.command_count
+
+        catalog = revalidate_catalog(self.driver, None, "en-ca", path=self.path)
+
+        self.assertEqual(self.driver.command_count - commands, 1)
+        self.assertEqual(len(catalog), 7)
+        self.assertEqual(catalog.get_id("Quebec City"), "93")
+        self.assertIsNotNone(load_catalog("en-ca", self.path))
+
+    def test_unchanged_form_keeps_catalog(self):
+        """Test a fresh catalog is kept when the form did not change."""
+        catalog = revalidate_catalog(self.driver, None, "en-ca", path=self.path)
+
+        self.assertIs(revalidate_catalog(self.driver, catalog, "en-ca", path=self.path), catalog)
+
+    def test_changed_form_replaces_catalog(self):
+        """Test a changed form replaces the cached catalog."""
+        driver = MagicMock()
+        driver.execute_script.return_value = {
+            "fingerprint": "new", "options": [["94", "Toronto", True]],
+        }
+        catalog = FacilityCatalog([Facility("89", "Calgary")], fingerprint="old")
+
+        new_catalog = revalidate_catalog(driver, catalog, "en-ca", path=self.path)
+
+        self.assertEqual(new_catalog.resolve(["94"]), [Facility("94", "Toronto")])
+        self.assertEqual(driver.execute_script.call_args[0], (
+            FACILITY_SCRIPT, "appointments_consulate_appointment_facility_id", None
+        ))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,476 @@
+"""Unit tests for fake_driver module."""
+import os
+import tempfile
+import unittest
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+from selenium.common import InvalidSelectorException, NoSuchElementException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.select import Select
+
+from autovisa.src.appointment import Appointment
+from autovisa.src.checkpoint import get_checkpoint_path, load_checkpoint
+from autovisa.src.config import Config
+from autovisa.src.fake_driver import FakeDriver, instant_delays, parse_html, select_css
+from autovisa.src.page_state import PageState, detect_page_state
+from autovisa.src.schedule import CONFIRM_BUTTON_SELECTOR, Scheduler
+from autovisa.src.tabs import FacilityTabs
+from autovisa.src.utils import clear_env_caches, get_dict_response
+
+SNAPSHOT_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "site")
+LIST_PATH = "/en-ca/niv/groups/1000001"
+RESCHEDULE_PATH = "/en-ca/niv/schedule/2000001/appointment"
+
+
+class TestSelectors(unittest.TestCase):
+    """Test cases for the CSS and XPath engines."""
+
+    def setUp(self):
+        self.driver = FakeDriver.from_snapshot_dir(SNAPSHOT_DIR)
+
+    def test_css_combinators(self):
+        """Test descendant, child and attribute selectors."""
+        document = parse_html(
+            '<div class="a"><p><span id="x" data-v="1">one</span></p>'
+            '<span class="b c">two</span></div>'
+        )
+
+        self.assertEqual(len(select_css(document, "div span")), 2)
+        self.assertEqual(len(select_css(document, "div > span")), 1)
+        self.assertEqual(len(select_css(document, "div.a > span.b.c")), 1)
+        self.assertEqual(len(select_css(document, '#x[data-v = "1"]')), 1)
+        self.assertEqual(len(select_css(document, "span[data-v]")), 1)
+
+    def test_invalid_css(self):
+        """Test XPath expressions are rejected as CSS, like a real browser."""
+        self.driver.get(LIST_PATH)
+
+        with self.assertRaises(InvalidSelectorException):
+            self.driver.find_element(By.CSS_SELECTOR, "//a[contains(text(), 'Continue')]")
+
+    def test_xpath(self):
+        """Test the XPath expressions used by the scheduler."""
+        self.driver.get("/en-ca/niv/schedule/2000001/continue_actions")
+
+        expand = self.driver.find_element(
+            By.XPATH, "//a[.//h5/span[contains(@class, 'fa-calendar-minus')]]"
+        )
+        reschedule = self.driver.find_element(
+            By.XPATH, "//a[contains(text(), 'Reschedule Appointment')]"
+        )
+
+        self.assertEqual(expand.get_attribute("aria-controls"), "reschedule")
+        self.assertTrue(reschedule.get_attribute("href").endswith(RESCHEDULE_PATH))
+
+    def test_missing_element(self):
+        """Test missing elements raise like Selenium does."""
+        self.driver.get(LIST_PATH)
+
+        with self.assertRaises(NoSuchElementException):
+            self.driver.find_element(By.ID, "missing")
+
+
+class TestFakeDriver(unittest.TestCase):
+    """Test cases for FakeDriver class."""
+
+    def setUp(self):
+        self.driver = FakeDriver.from_snapshot_dir(SNAPSHOT_DIR)
+
+    def test_appointment_parsing(self):
+        """Test appointments are parsed from the recorded list."""
+        self.driver.get(LIST_PATH)
+        cards = self.driver.find_elements(By.CSS_SELECTOR, ".application.attend_appointment")
+
+        appointment = Appointment.create_from_element(cards[0])
+
+        self.assertEqual(appointment.date, date(2023, 11, 21))
+        self.assertEqual(appointment.time, "11:15")
+        self.assertEqual(appointment.passport, "XY123456")
+        self.assertTrue(appointment.link.endswith("/schedule/2000001/continue_actions"))
+
+    def test_select_records_request(self):
+        """Test selecting a facility fetches its available days."""
+        self.driver.get(RESCHEDULE_PATH)
+        del self.driver.requests
+        select = Select(
+            self.driver.find_element(By.ID, "appointments_consulate_appointment_facility_id")
+        )
+
+        select.select_by_value("95")
+
+        self.assertEqual(select.first_selected_option.text, "Vancouver")
+        request, = self.driver.requests
+        self.assertIn("/days/95.json", request.url)
+        self.assertEqual(get_dict_response(request)[0]["date"], "2023-09-18")
+
+    def test_tabs_keep_own_page(self):
+        """Test each tab keeps its document and closing the last one ends the browser."""
+        self.driver.get(RESCHEDULE_PATH)
+        first_handle = self.driver.current_window_handle
+        self.driver.switch_to.new_window("tab")
+        self.driver.get(LIST_PATH)
+
+        self.driver.switch_to.window(first_handle)
+        self.assertTrue(self.driver.current_url.endswith(RESCHEDULE_PATH))
+        self.assertEqual(len(self.driver.window_handles), 2)
+
+        self.driver.close()
+        self.assertFalse(self.driver.closed)
+        self.driver.switch_to.window(self.driver.window_handles[0])
+        self.assertTrue(self.driver.current_url.endswith(LIST_PATH))
+        self.driver.close()
+        self.assertTrue(self.driver.closed)
+
+    def test_page_states(self):
+        """Test the page-state script runs against the recorded pages."""
+        expected = {
+            "/en-ca/niv/users/sign_in": PageState.SIGN_IN,
+            LIST_PATH: PageState.APPOINTMENT_LIST,
+            "/en-ca/niv/schedule/2000001/continue_actions": PageState.APPOINTMENT_ACTIONS,
+            RESCHEDULE_PATH: PageState.RESCHEDULE_FORM,
+            "/missing": PageState.UNKNOWN,
+        }
+        for path, state in expected.items():
+            self.driver.get(path)
+            self.assertEqual(detect_page_state(self.driver), state, path)
+
+
+class TestSchedulerFlow(unittest.TestCase):
+    """Test cases for Scheduler flows replayed on recorded pages."""
+
+    def setUp(self):
+        patcher = patch('autovisa.src.webdriver.DEFAULT_WEBDRIVER_CLASS')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        delays = instant_delays()
+        delays.__enter__()
+        self.addCleanup(delays.__exit__, None, None, None)
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        env = patch.dict('os.environ', {'AUTOVISA_CACHE_DIR': cache_dir.name})
+        env.start()
+        self.addCleanup(env.stop)
+
+        self.scheduler = Scheduler()
+        self.scheduler.driver = FakeDriver.from_snapshot_dir(SNAPSHOT_DIR)
+
+    @patch.dict('os.environ', {'BASE_URL': 'https://ais.example.com'})
+    @patch('autovisa.src.schedule.get_credentials', return_value=('a@b.com', 'pwd'))
+    def test_login_to_best_date(self, mock_get_credentials):
+        """Test the flow from the sign-in page to a new best date."""
+        self.scheduler.navigate_login_page()
+        self.scheduler.execute_login()
+        appointments = self.scheduler.gen_current_appointment_list("XY123456")
+        self.scheduler.current_appointment_list = appointments
+        self.scheduler.current_appointment = appointments[0]
+
+        new_appointment = self.scheduler.get_best_date()
+
+        self.assertEqual(len(appointments), 1)
+        self.assertEqual(new_appointment.date, date(2023, 9, 7))
+        self.assertEqual(new_appointment.city, "Toronto")
+        self.assertEqual(self.scheduler.reschedule_url,
+                         "https://ais.example.com" + RESCHEDULE_PATH)
+
+    @patch.dict('os.environ', {
+        'BASE_URL': 'https://ais.example.com', 'LOGIN_MODE': 'fast', 'PRODUCTION': ''
+    })
+    @patch('autovisa.src.schedule.get_credentials', return_value=('a@b.com', 'pwd'))
+    def test_fast_login(self, mock_get_credentials):
+        """Test the fast mode fills the form in one go and waits on the next page."""
+        clear_env_caches()
+        self.addCleanup(clear_env_caches)
+        self.scheduler.navigate_login_page()
+
+        with patch('autovisa.src.schedule.wait_page_load') as mock_wait_page_load, \
+                patch.object(self.scheduler, 'write_input') as mock_write_input:
+            self.scheduler.execute_login()
+
+        mock_wait_page_load.assert_not_called()
+        mock_write_input.assert_not_called()
+        self.assertEqual(detect_page_state(self.scheduler.driver), PageState.APPOINTMENT_LIST)
+        self.assertEqual(self.scheduler.get_status()["last_login"]["mode"], "fast")
+
+    def test_execute_reschedule(self):
+        """Test the date and time are picked on the recorded form."""
+        self.scheduler.driver.get(RESCHEDULE_PATH)
+        self.scheduler.new_appointment = Appointment(7, 9, 2023, "", "Toronto")
+
+        with patch('autovisa.src.schedule.is_prod', return_value=False):
+            self.assertTrue(self.scheduler.execute_reschedule())
+
+        time_select = Select(self.scheduler.driver.find_element(
+            By.ID, "appointments_consulate_appointment_time"
+        ))
+        self.assertEqual(time_select.first_selected_option.text, "08:15")
+
+    def test_fast_commit_keeps_detected_facility(self):
+        """Test the facility is not selected again after an on-page detection."""
+        self.scheduler.driver.get(RESCHEDULE_PATH)
+        self.scheduler.current_appointment = Appointment(21, 11, 2023, "", "Toronto")
+        self.scheduler.evaluate_dates("Toronto", ["2023-09-08"])
+        self.scheduler.slow_select_element = MagicMock()
+
+        with patch('autovisa.src.schedule.is_prod', return_value=False):
+            self.assertTrue(self.scheduler.execute_reschedule())
+
+        self.scheduler.slow_select_element.assert_not_called()
+        self.assertIsNotNone(self.scheduler.get_status()["last_commit_latency_s"])
+
+    def test_commit_reselects_facility_off_page(self):
+        """Test the facility is selected when the detection came from elsewhere."""
+        self.scheduler.driver.get(RESCHEDULE_PATH)
+        self.scheduler.current_appointment = Appointment(21, 11, 2023, "", "Toronto")
+        self.scheduler.evaluate_dates("Toronto", ["2023-09-08"], on_page=False)
+
+        self.assertFalse(self.scheduler.is_facility_selected("94"))
+        self.assertEqual(self.scheduler.find_date_cell(date(2023, 9, 8)).text, "8")
+
+    def test_resume_from_checkpoint(self):
+        """Test a restart restores the state and the session instead of logging in."""
+        self.scheduler.checkpoint_path = get_checkpoint_path()
+        self.scheduler.applicant_info = "XY123456"
+        self.scheduler.driver.get(RESCHEDULE_PATH)
+        self.scheduler.driver.add_cookie({"name": "_session", "value": "abc"})
+        self.scheduler.current_appointment_list = [Appointment(21, 11, 2023, "", "Toronto")]
+        self.scheduler.current_appointment = self.scheduler.current_appointment_list[0]
+        self.scheduler.navigate_to_reschedule_form()
+        self.scheduler.write_checkpoint()
+        self.assertIsNotNone(load_checkpoint(self.scheduler.checkpoint_path))
+
+        restarted = Scheduler()
+        restarted.driver = FakeDriver.from_snapshot_dir(SNAPSHOT_DIR)
+        restarted.checkpoint_path = self.scheduler.checkpoint_path
+
+        self.assertFalse(restarted.resume_from_checkpoint("AB000000"))
+        self.assertTrue(restarted.resume_from_checkpoint("XY123456"))
+        self.assertEqual(restarted.current_appointment_list[0].date, date(2023, 11, 21))
+        self.assertEqual(restarted.driver.get_cookies(), [{"name": "_session", "value": "abc"}])
+        self.assertEqual(restarted.detect_page_state(), PageState.RESCHEDULE_FORM)
+
+    def test_rescheduled_date_is_checkpointed(self):
+        """Test a committed date replaces the current one in the checkpoint."""
+        self.scheduler.checkpoint_path = get_checkpoint_path()
+        self.scheduler.driver.get(RESCHEDULE_PATH)
+        self.scheduler.current_appointment_list = [
+            Appointment(21, 11, 2023, "11:15", "Toronto", "JERRY", "XY123456")
+        ]
+        self.scheduler.current_appointment = self.scheduler.current_appointment_list[0]
+        self.scheduler.new_appointment = Appointment(7, 9, 2023, "", "Toronto")
+
+        with patch('autovisa.src.schedule.is_prod', return_value=False):
+            self.assertTrue(self.scheduler.execute_reschedule())
+
+        appointment, = load_checkpoint(self.scheduler.checkpoint_path).appointments
+        self.assertEqual(appointment.date, date(2023, 9, 7))
+        self.assertEqual(appointment.time, "08:15")
+        self.assertEqual(appointment.passport, "XY123456")
+
+    def test_rescheduled_date_is_checkpointed_in_prod(self):
+        """Test the committed time is kept when submitting leaves the form."""
+        self.scheduler.checkpoint_path = get_checkpoint_path()
+        driver = self.scheduler.driver
+        driver.submits[RESCHEDULE_PATH] = LIST_PATH
+        driver.get(RESCHEDULE_PATH)
+        self.scheduler.current_appointment_list = [
+            Appointment(21, 11, 2023, "11:15", "Toronto", "JERRY", "XY123456")
+        ]
+        self.scheduler.current_appointment = self.scheduler.current_appointment_list[0]
+        self.scheduler.new_appointment = Appointment(7, 9, 2023, "", "Toronto")
+        select_element = self.scheduler.instant_select_element
+
+        def instant_select_element(key):
+            # The recorded pages have no confirmation modal
+            return MagicMock() if key == CONFIRM_BUTTON_SELECTOR else select_element(key)
+
+        with patch('autovisa.src.schedule.is_prod', return_value=True), \
+                patch.object(self.scheduler, 'instant_select_element', instant_select_element):
+            self.assertTrue(self.scheduler.execute_reschedule())
+
+        self.assertTrue(driver.current_url.endswith(LIST_PATH))
+        appointment, = load_checkpoint(self.scheduler.checkpoint_path).appointments
+        self.assertEqual(appointment.date, date(2023, 9, 7))
+        self.assertEqual(appointment.time, "08:15")
+
+    def test_leading_dates_decoded(self):
+        """Test a check only decodes the leading dates of the payload."""
+        path = "/en-ca/niv/schedule/2000001/appointment/days/94.json"
+        body = self.scheduler.driver.responses[path]
+        # The last date is cut off, as if the rest of the body was never read
+        self.scheduler.driver.responses[path] = body[:body.rindex(b',{')]
+        self.scheduler.driver.get(RESCHEDULE_PATH)
+        self.scheduler.current_appointment = Appointment(21, 11, 2023, "", "Toronto")
+
+        self.assertEqual(self.scheduler.get_best_date().date, date(2023, 9, 7))
+
+    def test_applied_config_excludes_dates(self):
+        """Test a new date window applies to payloads already seen."""
+        self.scheduler.driver.get(RESCHEDULE_PATH)
+        self.scheduler.current_appointment = Appointment(21, 11, 2023, "", "Toronto")
+        self.assertIsNotNone(self.scheduler.get_best_date())
+
+        self.scheduler.apply_config(Config(
+            exclude_date_start=date(2023, 9, 1), exclude_date_end=date(2023, 9, 30)
+        ))
+        self.scheduler.refresh_availability()
+
+        self.assertEqual(self.scheduler.get_best_date().date, date(2023, 10, 16))
+        self.assertEqual(self.scheduler.metrics["unchanged_payloads"], 0)
+
+    def test_excluded_first_date_skipped(self):
+        """Test the first date outside the exclude date range is picked."""
+        self.scheduler.apply_config(Config(
+            exclude_date_start=date(2023, 9, 1), exclude_date_end=date(2023, 9, 7)
+        ))
+        for observation_store in (self.scheduler.observation_store, None):
+            with self.subTest(observation_store=observation_store):
+                self.scheduler.observation_store = observation_store
+                self.scheduler.payload_digests.clear()
+                self.scheduler.driver.get(RESCHEDULE_PATH)
+                self.scheduler.current_appointment = Appointment(21, 11, 2023, "", "Toronto")
+
+                self.assertEqual(self.scheduler.get_best_date().date, date(2023, 9, 8))
+                self.assertEqual(
+                    self.scheduler.detection.dates, ("2023-09-08", "2023-10-16", "2024-01-22")
+                )
+
+    def test_read_candidate_dates_stops_early(self):
+        """Test reading stops at the first date that cannot beat the appointment."""
+        self.scheduler.current_appointment = Appointment(1, 10, 2023, "", "Toronto")
+        days = iter([{"date": "2023-09-07"}, {"date": "2023-10-16"}, {"date": "2024-01-22"}])
+
+        self.assertEqual(
+            self.scheduler.read_candidate_dates(days), ["2023-09-07", "2023-10-16"]
+        )
+        self.assertEqual(next(days), {"date": "2024-01-22"})
+
+    def test_refresh_availability_in_page(self):
+        """Test the loaded form fetches the days again without reloading."""
+        self.scheduler.driver.get(RESCHEDULE_PATH)
+
+        self.assertTrue(self.scheduler.refresh_availability())
+
+        request, = self.scheduler.driver.requests
+        self.assertIn("/days/94.json", request.url)
+        self.assertEqual(self.scheduler.metrics["availability_refreshes"], 1)
+        self.assertEqual(self.scheduler.metrics["page_reloads"], 0)
+
+    def test_refresh_availability_reloads_off_form(self):
+        """Test the page is reloaded when it is not the form."""
+        self.scheduler.driver.get(RESCHEDULE_PATH)
+        self.scheduler.driver.get(LIST_PATH)
+
+        self.assertFalse(self.scheduler.refresh_availability())
+        self.assertEqual(self.scheduler.metrics["page_reloads"], 1)
+        # The days fetched by the earlier page are no longer captured
+        self.assertFalse(
+            [request for request in self.scheduler.driver.requests if "/days/" in request.url]
+        )
+
+    def test_unchanged_payload_not_evaluated(self):
+        """Test the same days payload is only evaluated once per appointment."""
+        self.scheduler.driver.get(RESCHEDULE_PATH)
+        self.scheduler.current_appointment = Appointment(21, 11, 2023, "", "Toronto")
+
+        self.assertIsNotNone(self.scheduler.get_best_date())
+        self.scheduler.refresh_availability()
+        self.assertIsNone(self.scheduler.get_best_date())
+
+        self.assertEqual(self.scheduler.metrics["json_requests"], 2)
+        self.assertEqual(self.scheduler.metrics["unchanged_payloads"], 1)
+        self.assertEqual(self.scheduler.metrics["candidates"], 1)
+
+    def test_tabs_check_each_facility(self):
+        """Test every facility is read from its own tab, opened only once."""
+        self.scheduler.driver.get(RESCHEDULE_PATH)
+        self.scheduler.facility_tabs = FacilityTabs()
+        self.scheduler.allowed_city_ids = ("95", "94")
+        self.scheduler.current_appointment = Appointment(10, 9, 2023, "", "Toronto")
+
+        driver = self.scheduler.driver
+        tabs = self.scheduler.facility_tabs
+        new_appointment = self.scheduler.get_best_date()
+        self.assertEqual(driver.current_window_handle, tabs.handles["94"])
+        self.scheduler.get_best_date()
+
+        self.assertEqual(new_appointment.date, date(2023, 9, 7))
+        self.assertEqual(len(driver.window_handles), 2)
+        self.assertEqual(self.scheduler.metrics["tab_opens"], 1)
+        self.assertEqual(self.scheduler.metrics["tab_refreshes"], 4)
+
+        tabs.switch_to(driver, "95")
+        select = Select(
+            driver.find_element(By.ID, "appointments_consulate_appointment_facility_id")
+        )
+        self.assertEqual(select.first_selected_option.text, "Vancouver")
+
+    def test_tabs_commit_in_detection_tab(self):
+        """Test the commit goes back to the tab of the detected facility."""
+        self.scheduler.driver.get(RESCHEDULE_PATH)
+        self.scheduler.facility_tabs = FacilityTabs()
+        self.scheduler.allowed_city_ids = ("94", "95")
+        self.scheduler.current_appointment = Appointment(21, 11, 2023, "", "Toronto")
+        self.scheduler.get_best_date()
+        self.scheduler.facility_tabs.switch_to(self.scheduler.driver, "95")
+        self.scheduler.slow_select_element = MagicMock()
+
+        with patch('autovisa.src.schedule.is_prod', return_value=False):
+            self.assertTrue(self.scheduler.execute_reschedule())
+
+        self.scheduler.slow_select_element.assert_not_called()
+        self.assertEqual(
+            self.scheduler.driver.current_window_handle,
+            self.scheduler.facility_tabs.handles["94"],
+        )
+
+    def test_prefetch_skips_date_without_slots(self):
+        """Test the commit moves to the next date that has prefetched slots."""
+        self.scheduler.driver.get(RESCHEDULE_PATH)
+        self.scheduler.reschedule_url = self.scheduler.driver.current_url
+        self.scheduler.current_appointment = Appointment(21, 11, 2023, "", "Toronto")
+        self.scheduler.evaluate_dates("Toronto", ["2023-09-07", "2023-09-08", "2023-10-16"])
+
+        with patch('autovisa.src.schedule.is_prod', return_value=False):
+            self.assertTrue(self.scheduler.execute_reschedule())
+
+        self.assertEqual(self.scheduler.new_appointment.date, date(2023, 9, 8))
+        time_select = Select(self.scheduler.driver.find_element(
+            By.ID, "appointments_consulate_appointment_time"
+        ))
+        self.assertEqual(time_select.first_selected_option.text, "08:15")
+
+    def test_prefetch_not_reused(self):
+        """Test a new days payload fetches the time slots again, in the same page."""
+        driver = self.scheduler.driver
+        driver.get(RESCHEDULE_PATH)
+        self.scheduler.reschedule_url = driver.current_url
+        self.scheduler.current_appointment = Appointment(21, 11, 2023, "", "Toronto")
+        self.scheduler.evaluate_dates("Toronto", ["2023-09-08"])
+        times_url, = self.scheduler.time_prefetch.urls.values()
+        driver.responses[times_url] = b'{"available_times": []}'
+
+        self.scheduler.evaluate_dates("Toronto", ["2023-09-08"])
+
+        self.assertIsNone(self.scheduler.get_prefetched_slot())
+
+    def test_prefetch_discards_commit_without_slots(self):
+        """Test nothing is submitted when no candidate date has slots."""
+        self.scheduler.driver.get(RESCHEDULE_PATH)
+        self.scheduler.reschedule_url = self.scheduler.driver.current_url
+        self.scheduler.current_appointment = Appointment(21, 11, 2023, "", "Toronto")
+        self.scheduler.evaluate_dates("Toronto", ["2023-09-07"])
+
+        self.assertFalse(self.scheduler.execute_reschedule())
+        self.assertEqual(self.scheduler.metrics["discarded_commits"], 1)
+
+    def test_commit_gives_up_on_taken_date(self):
+        """Test no other date is picked when the detected one is gone."""
+        self.scheduler.driver.get(RESCHEDULE_PATH)
+        self.scheduler.new_appointment = Appointment(1, 9, 2023, "", "Toronto")
+
+        self.assertFalse(self.scheduler.execute_reschedule())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+"""Unit tests for faults module."""
+import json
+import os
+import time
+import unittest
+
+from selenium.webdriver.common.by import By
+
+from autovisa.src.faults import FaultProfile, FaultyDriver, VirtualClock
+from autovisa.src.page_state import PageState, detect_page_state
+from autovisa.src.utils import get_response_body
+
+SNAPSHOT_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "site")
+LOGIN_PATH = "/en-ca/niv/users/sign_in"
+RESCHEDULE_PATH = "/en-ca/niv/schedule/2000001/appointment"
+
+
+class TestFaultyDriver(unittest.TestCase):
+    """Test cases for FaultyDriver class."""
+
+    def make_driver(self, **rates) -> FaultyDriver:
+        driver = FaultyDriver.from_snapshot_dir(
+            SNAPSHOT_DIR, profile=FaultProfile("test", **rates), seed=0
+        )
+        driver.get(LOGIN_PATH)
+        driver.find_element(By.NAME, "commit").click()
+        return driver
+
+    def get_days_request(self, driver: FaultyDriver):
+        del driver.requests
+        driver.get(RESCHEDULE_PATH)
+        return next(request for request in driver.requests if request.path.endswith(".json"))
+
+    def test_clean_profile(self):
+        """Test responses are served unchanged once signed in."""
+        driver = self.make_driver()
+
+        request = self.get_days_request(driver)
+
+        self.assertEqual(request.response.status_code, 200)
+        self.assertTrue(json.loads(get_response_body(request)))
+        self.assertFalse(driver.faults)
+
+    def test_latency(self):
+        """Test latency is added to the virtual clock."""
+        driver = self.make_driver(json_latency_s=2.0, page_latency_s=3.0)
+        start = driver.clock.now
+
+        self.get_days_request(driver)
+
+        self.assertEqual(driver.clock.now - start, 5.0)
+
+    def test_truncated_body(self):
+        """Test truncated bodies cannot be parsed."""
+        request = self.get_days_request(self.make_driver(truncate_rate=1.0))
+
+        with self.assertRaises(ValueError):
+            json.loads(get_response_body(request))
+
+    def test_compressed_body(self):
+        """Test compressed bodies are decoded as the browser would."""
+        request = self.get_days_request(self.make_driver(compress_rate=1.0))
+
+        self.assertEqual(request.response.headers["Content-Encoding"], "gzip")
+        self.assertTrue(json.loads(get_response_body(request)))
+
+    def test_server_error(self):
+        """Test server errors answer with an HTML page."""
+        request = self.get_days_request(self.make_driver(error_rate=1.0))
+
+        self.assertEqual(request.response.status_code, 503)
+
+    def test_session_expiry(self):
+        """Test an expired session redirects to the sign-in page until signing in again."""
+        driver = self.make_driver(expiry_rate=1.0)
+
+        request = self.get_days_request(driver)
+        self.assertEqual(request.response.status_code, 401)
+        driver.refresh()
+
+        self.assertEqual(detect_page_state(driver), PageState.SESSION_EXPIRED)
+        self.assertTrue(driver.current_url.endswith(LOGIN_PATH))
+        driver.find_element(By.NAME, "commit").click()
+        self.assertTrue(driver.signed_in)
+
+
+class TestVirtualClock(unittest.TestCase):
+    """Test cases for VirtualClock class."""
+
+    def test_patched(self):
+        """Test sleeping advances the clock instead of waiting."""
+        clock = VirtualClock()
+
+        with clock.patched():
+            time.sleep(3600)
+            now = time.monotonic()
+
+        self.assertEqual(now, 3600)
+
+
+if __name__ == '__main__':
+    unittest.main()
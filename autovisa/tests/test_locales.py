@@ -0,0 +1,102 @@
+"""Unit tests for locales module."""
+import unittest
+from unittest.mock import MagicMock
+
+from autovisa.src.appointment import Appointment
+from autovisa.src.locales import (
+    fold_name, get_locale_code, get_locale_pack, get_site_root
+)
+
+
+class TestLocalePack(unittest.TestCase):
+    """Test cases for LocalePack class."""
+
+    def test_month_lookup(self):
+        """Test month names map to 1-12 regardless of case and accents."""
+        self.assertEqual(get_locale_pack("en-ca").get_month_int("NOVEMBER"), 11)
+        self.assertEqual(get_locale_pack("fr-ca").get_month_int("Février"), 2)
+        self.assertEqual(get_locale_pack("fr-ca").get_month_int("fevrier"), 2)
+        self.assertEqual(get_locale_pack("pt-br").get_month_int("março"), 3)
+        self.assertEqual(get_locale_pack("es-mx").get_month_int("diciembre"), 12)
+
+    def test_unknown_month(self):
+        """Test unknown month names raise ValueError."""
+        with self.assertRaises(ValueError):
+            get_locale_pack("en-ca").get_month_int("Brumaire")
+
+    def test_unsupported_locale(self):
+        """Test unsupported languages fall back to the English tables."""
+        with self.assertLogs("autovisa", level="WARNING"):
+            locale_pack = get_locale_pack("xx-yy")
+
+        self.assertEqual(locale_pack.code, "xx-yy")
+        self.assertEqual(locale_pack.get_month_int("November"), 11)
+
+    def test_built_once(self):
+        """Test tables are built once per locale."""
+        self.assertIs(get_locale_pack("es-co"), get_locale_pack("es-co"))
+
+    def test_fold_name(self):
+        """Test names are lowercased and stripped of accents."""
+        self.assertEqual(fold_name(" Août "), "aout")
+
+
+class TestLocaleParsing(unittest.TestCase):
+    """Test cases for appointment parsing in other locales."""
+
+    def make_element(self, text):
+        element = MagicMock()
+        element.find_element.return_value.text = text
+        return element
+
+    def test_spanish_address(self):
+        """Test Spanish addresses are parsed."""
+        element = self.make_element(
+            "Cita Consular: 3 enero, 2024, 08:30 Monterrey hora local en Monterrey"
+        )
+
+        result = Appointment.get_address_from_element(element, get_locale_pack("es-mx"))
+
+        self.assertEqual(result, (3, 1, 2024, "08:30", "Monterrey"))
+
+    def test_portuguese_address(self):
+        """Test addresses with "de" connectors are parsed."""
+        element = self.make_element(
+            "Agendamento Consular: 21 de março de 2024, 11:15 Brasília horário local"
+        )
+
+        result = Appointment.get_address_from_element(element, get_locale_pack("pt-br"))
+
+        self.assertEqual(result, (21, 3, 2024, "11:15", "Brasília"))
+
+    def test_accented_applicant(self):
+        """Test applicant names with accents are parsed."""
+        element = self.make_element("Jerry Gerônimo XY123456")
+
+        name, passport = Appointment.get_applicant_from_element(element)
+
+        self.assertEqual(name, "Jerry Gerônimo")
+        self.assertEqual(passport, "XY123456")
+
+
+class TestBaseUrl(unittest.TestCase):
+    """Test cases for reading the locale from the base URL."""
+
+    def test_locale_in_path(self):
+        """Test the first path segment selects the locale."""
+        self.assertEqual(get_locale_code("https://ais.example.com/es-MX/"), "es-mx")
+
+    def test_default_locale(self):
+        """Test the default locale is used without a locale segment."""
+        self.assertEqual(get_locale_code("https://ais.example.com"), "en-ca")
+        self.assertEqual(get_locale_code(None), "en-ca")
+
+    def test_site_root(self):
+        """Test the locale path is dropped from the site root."""
+        self.assertEqual(
+            get_site_root("https://ais.example.com/pt-br/"), "https://ais.example.com"
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
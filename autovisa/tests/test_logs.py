@@ -0,0 +1,123 @@
+"""Unit tests for logs module."""
+import json
+import logging
+import os
+import queue
+import tempfile
+import unittest
+
+from autovisa.src.constants import LOGGER_NAME
+from autovisa.src.logs import (
+    DeferredQueueHandler, JsonFormatter, configure_logging, create_handler, stop_logging
+)
+
+
+class TestJsonFormatter(unittest.TestCase):
+    """Test cases for JsonFormatter class."""
+
+    def test_format(self):
+        """Test records become one JSON object with extras and tracebacks."""
+        try:
+            raise ValueError("boom")
+        except ValueError as err:
+            record = logging.LogRecord(
+                LOGGER_NAME, logging.ERROR, __file__, 10, "Failed %s", ("Toronto",),
+                (type(err), err, err.__traceback__),
+            )
+        record.facility_id = "94"
+
+        data = json.loads(JsonFormatter().format(record))
+
+        self.assertEqual(data["message"], "Failed Toronto")
+        self.assertEqual(data["level"], "ERROR")
+        self.assertEqual(data["facility_id"], "94")
+        self.assertIn("ValueError: boom", data["exc_info"])
+
+
+class TestDeferredQueueHandler(unittest.TestCase):
+    """Test cases for DeferredQueueHandler class."""
+
+    def test_record_is_merged(self):
+        """Test the message is merged when logged, whatever happens to its arguments."""
+        record_queue = queue.SimpleQueue()
+        handler = DeferredQueueHandler(record_queue)
+        dates = ["2023-09-07"]
+        record = logging.LogRecord(LOGGER_NAME, logging.INFO, __file__, 1, "> %s", (dates,), None)
+        record.dates = dates
+
+        handler.handle(record)
+        dates.append("2023-09-08")
+        queued = record_queue.get_nowait()
+
+        self.assertEqual(queued.getMessage(), "> ['2023-09-07']")
+        self.assertIsNone(queued.args)
+        self.assertEqual(json.loads(JsonFormatter().format(queued))["dates"], ["2023-09-07"])
+
+    def test_exception_rendered(self):
+        """Test tracebacks are kept as text, for both output formats."""
+        record_queue = queue.SimpleQueue()
+        handler = DeferredQueueHandler(record_queue)
+        try:
+            raise ValueError("boom")
+        except ValueError as err:
+            record = logging.LogRecord(
+                LOGGER_NAME, logging.ERROR, __file__, 1, "Failed", (),
+                (type(err), err, err.__traceback__),
+            )
+
+        handler.handle(record)
+        queued = record_queue.get_nowait()
+
+        self.assertIsNone(queued.exc_info)
+        self.assertIn("ValueError: boom", logging.Formatter().format(queued))
+        self.assertIn("ValueError: boom", json.loads(JsonFormatter().format(queued))["exc_info"])
+
+
+class TestConfigureLogging(unittest.TestCase):
+    """Test cases for configure_logging function."""
+
+    def setUp(self):
+        logger = logging.getLogger(LOGGER_NAME)
+        state = (list(logger.handlers), logger.level, logger.propagate)
+
+        def restore():
+            stop_logging()
+            logger.handlers[:] = state[0]
+            logger.setLevel(state[1])
+            logger.propagate = state[2]
+
+        self.addCleanup(restore)
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.log_file = os.path.join(tmp_dir.name, "logs", "autovisa.log")
+
+    def test_json_lines_written_in_background(self):
+        """Test records reach the file as JSON lines once the queue drains."""
+        configure_logging(logging.INFO, "json", self.log_file)
+        logger = logging.getLogger(LOGGER_NAME)
+
+        logger.debug("> hidden")
+        logger.info("... Checking %s", "Toronto")
+        stop_logging()
+
+        with open(self.log_file) as log_file:
+            lines = [json.loads(line) for line in log_file]
+        self.assertEqual([line["message"] for line in lines], ["... Checking Toronto"])
+
+    def test_rotation(self):
+        """Test the file is rotated by size."""
+        configure_logging(logging.INFO, "text", self.log_file, max_bytes=200)
+        for index in range(20):
+            logging.getLogger(LOGGER_NAME).info("... Line %d", index)
+        stop_logging()
+
+        self.assertTrue(os.path.exists(f"{self.log_file}.1"))
+
+    def test_unknown_format(self):
+        """Test unknown formats are rejected."""
+        with self.assertRaises(ValueError):
+            create_handler("xml")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+"""Unit tests for observations module."""
+import datetime
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from autovisa.src.appointment import Appointment
+from autovisa.src.fake_driver import FakeRequest, FakeResponse
+from autovisa.src.observations import ObservationStore, open_observation_store
+from autovisa.src.schedule import Scheduler
+
+
+class TestObservationStore(unittest.TestCase):
+    """Test cases for ObservationStore class."""
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.path = os.path.join(tmp_dir.name, "observations.db")
+        self.store = ObservationStore(self.path, max_age=30, source="first")
+        self.addCleanup(self.store.close)
+
+    def test_wal_mode(self):
+        """Test the database is opened in WAL mode."""
+        mode = self.store.connection.execute("PRAGMA journal_mode").fetchone()[0]
+
+        self.assertEqual(mode, "wal")
+
+    def test_get_fresh(self):
+        """Test the latest reading is returned only while fresh."""
+        self.store.publish("94", "Toronto", ["2023-09-12"], observed_at=1000.0)
+        self.store.publish("94", "Toronto", ["2023-09-07", "2023-09-12"], observed_at=1010.0)
+
+        observation = self.store.get_fresh("94", now=1020.0)
+
+        self.assertEqual(observation.earliest, datetime.date(2023, 9, 7))
+        self.assertEqual(observation.source, "first")
+        self.assertIsNone(self.store.get_fresh("94", now=1050.0))
+        self.assertIsNone(self.store.get_fresh("95", now=1020.0))
+
+    def test_shared_between_connections(self):
+        """Test readings published by one process are seen by another."""
+        other = ObservationStore(self.path, source="second")
+        self.addCleanup(other.close)
+
+        other.publish("95", "Vancouver", ["2023-09-18"])
+
+        self.assertEqual(self.store.get_fresh("95").source, "second")
+
+    def test_iter_and_prune(self):
+        """Test readings are replayed in order and pruned by age."""
+        self.store.publish("94", "Toronto", ["2023-09-12"], observed_at=1010.0)
+        self.store.publish("95", "Vancouver", [], observed_at=1000.0)
+        self.store.publish("94", "Toronto", ["2023-09-07"], observed_at=1020.0)
+
+        timeline = list(self.store.iter_observations(facility_ids=["94"]))
+
+        self.assertEqual([obs.observed_at for obs in timeline], [1010.0, 1020.0])
+        self.assertEqual(self.store.prune(1015.0), 2)
+        self.assertEqual(len(list(self.store.iter_observations())), 1)
+
+    def test_open_from_env(self):
+        """Test the store is only opened when configured."""
+        with patch.dict("os.environ", {"OBSERVATION_DB": ""}):
+            self.assertIsNone(open_observation_store())
+        with patch.dict("os.environ", {"OBSERVATION_DB": self.path}):
+            store = open_observation_store()
+            self.addCleanup(store.close)
+            self.assertEqual(store.path, self.path)
+
+    def test_open_prunes_old_readings(self):
+        """Test readings past the retention period are pruned when the store opens."""
+        now = time.time()
+        self.store.publish("94", "Toronto", ["2023-09-12"], observed_at=now - 91 * 86400)
+        self.store.publish("94", "Toronto", ["2023-09-07"], observed_at=now - 89 * 86400)
+
+        with patch.dict("os.environ", {"OBSERVATION_DB": self.path}):
+            store = open_observation_store()
+            self.addCleanup(store.close)
+
+        observation, = store.iter_observations()
+        self.assertEqual(observation.dates, ("2023-09-07",))
+
+
+class TestSchedulerSharedObservations(unittest.TestCase):
+    """Test cases for Scheduler consuming readings of other processes."""
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        env_patcher = patch.dict("os.environ", {"AUTOVISA_CACHE_DIR": tmp_dir.name})
+        env_patcher.start()
+        self.addCleanup(env_patcher.stop)
+        patcher = patch('autovisa.src.webdriver.DEFAULT_WEBDRIVER_CLASS')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        path = os.path.join(tmp_dir.name, "observations.db")
+        self.scheduler = Scheduler()
+        self.scheduler.observation_store = ObservationStore(path, source="self")
+        self.other = ObservationStore(path, source="other")
+        self.addCleanup(self.scheduler.observation_store.close)
+        self.addCleanup(self.other.close)
+        self.scheduler.current_appointment = Appointment(21, 11, 2023, "08:00", "Toronto")
+
+    def test_check_shared_observations(self):
+        """Test a fresh reading from another process replaces a check."""
+        self.other.publish("94", "Toronto", ["2023-09-07"])
+
+        self.assertTrue(self.scheduler.check_shared_observations())
+
+        self.assertEqual(self.scheduler.new_appointment.date, datetime.date(2023, 9, 7))
+        self.assertEqual(self.scheduler.metrics["shared_observations"], 1)
+
+    def test_own_readings_are_not_reused(self):
+        """Test readings published by the same process still need a check."""
+        self.scheduler.publish_observation("Toronto", ["2023-09-07"])
+
+        self.assertFalse(self.scheduler.check_shared_observations())
+        self.assertIsNone(self.scheduler.new_appointment)
+
+    def test_unchanged_payload_published(self):
+        """Test an unchanged payload still refreshes the shared reading."""
+        body = b'[{"date": "2023-09-07", "business_day": true}]'
+        request = FakeRequest(
+            "https://ais.example.com/en-ca/niv/schedule/1/appointment/days/94.json",
+            FakeResponse(200, body, {"Content-Encoding": "identity"}),
+        )
+        self.scheduler.evaluate_days_request("Toronto", request)
+        first = self.scheduler.observation_store.latest("94")
+
+        with patch('autovisa.src.observations.time.time', return_value=first.observed_at + 60):
+            self.assertIsNone(self.scheduler.evaluate_days_request("Toronto", request))
+
+        latest = self.scheduler.observation_store.latest("94")
+        self.assertEqual(self.scheduler.metrics["unchanged_payloads"], 1)
+        self.assertEqual(latest.observed_at, first.observed_at + 60)
+        self.assertEqual(latest.dates, ("2023-09-07",))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+"""Unit tests for page_state module."""
+import unittest
+from unittest.mock import MagicMock
+
+from autovisa.src.page_state import (
+    PAGE_STATE_PROBES, PAGE_STATE_SCRIPT, PageState, detect_page_state
+)
+
+
+class TestDetectPageState(unittest.TestCase):
+    """Test cases for detect_page_state function."""
+
+    def test_single_script_call(self):
+        """Test the page is classified with one script call."""
+        driver = MagicMock()
+        driver.execute_script.return_value = PageState.RESCHEDULE_FORM
+
+        result = detect_page_state(driver)
+
+        self.assertEqual(result, PageState.RESCHEDULE_FORM)
+        driver.execute_script.assert_called_once()
+        script, probes, default = driver.execute_script.call_args[0]
+        self.assertEqual(script, PAGE_STATE_SCRIPT)
+        self.assertEqual(len(probes), len(PAGE_STATE_PROBES))
+        self.assertEqual(default, PageState.UNKNOWN)
+
+    def test_unexpected_value(self):
+        """Test unexpected script results are reported as unknown."""
+        driver = MagicMock()
+        driver.execute_script.return_value = None
+
+        self.assertEqual(detect_page_state(driver), PageState.UNKNOWN)
+
+    def test_error_pages_take_precedence(self):
+        """Test error pages are probed before the regular ones."""
+        states = [probe[0] for probe in PAGE_STATE_PROBES]
+        regular = states.index(PageState.SIGN_IN)
+        for state in (
+            PageState.SESSION_EXPIRED, PageState.MAINTENANCE, PageState.RATE_LIMITED
+        ):
+            self.assertLess(states.index(state), regular)
+
+
+if __name__ == '__main__':
+    unittest.main()
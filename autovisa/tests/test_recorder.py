@@ -0,0 +1,98 @@
+"""Unit tests for recorder module."""
+import json
+import os
+import tempfile
+import unittest
+
+from autovisa.src.fake_driver import FakeDriver
+from autovisa.src.recorder import FlightRecorder, prune_dumps
+
+SNAPSHOT_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "site")
+
+
+class CommandDriver:
+    """Driver stand-in that sends commands through `execute`."""
+    page_source = "<html></html>"
+
+    def execute(self, driver_command, params=None):
+        if driver_command == "fail":
+            raise RuntimeError("browser gone")
+        return {"value": None}
+
+    def get_screenshot_as_png(self):
+        return b"\x89PNG"
+
+
+class TestFlightRecorder(unittest.TestCase):
+    """Test cases for FlightRecorder class."""
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.tmp_dir = tmp_dir.name
+
+    def test_keeps_latest_events(self):
+        """Test only the most recent events are kept."""
+        recorder = FlightRecorder(capacity=3)
+        for index in range(5):
+            recorder.record("phase", phase=str(index))
+
+        self.assertEqual([event["phase"] for event in recorder.events()], ["2", "3", "4"])
+
+    def test_attach_records_commands(self):
+        """Test commands are recorded with their duration and error, without parameters."""
+        recorder = FlightRecorder()
+        driver = CommandDriver()
+        recorder.attach(driver)
+
+        driver.execute("sendKeysToElement", {"text": "secret"})
+        with self.assertRaises(RuntimeError):
+            driver.execute("fail")
+
+        sent, failed = recorder.events()
+        self.assertEqual(sent["command"], "sendKeysToElement")
+        self.assertIsNone(sent["error"])
+        self.assertNotIn("secret", json.dumps(sent))
+        self.assertEqual(failed["error"], "RuntimeError")
+
+    def test_dump(self):
+        """Test events, error, page source and screenshot are written."""
+        recorder = FlightRecorder()
+        recorder.record("page_state", state="reschedule_form")
+        try:
+            raise ValueError("boom")
+        except ValueError as err:
+            error = err
+
+        recorder.dump(CommandDriver(), error, self.tmp_dir).join()
+
+        with open(os.path.join(self.tmp_dir, "events.jsonl")) as events_file:
+            event, = [json.loads(line) for line in events_file]
+        self.assertEqual(event["state"], "reschedule_form")
+        with open(os.path.join(self.tmp_dir, "error.txt")) as error_file:
+            self.assertIn("ValueError: boom", error_file.read())
+        self.assertTrue(os.path.exists(os.path.join(self.tmp_dir, "page.html")))
+        self.assertTrue(os.path.exists(os.path.join(self.tmp_dir, "screenshot.png")))
+
+    def test_dump_without_screenshot(self):
+        """Test the page source is kept when the driver cannot take screenshots."""
+        driver = FakeDriver.from_snapshot_dir(SNAPSHOT_DIR)
+        driver.get("/en-ca/niv/users/sign_in")
+
+        FlightRecorder().dump(driver, directory=self.tmp_dir).join()
+
+        self.assertTrue(os.path.exists(os.path.join(self.tmp_dir, "page.html")))
+        self.assertFalse(os.path.exists(os.path.join(self.tmp_dir, "screenshot.png")))
+
+    def test_prune_dumps(self):
+        """Test the oldest recordings make room for a new one."""
+        for name in ("20230901-000000", "20230902-000000", "20230903-000000"):
+            os.makedirs(os.path.join(self.tmp_dir, name))
+
+        prune_dumps(self.tmp_dir, keep=2)
+
+        self.assertEqual(os.listdir(self.tmp_dir), ["20230903-000000"])
+
+
+if __name__ == '__main__':
+    unittest.main()
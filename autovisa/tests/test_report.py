@@ -0,0 +1,99 @@
+"""Unit tests for report module."""
+import csv
+import datetime
+import json
+import os
+import tempfile
+import unittest
+
+from autovisa.src.observations import Observation
+from autovisa.src.report import NO_DATE, build_report, follow_slots, get_earliest_over_time, main
+from autovisa.src.simulator import Timeline
+
+# Toronto releases 2023-09-07 at 01:00 UTC and withdraws it ten minutes later
+OBSERVATIONS = [
+    Observation("94", "Toronto", 0.0, "", ("2023-12-01", "2023-12-04")),
+    Observation("95", "Vancouver", 0.0, "", ("2023-12-05",)),
+    Observation("94", "Toronto", 3600.0, "", ("2023-09-07", "2023-12-01", "2023-12-04")),
+    Observation("94", "Toronto", 4200.0, "", ("2023-12-01", "2023-12-04")),
+    Observation("95", "Vancouver", 7200.0, "", ()),
+]
+
+
+def ordinal(value: str) -> int:
+    return datetime.date.fromisoformat(value).toordinal()
+
+
+class TestSummaries(unittest.TestCase):
+    """Test cases for the per-facility summaries."""
+
+    def setUp(self):
+        self.toronto, self.vancouver = build_report(Timeline(OBSERVATIONS))
+
+    def test_earliest_over_time(self):
+        """Test the earliest date is kept per bucket, with the readings counted."""
+        self.assertEqual(self.toronto.earliest_over_time, [
+            (0.0, ordinal("2023-12-01"), 1),
+            (3600.0, ordinal("2023-09-07"), 2),
+        ])
+        self.assertEqual(self.vancouver.earliest_over_time[-1], (7200.0, NO_DATE, 1))
+
+    def test_releases_and_lifetimes(self):
+        """Test dates offered after the first reading are released and followed."""
+        self.assertEqual(self.toronto.release_hours[1], 1)
+        self.assertEqual(sum(self.toronto.release_hours), 1)
+        self.assertEqual(list(self.toronto.slot_lifetimes), [600.0])
+
+    def test_improvements(self):
+        """Test only moves to a sooner date count as improvements."""
+        self.assertEqual(self.toronto.improvements, [(3600.0, 85)])
+        summary = self.toronto.summary()
+        self.assertEqual(summary["best_date"], "2023-09-07")
+        self.assertEqual(summary["improvements"], 1)
+        self.assertEqual(self.vancouver.summary()["improvements"], 0)
+
+    def test_window_shift_not_withdrawal(self):
+        """Test a date pushed out of the followed window is not counted as withdrawn."""
+        times = [0.0, 60.0, 120.0]
+        date_lists = [("2024-02-01",), ("2024-01-01", "2024-02-01"), ("2023-12-01", "2024-01-01")]
+
+        _, lifetimes = follow_slots(times, date_lists, slots=1)
+
+        self.assertEqual(list(lifetimes), [])
+
+    def test_offset(self):
+        """Test buckets and hours follow the UTC offset."""
+        times, earliest = [3000.0], [ordinal("2024-01-01")]
+
+        (start, _, _), = get_earliest_over_time(times, earliest, 3600, utc_offset_s=1800)
+        release_hours, _ = follow_slots([0.0, 3000.0], [(), ("2024-01-01",)], utc_offset_s=1800)
+
+        # 00:50 UTC is 01:20 at UTC+00:30, in the bucket starting at 00:30 UTC
+        self.assertEqual(start, 1800.0)
+        self.assertEqual(release_hours[1], 1)
+
+
+class TestMain(unittest.TestCase):
+    """Test cases for main function."""
+
+    def test_writes_report(self):
+        """Test CSV files and an HTML page are written from a timeline file."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            timeline_path = os.path.join(tmp_dir, "timeline.json")
+            with open(timeline_path, "w") as timeline_file:
+                json.dump([observation._asdict() for observation in OBSERVATIONS], timeline_file)
+            output = os.path.join(tmp_dir, "report")
+
+            main(["--timeline", timeline_path, "--output", output, "--utc-offset", "0"])
+
+            with open(os.path.join(output, "facilities.csv")) as csv_file:
+                rows = list(csv.DictReader(csv_file))
+            self.assertEqual([row["facility_id"] for row in rows], ["94", "95"])
+            with open(os.path.join(output, "report.html")) as html_file:
+                self.assertIn("Toronto (94)", html_file.read())
+            for name in ("earliest_dates.csv", "release_hours.csv", "slot_lifetimes.csv"):
+                self.assertTrue(os.path.exists(os.path.join(output, name)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+"""Unit tests for runtime module."""
+import asyncio
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from autovisa.src.config import Config
+from autovisa.src.control import Controller
+from autovisa.src.runtime import AsyncRuntime, close_failed_session, quit_browser
+
+
+class TestAsyncRuntime(unittest.TestCase):
+    """Test cases for AsyncRuntime class."""
+
+    def test_calls_share_driver_thread(self):
+        """Test blocking calls run in order on one thread, off the event loop."""
+        runtime = AsyncRuntime()
+
+        async def run():
+            names = [await runtime.call(lambda: threading.current_thread().name) for _ in range(3)]
+            await runtime.close()
+            return names
+
+        names = asyncio.run(run())
+
+        self.assertEqual(len(set(names)), 1)
+        self.assertTrue(names[0].startswith("autovisa-driver"))
+
+    def test_wait_from_driver_runs_tasks(self):
+        """Test background tasks keep running while the driver thread waits."""
+        runtime = AsyncRuntime()
+        ticks = []
+
+        async def run():
+            runtime.loop = asyncio.get_running_loop()
+            runtime.every(0.01, lambda: ticks.append(threading.current_thread().name))
+            await runtime.call(runtime.wait_from_driver, 0.2)
+            await runtime.close()
+
+        asyncio.run(run())
+
+        self.assertGreater(len(ticks), 3)
+        self.assertEqual(set(ticks), {threading.main_thread().name})
+        self.assertFalse(runtime.tasks)
+
+    @patch('autovisa.src.runtime.create_scheduler')
+    def test_run_until_drained(self, mock_create_scheduler):
+        """Test sessions are started on the driver thread until the controller drains."""
+        controller = Controller()
+        scheduler = MagicMock(config=Config())
+        scheduler.run_reschedule_suite.side_effect = [RuntimeError("Session failed"), None]
+        mock_create_scheduler.return_value = scheduler
+        runtime = AsyncRuntime(controller)
+        config_loader = MagicMock()
+        config_loader.reload_if_changed.return_value = None
+        # The second hibernation is cut short by a drain
+        async_wait = self.drain_after(controller, waits=2)
+        with patch.object(controller, 'async_wait', side_effect=async_wait):
+            asyncio.run(runtime.run(Config(), config_loader, "XY123456"))
+
+        self.assertEqual(scheduler.run_reschedule_suite.call_count, 2)
+        self.assertIs(scheduler.runtime, runtime)
+        scheduler.recorder.dump.assert_called_once()
+        self.assertEqual(scheduler.driver.quit.call_count, 2)
+
+    def test_quit_closes_observation_store(self):
+        """Test the observation store of a session is closed with its browser."""
+        for close in (lambda scheduler: close_failed_session(scheduler, RuntimeError()),
+                      quit_browser):
+            scheduler = MagicMock()
+            observation_store = scheduler.observation_store
+
+            close(scheduler)
+
+            observation_store.close.assert_called_once()
+            self.assertIsNone(scheduler.observation_store)
+            scheduler.driver.quit.assert_called_once()
+
+    @staticmethod
+    def drain_after(controller: Controller, waits: int):
+        calls = []
+
+        async def async_wait(duration):
+            calls.append(duration)
+            if len(calls) == waits:
+                controller.drain()
+            return False
+
+        return async_wait
+
+
+if __name__ == '__main__':
+    unittest.main()
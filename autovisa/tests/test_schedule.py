@@ -3,7 +3,9 @@ import unittest
 from datetime import date
 from unittest.mock import MagicMock, patch, PropertyMock
 
-from autovisa.src.schedule import Scheduler
+from autovisa.src.exceptions import NavigationException, SiteUnavailableException
+from autovisa.src.page_state import PageState
+from autovisa.src.schedule import Phase, Scheduler
 from autovisa.src.appointment import Appointment
 
 
@@ -139,7 +141,7 @@ class TestScheduler(unittest.TestCase):
             with patch('autovisa.src.schedule.Select') as mock_select_class:
                 mock_select_class.side_effect = [mock_city_select, mock_time_select]
 
-                with patch('autovisa.src.schedule.quick_sleep'):
+                with patch('autovisa.src.utils.quick_sleep'):
                     with patch('autovisa.src.schedule.selenium.webdriver.common.by.By.CSS_SELECTOR'):
                         result = scheduler.execute_reschedule()
 
@@ -164,5 +166,130 @@ class TestScheduler(unittest.TestCase):
             scheduler.gen_current_appointment_list.assert_called_once()
 
 
+class TestSchedulerNavigation(unittest.TestCase):
+    """Test cases for the page-state navigation of Scheduler."""
+
+    def setUp(self):
+        patcher = patch('autovisa.src.webdriver.DEFAULT_WEBDRIVER_CLASS')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.scheduler = Scheduler()
+        self.scheduler.driver = MagicMock()
+        self.scheduler.driver.current_url = "https://example.com/schedule/1/appointment"
+
+    def test_already_on_form(self):
+        """Test no navigation happens when the form is already loaded."""
+        self.scheduler.detect_page_state = MagicMock(return_value=PageState.RESCHEDULE_FORM)
+        self.scheduler.get_navigation_transition = MagicMock()
+
+        result = self.scheduler.navigate_to_reschedule_form()
+
+        self.assertEqual(result, PageState.RESCHEDULE_FORM)
+        self.scheduler.get_navigation_transition.assert_not_called()
+        self.assertEqual(self.scheduler.reschedule_url, self.scheduler.driver.current_url)
+
+    def test_navigates_from_sign_in(self):
+        """Test each page state triggers its own transition."""
+        self.scheduler.detect_page_state = MagicMock(side_effect=[
+            PageState.SIGN_IN, PageState.APPOINTMENT_LIST,
+            PageState.APPOINTMENT_ACTIONS, PageState.RESCHEDULE_FORM,
+        ])
+        self.scheduler.execute_login = MagicMock()
+        self.scheduler.open_appointment_actions = MagicMock()
+        self.scheduler.open_reschedule_form = MagicMock()
+
+        self.scheduler.navigate_to_reschedule_form()
+
+        self.scheduler.execute_login.assert_called_once()
+        self.scheduler.open_appointment_actions.assert_called_once()
+        self.scheduler.open_reschedule_form.assert_called_once()
+
+    def test_site_unavailable(self):
+        """Test maintenance and rate-limit pages abort the navigation."""
+        for state in (PageState.MAINTENANCE, PageState.RATE_LIMITED):
+            self.scheduler.detect_page_state = MagicMock(return_value=state)
+            with self.assertRaises(SiteUnavailableException):
+                self.scheduler.navigate_to_reschedule_form()
+
+    def test_gives_up_after_max_steps(self):
+        """Test navigation stops when the form is never reached."""
+        self.scheduler.detect_page_state = MagicMock(return_value=PageState.UNKNOWN)
+        self.scheduler.reopen_known_page = MagicMock()
+
+        with self.assertRaises(NavigationException):
+            self.scheduler.navigate_to_reschedule_form(max_steps=3)
+
+        self.assertEqual(self.scheduler.reopen_known_page.call_count, 3)
+
+    def test_open_appointment_actions_uses_known_url(self):
+        """Test a known reschedule URL skips the "continue" CTA."""
+        self.scheduler.reschedule_url = "https://example.com/schedule/1/appointment"
+        self.scheduler.slow_select_element = MagicMock()
+
+        with patch('autovisa.src.schedule.wait_page_load'):
+            self.scheduler.open_appointment_actions()
+
+        self.scheduler.driver.get.assert_called_once_with(self.scheduler.reschedule_url)
+        self.scheduler.slow_select_element.assert_not_called()
+
+
+class TestSchedulerStatus(unittest.TestCase):
+    """Test cases for the status reported by Scheduler."""
+
+    def setUp(self):
+        patcher = patch('autovisa.src.webdriver.DEFAULT_WEBDRIVER_CLASS')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.scheduler = Scheduler()
+
+    def test_get_status(self):
+        """Test the status snapshot includes phase, observations and metrics."""
+        self.scheduler.set_phase(Phase.CHECK)
+        self.scheduler.record_observation("Toronto", date(2023, 6, 15))
+        self.scheduler.metrics["checks"] += 1
+
+        status = self.scheduler.get_status()
+
+        self.assertEqual(status["phase"], Phase.CHECK)
+        self.assertEqual(status["observations"]["Toronto"]["date"], "2023-06-15")
+        self.assertEqual(status["metrics"], {"checks": 1})
+
+    def test_wait_next_check_uses_controller(self):
+        """Test waits between checks go through the controller."""
+        self.scheduler.controller = MagicMock()
+        self.scheduler.controller.is_draining = True
+
+        self.scheduler.wait_next_check()
+
+        self.scheduler.controller.wait.assert_called_once()
+        self.assertTrue(self.scheduler.should_stop())
+
+    def test_recycle_driver_if_needed(self):
+        """Test the browser is replaced when the watchdog says so."""
+        self.scheduler.watchdog = MagicMock()
+        self.scheduler.watchdog.should_recycle.return_value = True
+        self.scheduler.recycle_driver = MagicMock()
+
+        self.assertTrue(self.scheduler.recycle_driver_if_needed())
+
+        self.scheduler.recycle_driver.assert_called_once()
+        self.assertEqual(self.scheduler.metrics["driver_recycles"], 1)
+
+    def test_wait_for_new_appointment_refreshes(self):
+        """Test the page is refreshed when the browser is kept."""
+        self.scheduler.driver = MagicMock()
+        self.scheduler.wait_next_check = MagicMock()
+        self.scheduler.recycle_driver_if_needed = MagicMock(return_value=False)
+
+        def find_date():
+            self.scheduler.new_appointment = MagicMock()
+
+        self.scheduler.get_best_date = MagicMock(side_effect=find_date)
+
+        self.scheduler.wait_for_new_appointment()
+
+        self.scheduler.driver.refresh.assert_called_once()
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,122 @@
+"""Unit tests for simulator module."""
+import datetime
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from autovisa.src.observations import Observation
+from autovisa.src.simulator import Policy, Timeline, build_policies, main, simulate
+
+CURRENT_DATE = datetime.date(2023, 11, 21)
+
+
+# Toronto offers 2023-09-07 between t=1000 and t=1300, Vancouver never improves
+OBSERVATIONS = [
+    Observation("94", "Toronto", 0.0, "", ("2023-12-01",)),
+    Observation("95", "Vancouver", 0.0, "", ("2023-12-05",)),
+    Observation("94", "Toronto", 1000.0, "", ("2023-09-07", "2023-12-01")),
+    Observation("94", "Toronto", 1300.0, "", ("2023-12-01",)),
+    Observation("95", "Vancouver", 3600.0, "", ()),
+]
+
+
+def make_timeline() -> Timeline:
+    return Timeline(OBSERVATIONS)
+
+
+class TestTimeline(unittest.TestCase):
+    """Test cases for Timeline class."""
+
+    def test_get(self):
+        """Test the last reading before the given time is returned."""
+        timeline = make_timeline()
+
+        self.assertEqual(timeline.get("94", 999.0), ("2023-12-01",))
+        self.assertEqual(timeline.get("94", 1000.0)[0], "2023-09-07")
+        self.assertEqual(timeline.get("95", 4000.0), ())
+        self.assertEqual(timeline.get("89", 4000.0), ())
+        self.assertEqual((timeline.start, timeline.end), (0.0, 3600.0))
+
+    def test_from_json(self):
+        """Test readings are loaded from a JSON export."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "timeline.json")
+            with open(path, "w") as timeline_file:
+                json.dump(
+                    [{"facility_id": 94, "observed_at": 5, "dates": ["2023-09-07"]}],
+                    timeline_file,
+                )
+
+            timeline = Timeline.from_json(path)
+
+        self.assertEqual(len(timeline), 1)
+        self.assertEqual(timeline.get_catalog().get_id("94"), "94")
+
+
+class TestSimulate(unittest.TestCase):
+    """Test cases for simulate function."""
+
+    def test_detects_better_date(self):
+        """Test a frequent policy catches the window and reports the gain."""
+        policy = Policy("fast", ("94", "95"), sleep_bounds=(60, 61), hibernate_bounds=(600, 601))
+
+        report = simulate(make_timeline(), policy, CURRENT_DATE)
+
+        self.assertEqual(len(report.detections), 1)
+        detection = report.detections[0]
+        self.assertEqual(detection.new_date, datetime.date(2023, 9, 7))
+        self.assertEqual(report.days_gained, 75)
+        self.assertLess(detection.latency, 61)
+        self.assertEqual(report.missed, 0)
+        self.assertEqual(report.final_date, datetime.date(2023, 9, 7))
+        self.assertEqual(report.sessions, 2)
+
+    def test_slow_policy_misses_window(self):
+        """Test a window shorter than the interval is counted as missed."""
+        policy = Policy("slow", ("94",), sleep_bounds=(900, 901))
+
+        report = simulate(make_timeline(), policy, CURRENT_DATE)
+
+        self.assertEqual(report.detections, [])
+        self.assertEqual(report.missed, 1)
+        self.assertEqual(report.final_date, CURRENT_DATE)
+
+    def test_requests_grow_with_facilities(self):
+        """Test each check costs a reload plus one request per facility."""
+        timeline = make_timeline()
+        single = simulate(timeline, Policy("one", ("95",), sleep_bounds=(60, 61)), CURRENT_DATE)
+        double = simulate(
+            timeline, Policy("two", ("89", "95"), sleep_bounds=(60, 61)), CURRENT_DATE
+        )
+
+        self.assertEqual(single.checks, double.checks)
+        self.assertEqual(single.requests, 4 + 2 * single.checks)
+        self.assertEqual(double.requests, single.requests)  # 89 is not in the timeline
+
+    def test_main(self):
+        """Test the command prints one report per policy."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "timeline.json")
+            with open(path, "w") as timeline_file:
+                json.dump([obs._asdict() for obs in OBSERVATIONS], timeline_file)
+
+            output = io.StringIO()
+            with redirect_stdout(output):
+                main([
+                    "--timeline", path, "--current-date", "2023-11-21",
+                    "--intervals", "60-61", "900-901", "--facility-sets", "94",
+                ])
+
+        reports = json.loads(output.getvalue())
+        self.assertEqual([report["days_gained"] for report in reports], [75, 0])
+        self.assertEqual(
+            [policy.sleep_bounds for policy in build_policies(["60-61", "900"], ["94"])],
+            [(60, 61), (900, 900)],
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+"""Unit tests for timeslots module."""
+import unittest
+from unittest.mock import MagicMock
+
+from autovisa.src.timeslots import TimePrefetch, choose_date_with_slots, get_times_url
+
+FORM_URL = "https://ais.example.com/en-ca/niv/schedule/2000001/appointment"
+
+
+class TestTimeslots(unittest.TestCase):
+    """Test cases for time slot prefetching."""
+
+    def test_get_times_url(self):
+        """Test the times URL is derived from the reschedule form URL."""
+        self.assertEqual(
+            get_times_url(FORM_URL, "94", "2023-09-07"),
+            "/en-ca/niv/schedule/2000001/appointment/times/94.json"
+            "?date=2023-09-07&appointments[expedite]=false",
+        )
+
+    def test_choose_date_with_slots(self):
+        """Test dates without slots are skipped and unknown ones are kept."""
+        self.assertEqual(
+            choose_date_with_slots({"2023-09-07": [], "2023-09-08": ["08:00", "08:15"]}),
+            ("2023-09-08", "08:15"),
+        )
+        self.assertEqual(
+            choose_date_with_slots({"2023-09-07": [], "2023-09-08": None}),
+            ("2023-09-08", None),
+        )
+        self.assertIsNone(choose_date_with_slots({"2023-09-07": []}))
+
+    def test_collect_times_out(self):
+        """Test dates still pending at the deadline map to None."""
+        prefetch = TimePrefetch(FORM_URL, "94", ["2023-09-07", "2023-09-08"])
+        urls = list(prefetch.urls.values())
+        driver = MagicMock()
+        driver.execute_script.return_value = {
+            urls[0]: {"done": True, "times": ["08:00"]},
+            urls[1]: {"done": False, "times": None},
+        }
+
+        times = prefetch.collect(driver, timeout=0)
+
+        self.assertEqual(times, {"2023-09-07": ["08:00"], "2023-09-08": None})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,7 +5,7 @@ from unittest.mock import MagicMock, patch
 from autovisa.src.utils import (
     is_truthy, is_env, is_prod, is_testing, get_credentials,
     get_user_agent, get_month_int, filter_out_empty, get_response_body,
-    get_dict_response
+    get_dict_response, get_sleep_duration, get_login_mode, clear_env_caches
 )
 
 
@@ -125,6 +125,45 @@ class TestGetMonthInt(unittest.TestCase):
             self.assertEqual(get_month_int(month_name.upper()), i)
 
 
+class TestGetSleepDuration(unittest.TestCase):
+    """Test cases for get_sleep_duration function."""
+
+    def test_within_bounds(self):
+        """Test durations stay within the given bounds."""
+        for _ in range(20):
+            duration = get_sleep_duration(60, 120)
+            self.assertGreaterEqual(duration, 60)
+            self.assertLess(duration, 120)
+
+    def test_invalid_bounds(self):
+        """Test invalid bounds yield no sleep."""
+        self.assertEqual(get_sleep_duration(0, 0), 0)
+        self.assertEqual(get_sleep_duration(5, 3), 0)
+
+
+class TestGetLoginMode(unittest.TestCase):
+    """Test cases for get_login_mode function."""
+
+    def setUp(self):
+        clear_env_caches()
+        self.addCleanup(clear_env_caches)
+
+    @patch.dict('os.environ', {'LOGIN_MODE': ' Fast ', 'PRODUCTION': ''})
+    def test_fast(self):
+        """Test the mode is read case-insensitively."""
+        self.assertEqual(get_login_mode(), 'fast')
+
+    @patch.dict('os.environ', {'LOGIN_MODE': 'fast', 'PRODUCTION': 'true'})
+    def test_fast_in_production(self):
+        """Test production falls back to human-like typing."""
+        self.assertEqual(get_login_mode(), 'human')
+
+    @patch.dict('os.environ', {'LOGIN_MODE': 'turbo'})
+    def test_unknown_mode(self):
+        """Test unknown modes fall back to human-like typing."""
+        self.assertEqual(get_login_mode(), 'human')
+
+
 class TestFilterOutEmpty(unittest.TestCase):
     """Test cases for filter_out_empty function."""
 
@@ -0,0 +1,112 @@
+"""Unit tests for watchdog module."""
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from autovisa.src.watchdog import (
+    MemorySample, MemoryWatchdog, get_driver_pids, get_process_tree, read_rss_kb
+)
+
+
+class FakeProcMixin:
+    """Build a fake /proc tree in a temporary directory."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.proc_root = self.tmp_dir.name
+        os.makedirs(os.path.join(self.proc_root, "self"))
+
+    def add_process(self, pid, parent_pid, rss_kb, name="chrome"):
+        process_dir = os.path.join(self.proc_root, str(pid))
+        os.makedirs(process_dir)
+        with open(os.path.join(process_dir, "stat"), "w") as stat_file:
+            stat_file.write(f"{pid} ({name}) S {parent_pid} 1 1 0 -1\n")
+        with open(os.path.join(process_dir, "status"), "w") as status_file:
+            status_file.write(f"Name:\t{name}\nVmRSS:\t{rss_kb} kB\n")
+
+
+class TestProcReading(FakeProcMixin, unittest.TestCase):
+    """Test cases for the /proc helpers."""
+
+    def test_read_rss_kb(self):
+        """Test reading the resident set size of a process."""
+        self.add_process(10, 1, 2048)
+
+        self.assertEqual(read_rss_kb(10, self.proc_root), 2048)
+        self.assertEqual(read_rss_kb(99, self.proc_root), 0)
+
+    def test_get_process_tree(self):
+        """Test descendants are collected, including names with spaces."""
+        self.add_process(10, 1, 100, name="chromedriver")
+        self.add_process(11, 10, 100, name="chrome renderer")
+        self.add_process(12, 11, 100)
+        self.add_process(20, 1, 100)
+
+        self.assertEqual(get_process_tree([10], self.proc_root), {10, 11, 12})
+
+    def test_get_driver_pids(self):
+        """Test service and browser process ids are both reported."""
+        driver = MagicMock()
+        driver.service.process.pid = 10
+        driver.browser_pid = 30
+
+        self.assertEqual(get_driver_pids(driver), [10, 30])
+
+
+class TestMemoryWatchdog(FakeProcMixin, unittest.TestCase):
+    """Test cases for MemoryWatchdog class."""
+
+    def test_sample_sums_driver_tree(self):
+        """Test the driver's whole process tree is measured."""
+        self.add_process(10, 1, 1024)
+        self.add_process(11, 10, 2048)
+        driver = MagicMock()
+        driver.service.process.pid = 10
+        driver.browser_pid = None
+        watchdog = MemoryWatchdog(proc_root=self.proc_root)
+
+        sample = watchdog.sample(driver)
+
+        self.assertEqual(sample.driver_rss_kb, 3072)
+        self.assertEqual(len(watchdog.samples), 1)
+
+    def test_should_recycle(self):
+        """Test thresholds trigger a recycle."""
+        watchdog = MemoryWatchdog(max_driver_rss_mb=1, max_python_rss_mb=1)
+
+        self.assertFalse(watchdog.should_recycle(None))
+        self.assertFalse(watchdog.should_recycle(MemorySample(0, 512, 512)))
+        self.assertTrue(watchdog.should_recycle(MemorySample(0, 2048, 512)))
+
+    def test_python_rss_not_recycled(self):
+        """Test this process going over its threshold is reported once, without a recycle."""
+        watchdog = MemoryWatchdog(max_driver_rss_mb=1, max_python_rss_mb=1)
+
+        with self.assertLogs("autovisa", level="WARNING") as logs:
+            self.assertFalse(watchdog.should_recycle(MemorySample(0, 512, 2048)))
+            self.assertFalse(watchdog.should_recycle(MemorySample(0, 512, 2048)))
+
+        self.assertEqual(len(logs.output), 1)
+        self.assertTrue(watchdog.python_over_limit)
+        watchdog.should_recycle(MemorySample(0, 512, 512))
+        self.assertFalse(watchdog.python_over_limit)
+
+    def test_trend(self):
+        """Test growth rate is computed over the kept samples."""
+        watchdog = MemoryWatchdog()
+        watchdog.samples.append(MemorySample(0, 1000, 500))
+        watchdog.samples.append(MemorySample(3600, 3000, 600))
+
+        self.assertEqual(watchdog.get_trend_kb_per_hour(), (2000, 100))
+
+    def test_unsupported_platform(self):
+        """Test sampling is skipped without /proc."""
+        watchdog = MemoryWatchdog(proc_root=os.path.join(self.proc_root, "missing"))
+
+        self.assertIsNone(watchdog.sample(MagicMock()))
+
+
+if __name__ == '__main__':
+    unittest.main()